@@ -0,0 +1,28 @@
+from rest_framework import authentication, exceptions
+
+from .tokens import TokenError, user_from_access_token
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Автентифікація за заголовком 'Authorization: Bearer <access token>'.
+    Токен перевіряється підписом і звіряється з кешованим рядком користувача
+    (auth_app.user_cache), тож запит зазвичай не торкається БД.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header')
+        try:
+            token = auth[1].decode()
+            user = user_from_access_token(token)
+        except (UnicodeError, TokenError) as e:
+            raise exceptions.AuthenticationFailed(str(e))
+        return user, token
+
+    def authenticate_header(self, request):
+        return self.keyword
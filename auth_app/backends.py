@@ -1,18 +1,17 @@
 from django.contrib.auth.backends import BaseBackend
-from django.contrib.auth.hashers import check_password
 from .models import UserCredentials
+from . import hashing, user_cache
 
 class UserCredentialsBackend(BaseBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
         try:
             user = UserCredentials.objects.get(username=username)
-            if check_password(password, user.password):
+            # PBKDF2 виконується в обмеженому пулі процесів (див. auth_app.hashing)
+            if hashing.verify_password(password, user.password):
                 return user
         except UserCredentials.DoesNotExist:
             return None
 
     def get_user(self, user_id):
-        try:
-            return UserCredentials.objects.get(pk=user_id)
-        except UserCredentials.DoesNotExist:
-            return None
\ No newline at end of file
+        # Рядок користувача (разом з групами) береться з короткоживучого кешу
+        return user_cache.get_user(user_id)
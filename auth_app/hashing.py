@@ -0,0 +1,141 @@
+"""
+Хешування паролів в обмеженому пулі процесів.
+
+PBKDF2 свідомо повільний, і під час сплеску логінів він забирає CPU у всіх
+інших запитів воркера. Хешування виноситься в ProcessPoolExecutor з
+PASSWORD_HASHING_WORKERS процесами, а кількість задач у черзі обмежена
+PASSWORD_HASHING_QUEUE_LIMIT. Якщо черга заповнена, результат не готовий
+за PASSWORD_HASHING_TIMEOUT або пул зламався, запит відхиляється з
+PasswordHashingBusy; хешування ніколи не повертається в процес воркера.
+"""
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+
+class PasswordHashingBusy(Exception):
+    pass
+
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+def _init_worker():
+    # Дочірній процес має знати налаштування (PASSWORD_HASHERS)
+    django.setup()
+
+
+def _pool_size():
+    return getattr(settings, 'PASSWORD_HASHING_WORKERS', 2)
+
+
+def _get_executor():
+    global _executor, _slots
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _slots = threading.BoundedSemaphore(getattr(settings, 'PASSWORD_HASHING_QUEUE_LIMIT', 16))
+                _executor = ProcessPoolExecutor(max_workers=_pool_size(), initializer=_init_worker)
+    return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _submit(fn, *args):
+    executor = _get_executor()
+    slots = _slots
+    if not slots.acquire(blocking=False):
+        raise PasswordHashingBusy('Password hashing queue is full')
+    try:
+        future = executor.submit(fn, *args)
+    except BrokenProcessPool:
+        slots.release()
+        _reset_executor()
+        raise PasswordHashingBusy('Password hashing pool is broken')
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def _result(future):
+    try:
+        return future.result(timeout=getattr(settings, 'PASSWORD_HASHING_TIMEOUT', 10))
+    except FutureTimeoutError:
+        # Задача ще в черзі або виконується; якщо не почалась - знімаємо її, щоб не займала пул
+        future.cancel()
+        raise PasswordHashingBusy('Password hashing timed out')
+    except BrokenProcessPool:
+        # Процес пулу впав - пересоздаємо пул для наступних запитів, цей відхиляємо
+        _reset_executor()
+        raise PasswordHashingBusy('Password hashing pool is broken')
+
+
+def _run(fn, *args):
+    if _pool_size() <= 0:
+        # Пул вимкнено (наприклад, локальна розробка) - хешуємо в поточному процесі
+        return fn(*args)
+    return _result(_submit(fn, *args))
+
+
+def hash_password(password):
+    return _run(make_password, password)
+
+
+def verify_password(password, encoded):
+    return _run(check_password, password, encoded)
+
+
+def hash_passwords(passwords):
+    """
+    Хешує список паролів у спільному обмеженому пулі (імпорт через API).
+    Одночасно в пулі не більше PASSWORD_HASHING_WORKERS паролів цього виклику,
+    тож логіни чергуються з імпортом, а не чекають на нього; при заповненій
+    черзі імпорт перериває PasswordHashingBusy.
+    """
+    passwords = list(passwords)
+    if _pool_size() <= 0:
+        return [make_password(password) for password in passwords]
+    hashes, pending = [], deque()
+    try:
+        for password in passwords:
+            if len(pending) >= _pool_size():
+                hashes.append(_result(pending.popleft()))
+            pending.append(_submit(make_password, password))
+        while pending:
+            hashes.append(_result(pending.popleft()))
+    except PasswordHashingBusy:
+        # Імпорт відхилено - не лишаємо його задач у спільній черзі
+        for future in pending:
+            future.cancel()
+        raise
+    return hashes
+
+
+def hash_passwords_parallel(passwords, workers=None):
+    """
+    Хешує список паролів паралельно на всіх ядрах (масовий імпорт з консолі).
+    Використовує окремий пул, тому лише для management-команд, не для запитів.
+    """
+    passwords = list(passwords)
+    if len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
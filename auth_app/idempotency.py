@@ -0,0 +1,140 @@
+"""
+Заголовок Idempotency-Key для POST-ендпоінтів, що списують гроші або займають місця.
+
+Перший запит з ключем резервує рядок IdempotencyKey (user_id, key) і після
+виконання view зберігає в ньому відповідь. Повтор з тим самим ключем отримує
+збережену відповідь без звернення до бізнес-таблиць; повтор, що прийшов, поки
+перший ще виконується, - 409. Той самий ключ з іншим запитом (метод, шлях,
+тіло) - 422. Відповіді 5xx і винятки не зберігаються, щоб повтор міг пройти.
+
+Декоратор idempotent працює і для функцій-view (відповідь - HttpResponse,
+наприклад redirect), і для методів APIView (Response зберігається як JSON).
+HTML-view перехоплюють помилки і відповідають redirect'ом з повідомленням,
+тому для них відповідь зберігається, лише якщо view позначив успіх через
+mark_succeeded(request); інакше ключ звільняється і повтор виконується знову.
+Повтор збереженого redirect'а додає flash-повідомлення, що запит уже виконано.
+Прострочені ключі видаляє команда purge_idempotency_keys.
+"""
+import functools
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError
+from django.http import HttpResponse, JsonResponse, RawPostDataException
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+MAX_KEY_LENGTH = 255
+JSON_CONTENT_TYPE = 'application/json'
+SUCCEEDED_ATTR = '_idempotent_succeeded'
+
+
+def mark_succeeded(request):
+    """Позначає, що HTML-view виконав дію і його відповідь можна повторювати."""
+    setattr(request, SUCCEEDED_ATTR, True)
+
+
+def _find_request(args):
+    for arg in args:
+        if hasattr(arg, 'META') and hasattr(arg, 'method'):
+            return arg
+    raise TypeError('idempotent view called without a request')
+
+
+def _fingerprint(request):
+    django_request = getattr(request, '_request', request)
+    try:
+        body = django_request.body
+    except RawPostDataException:
+        # multipart уже прочитано потоком - порівнюємо лише метод і шлях
+        body = b''
+    digest = hashlib.sha256()
+    for part in (request.method.encode(), request.path.encode(), body):
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _replay(record, api):
+    if api and record.content_type == JSON_CONTENT_TYPE:
+        data = json.loads(bytes(record.body)) if record.body else None
+        response = Response(data, status=record.status_code)
+    else:
+        response = HttpResponse(bytes(record.body or b''), status=record.status_code,
+                                content_type=record.content_type)
+        if record.location:
+            response['Location'] = record.location
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _store(record, response):
+    if isinstance(response, Response):
+        record.content_type = JSON_CONTENT_TYPE
+        record.body = json.dumps(response.data, cls=DjangoJSONEncoder).encode('utf-8')
+    else:
+        record.content_type = response.get('Content-Type')
+        record.location = response.get('Location')
+        record.body = response.content
+    record.status_code = response.status_code
+    record.save(update_fields=['status_code', 'content_type', 'location', 'body'])
+
+
+def idempotent(view_func):
+    @functools.wraps(view_func)
+    def wrapper(*args, **kwargs):
+        request = _find_request(args)
+        key = request.META.get(HEADER)
+        if not key or request.method != 'POST' or not request.user.is_authenticated:
+            return view_func(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return JsonResponse({'error': f'Idempotency-Key must be at most {MAX_KEY_LENGTH} characters'}, status=400)
+
+        api = hasattr(request, '_request')
+        fingerprint = _fingerprint(request)
+        now = timezone.now()
+        try:
+            record = IdempotencyKey.objects.create(
+                user_id=request.user.pk,
+                key=key,
+                fingerprint=fingerprint,
+                expires_at=now + timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60)),
+            )
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user_id=request.user.pk, key=key).first()
+            if record is None or record.expires_at <= now:
+                # Прострочений ключ ще не прибрано - звільняємо його і просимо повторити
+                IdempotencyKey.objects.filter(user_id=request.user.pk, key=key, expires_at__lte=now).delete()
+                return JsonResponse({'error': 'Idempotency key expired, retry the request'}, status=409)
+            if record.fingerprint != fingerprint:
+                return JsonResponse({'error': 'Idempotency key was used for a different request'}, status=422)
+            if record.status_code is None:
+                return JsonResponse({'error': 'A request with this idempotency key is in progress'}, status=409)
+            logger.info(f"Replayed response for idempotency key of user {request.user.pk} on {request.path}")
+            if not api:
+                messages.info(request, 'Цей запит уже виконано.')
+            return _replay(record, api)
+
+        try:
+            response = view_func(*args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        failed = response.status_code >= 500 or (not api and not getattr(request, SUCCEEDED_ATTR, False))
+        if failed or getattr(response, 'streaming', False):
+            record.delete()
+        else:
+            _store(record, response)
+        return response
+
+    return wrapper
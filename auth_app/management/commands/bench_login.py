@@ -0,0 +1,77 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ('Benchmark login throughput and latency of non-auth requests during a login burst. '
+            'Every attempt uses the same username from one address, so the login token buckets '
+            'would turn the burst into 429s: start the target server with AUTH_RATE_LIMITS_ENABLED=0 '
+            '(never in production). The command refuses to report numbers if it sees 429 responses.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000')
+        parser.add_argument('--username', required=True)
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--logins', type=int, default=500, help='Total login attempts in the burst')
+        parser.add_argument('--concurrency', type=int, default=32, help='Parallel login clients')
+        parser.add_argument('--probe-path', default='/auth/api/check-user/?username=bench_probe',
+                            help='Cheap non-auth endpoint probed during the burst')
+        parser.add_argument('--probe-interval', type=float, default=0.02)
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        login_url = f"{base_url}/auth/api/login/"
+        probe_url = f"{base_url}{options['probe_path']}"
+        payload = {'username': options['username'], 'password': options['password']}
+
+        login_latencies, probe_latencies = [], []
+        statuses = {}
+        stop = threading.Event()
+
+        def do_login(_):
+            started = time.perf_counter()
+            response = requests.post(login_url, data=payload)
+            return time.perf_counter() - started, response.status_code
+
+        def probe():
+            with requests.Session() as session:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    session.get(probe_url)
+                    probe_latencies.append(time.perf_counter() - started)
+                    time.sleep(options['probe_interval'])
+
+        prober = threading.Thread(target=probe, daemon=True)
+        prober.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            for latency, code in pool.map(do_login, range(options['logins'])):
+                login_latencies.append(latency)
+                statuses[code] = statuses.get(code, 0) + 1
+        elapsed = time.perf_counter() - started
+        stop.set()
+        prober.join()
+
+        accepted = statuses.get(200, 0)
+        if statuses.get(429):
+            raise CommandError(f"{statuses[429]} of {options['logins']} logins were throttled (429); "
+                               f"restart the server with AUTH_RATE_LIMITS_ENABLED=0 and rerun")
+        self.stdout.write(f"Login burst: {options['logins']} attempts in {elapsed:.2f}s, statuses {statuses}")
+        self.stdout.write(f"Successful login throughput: {accepted / elapsed:.1f}/s")
+        self.stdout.write(f"Login latency: {self._percentiles(login_latencies)}")
+        self.stdout.write(f"Probe latency during burst ({len(probe_latencies)} requests): "
+                          f"{self._percentiles(probe_latencies)}")
+
+    @staticmethod
+    def _percentiles(samples):
+        if not samples:
+            return 'no samples'
+        ordered = sorted(samples)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return (f"p50={statistics.median(ordered) * 1000:.1f}ms "
+                f"p99={p99 * 1000:.1f}ms max={ordered[-1] * 1000:.1f}ms")
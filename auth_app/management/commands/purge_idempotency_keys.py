@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from auth_app.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = 'Delete expired idempotency keys in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted = 0
+        while True:
+            # Короткі DELETE по id, щоб не тримати довгих блокувань на гарячій таблиці
+            ids = list(IdempotencyKey.objects
+                       .filter(expires_at__lt=now)
+                       .order_by('expires_at')
+                       .values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired idempotency keys'))
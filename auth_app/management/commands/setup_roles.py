@@ -1,79 +1,167 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from auth_app.permission_cache import bump_permission_version
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
 
+# Список таблиць і моделей (ContentType вказуємо вручну, бо моделі розкидані по сервісах)
+APP_LABEL = 'auth_app'  # Тимчасово, можна змінити на відповідний сервіс
+
+TABLES = [
+    'clients', 'user_credentials', 'trainers', 'client_goals', 'goals',
+    'client_subscriptions', 'subscriptions', 'client_progress', 'client_feedbacks',
+    'client_training_registrations', 'training_sessions', 'training_type',
+    'gyms', 'gym_locations', 'gym_equipment', 'equipment'
+]
+
+ROLES = ['admin', 'trainer', 'client']
+
+# Словник прав доступу
+PERMISSIONS_MATRIX = {
+    'clients': {'admin': 'CRUD', 'trainer': 'R', 'client': 'RU'},
+    'user_credentials': {'admin': 'CRUD', 'trainer': 'RU', 'client': 'RU'},
+    'trainers': {'admin': 'CRUD', 'trainer': 'RU', 'client': 'R'},
+    'client_goals': {'admin': '', 'trainer': 'R', 'client': 'CRUD'},
+    'goals': {'admin': 'CRUD', 'trainer': '', 'client': 'R'},
+    'client_subscriptions': {'admin': '', 'trainer': '', 'client': 'CRUD'},
+    'subscriptions': {'admin': 'CRUD', 'trainer': 'R', 'client': 'R'},
+    'client_progress': {'admin': '', 'trainer': 'CRU', 'client': 'CRUD'},
+    'client_feedbacks': {'admin': 'RD', 'trainer': 'R', 'client': 'CRUD'},
+    'client_training_registrations': {'admin': '', 'trainer': '', 'client': 'CRUD'},
+    'training_sessions': {'admin': 'RUD', 'trainer': 'CRUD', 'client': 'R'},
+    'training_type': {'admin': 'CRUD', 'trainer': 'R', 'client': 'R'},
+    'gyms': {'admin': 'CRUD', 'trainer': 'R', 'client': 'R'},
+    'gym_locations': {'admin': 'CRUD', 'trainer': 'R', 'client': 'R'},
+    'gym_equipment': {'admin': 'CRUD', 'trainer': 'R', 'client': 'R'},
+    'equipment': {'admin': 'CRUD', 'trainer': 'R', 'client': 'R'},
+}
+
+# Літера в матриці -> дія Django
+ACTIONS = [('R', 'view'), ('C', 'add'), ('U', 'change'), ('D', 'delete')]
+
+
 class Command(BaseCommand):
     help = 'Setup initial roles and permissions based on role-table access matrix'
 
-    def handle(self, *args, **kwargs):
-        # Створюємо групи
-        admin_group, _ = Group.objects.get_or_create(name='admin')
-        trainer_group, _ = Group.objects.get_or_create(name='trainer')
-        client_group, _ = Group.objects.get_or_create(name='client')
-
-        # Список таблиць і моделей (вказуємо ContentType вручну, бо моделі розкидані по сервісах)
-        tables = [
-            'clients', 'user_credentials', 'trainers', 'client_goals', 'goals',
-            'client_subscriptions', 'subscriptions', 'client_progress', 'client_feedbacks',
-            'client_training_registrations', 'training_sessions', 'training_type',
-            'gyms', 'gym_locations', 'gym_equipment', 'equipment'
-        ]
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Print the planned changes without writing them')
+        parser.add_argument('--prune', action='store_true',
+                            help='Also revoke matrix-managed permissions that the matrix no longer grants')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        # Усі існуючі рядки читаються один раз, далі - лише різниця множин
+        groups = {group.name: group for group in Group.objects.filter(name__in=ROLES)}
+        missing_groups = [name for name in ROLES if name not in groups]
 
-        # Словник прав доступу
-        permissions_matrix = {
-            'clients': {'admin': 'CRUD', 'trainer': 'R', 'client': 'RU'},
-            'user_credentials': {'admin': 'CRUD', 'trainer': 'RU', 'client': 'RU'},
-            'trainers': {'admin': 'CRUD', 'trainer': 'RU', 'client': 'R'},
-            'client_goals': {'admin': '', 'trainer': 'R', 'client': 'CRUD'},
-            'goals': {'admin': 'CRUD', 'trainer': '', 'client': 'R'},
-            'client_subscriptions': {'admin': '', 'trainer': '', 'client': 'CRUD'},
-            'subscriptions': {'admin': 'CRUD', 'trainer': 'R', 'client': 'R'},
-            'client_progress': {'admin': '', 'trainer': 'CRU', 'client': 'CRUD'},
-            'client_feedbacks': {'admin': 'RD', 'trainer': 'R', 'client': 'CRUD'},
-            'client_training_registrations': {'admin': '', 'trainer': '', 'client': 'CRUD'},
-            'training_sessions': {'admin': 'RUD', 'trainer': 'CRUD', 'client': 'R'},
-            'training_type': {'admin': 'CRUD', 'trainer': 'R', 'client': 'R'},
-            'gyms': {'admin': 'CRUD', 'trainer': 'R', 'client': 'R'},
-            'gym_locations': {'admin': 'CRUD', 'trainer': 'R', 'client': 'R'},
-            'gym_equipment': {'admin': 'CRUD', 'trainer': 'R', 'client': 'R'},
-            'equipment': {'admin': 'CRUD', 'trainer': 'R', 'client': 'R'},
+        content_types = {ct.model: ct for ct in ContentType.objects.filter(app_label=APP_LABEL, model__in=TABLES)}
+        missing_content_types = [table for table in TABLES if table not in content_types]
+
+        permissions = {
+            (perm.content_type.model, perm.codename): perm
+            for perm in Permission.objects.filter(content_type__app_label=APP_LABEL, content_type__model__in=TABLES)
+            .select_related('content_type')
         }
+        missing_permissions = [
+            (table, action)
+            for table in TABLES
+            for _, action in ACTIONS
+            if (table, f'{action}_{table}') not in permissions
+        ]
+
+        self._print_plan('Groups to create', missing_groups)
+        self._print_plan('Content types to create', missing_content_types)
+        self._print_plan('Permissions to create', [f'{action}_{table}' for table, action in missing_permissions])
+
+        if dry_run:
+            links_to_add, links_to_remove = self._plan_links(groups, permissions, options['prune'])
+            self._print_plan('Group permissions to grant', self._describe_links(links_to_add, groups, permissions))
+            self._print_plan('Group permissions to revoke', self._describe_links(links_to_remove, groups, permissions), '-')
+            if missing_groups or missing_permissions:
+                # Для груп і дозволів, яких ще немає, зв'язки стануть відомі лише після їх створення
+                self.stdout.write('Grants for groups/permissions that do not exist yet are not listed')
+            self.stdout.write(self.style.WARNING('Dry run: no changes were written'))
+            return
+
+        with transaction.atomic():
+            if missing_groups:
+                Group.objects.bulk_create([Group(name=name) for name in missing_groups])
+                groups = {group.name: group for group in Group.objects.filter(name__in=ROLES)}
+
+            if missing_content_types:
+                ContentType.objects.bulk_create([
+                    ContentType(app_label=APP_LABEL, model=table) for table in missing_content_types
+                ])
+                content_types = {ct.model: ct for ct in ContentType.objects.filter(app_label=APP_LABEL, model__in=TABLES)}
+
+            if missing_permissions:
+                Permission.objects.bulk_create([
+                    Permission(
+                        codename=f'{action}_{table}',
+                        name=f'Can {action} {table}',
+                        content_type=content_types[table],
+                    )
+                    for table, action in missing_permissions
+                ])
+                permissions = {
+                    (perm.content_type.model, perm.codename): perm
+                    for perm in Permission.objects.filter(content_type__app_label=APP_LABEL,
+                                                          content_type__model__in=TABLES)
+                    .select_related('content_type')
+                }
+
+            links_to_add, links_to_remove = self._plan_links(groups, permissions, options['prune'])
+            self._print_plan('Group permissions to grant', self._describe_links(links_to_add, groups, permissions))
+            self._print_plan('Group permissions to revoke', self._describe_links(links_to_remove, groups, permissions), '-')
+
+            GroupPermission = Group.permissions.through
+            if links_to_add:
+                GroupPermission.objects.bulk_create([
+                    GroupPermission(group_id=group_id, permission_id=permission_id)
+                    for group_id, permission_id in links_to_add
+                ])
+            for group_id in {group_id for group_id, _ in links_to_remove}:
+                GroupPermission.objects.filter(
+                    group_id=group_id,
+                    permission_id__in=[perm_id for g_id, perm_id in links_to_remove if g_id == group_id],
+                ).delete()
+
+            if missing_groups or missing_permissions or links_to_add or links_to_remove:
+                # Воркери перебудують скомпільовану матрицю дозволів
+                bump_permission_version()
+
+        self.stdout.write(self.style.SUCCESS('Roles and permissions setup completed'))
+
+    def _plan_links(self, groups, permissions, prune):
+        desired = set()
+        for table in TABLES:
+            for role in ROLES:
+                group = groups.get(role)
+                if group is None:
+                    continue
+                access = PERMISSIONS_MATRIX[table][role]
+                for letter, action in ACTIONS:
+                    perm = permissions.get((table, f'{action}_{table}'))
+                    if letter in access and perm is not None:
+                        desired.add((group.pk, perm.pk))
+
+        managed_permission_ids = [perm.pk for perm in permissions.values()]
+        existing = set(
+            Group.permissions.through.objects
+            .filter(group_id__in=[group.pk for group in groups.values()], permission_id__in=managed_permission_ids)
+            .values_list('group_id', 'permission_id')
+        )
+        to_remove = existing - desired if prune else set()
+        return desired - existing, to_remove
+
+    @staticmethod
+    def _describe_links(links, groups, permissions):
+        group_names = {group.pk: name for name, group in groups.items()}
+        codenames = {perm.pk: perm.codename for perm in permissions.values()}
+        return sorted(f'{group_names[group_id]}: {codenames[perm_id]}' for group_id, perm_id in links)
 
-        # Створюємо дозволи для кожної таблиці
-        for table in tables:
-            content_type = ContentType.objects.get_or_create(
-                app_label='auth_app',  # Тимчасово, можеш змінити на відповідний сервіс
-                model=table
-            )[0]
-
-            # CRUD дозволи
-            perms = {
-                'view': Permission.objects.get_or_create(
-                    codename=f'view_{table}', name=f'Can view {table}', content_type=content_type
-                )[0],
-                'add': Permission.objects.get_or_create(
-                    codename=f'add_{table}', name=f'Can add {table}', content_type=content_type
-                )[0],
-                'change': Permission.objects.get_or_create(
-                    codename=f'change_{table}', name=f'Can change {table}', content_type=content_type
-                )[0],
-                'delete': Permission.objects.get_or_create(
-                    codename=f'delete_{table}', name=f'Can delete {table}', content_type=content_type
-                )[0],
-            }
-
-            # Призначаємо дозволи групам
-            for group_name, group in [('admin', admin_group), ('trainer', trainer_group), ('client', client_group)]:
-                access = permissions_matrix[table][group_name]
-                group_perms = []
-                if 'R' in access:
-                    group_perms.append(perms['view'])
-                if 'C' in access:
-                    group_perms.append(perms['add'])
-                if 'U' in access:
-                    group_perms.append(perms['change'])
-                if 'D' in access:
-                    group_perms.append(perms['delete'])
-                group.permissions.add(*group_perms)
-
-        self.stdout.write(self.style.SUCCESS('Roles and permissions setup completed'))
\ No newline at end of file
+    def _print_plan(self, title, items, sign='+'):
+        self.stdout.write(f'{title}: {len(items)}')
+        for item in items:
+            self.stdout.write(f'  {sign} {item}')
@@ -1,28 +1,73 @@
+from collections import defaultdict
+
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from auth_app.permission_cache import bump_permission_version
+from auth_app.user_cache import invalidate_users
 from django.contrib.auth.models import Group
-from auth_app.models import UserCredentials
+from auth_app.models import UserCredentials, UserCredentialsGroups
 
 class Command(BaseCommand):
     help = 'Sync user_credentials with groups based on user_role'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Print the planned changes without writing them')
+
+    def handle(self, *args, **options):
         # Отримуємо всі групи
-        groups = {group.name: group for group in Group.objects.all()}
-        users = UserCredentials.objects.all()
-        synced = 0
-        errors = 0
+        groups = {group.name: group.pk for group in Group.objects.all()}
+        group_names = {pk: name for name, pk in groups.items()}
 
-        for user in users:
-            group_name = user.user_role
-            if group_name in groups:
-                # Очищаємо старі групи (якщо є)
-                user.groups.clear()
-                # Додаємо до відповідної групи
-                user.groups.add(groups[group_name])
-                self.stdout.write(self.style.SUCCESS(f'Synced user {user.username} to group {group_name}'))
-                synced += 1
+        # Бажаний стан: кожен користувач з відомою роллю - рівно в одній групі
+        desired = set()
+        usernames = {}
+        errors = 0
+        for user_id, username, role in UserCredentials.objects.values_list('user_credential_id', 'username', 'user_role').iterator():
+            usernames[user_id] = username
+            if role in groups:
+                desired.add((user_id, groups[role]))
             else:
-                self.stdout.write(self.style.ERROR(f'Group {group_name} not found for user {user.username}'))
+                self.stdout.write(self.style.ERROR(f'Group {role} not found for user {username}'))
                 errors += 1
+        synced_users = {user_id for user_id, _ in desired}
+
+        # Поточний стан зв'язків - одним запитом
+        existing = {
+            (user_id, group_id)
+            for user_id, group_id in UserCredentialsGroups.objects.values_list('user_credentials_id', 'group_id').iterator()
+            if user_id in synced_users
+        }
+
+        to_add = desired - existing
+        # Як і раніше, у синхронізованих користувачів прибираються всі інші групи
+        to_remove = existing - desired
+
+        self.stdout.write(f'Group memberships to add: {len(to_add)}, to remove: {len(to_remove)}')
+        if options['verbosity'] >= 2 or options['dry_run']:
+            for user_id, group_id in sorted(to_add):
+                self.stdout.write(f'  + {usernames[user_id]} -> {group_names[group_id]}')
+            for user_id, group_id in sorted(to_remove):
+                self.stdout.write(f'  - {usernames[user_id]} -> {group_names[group_id]}')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: no changes were written'))
+            return
+
+        with transaction.atomic():
+            remove_by_group = defaultdict(list)
+            for user_id, group_id in to_remove:
+                remove_by_group[group_id].append(user_id)
+            for group_id, user_ids in remove_by_group.items():
+                UserCredentialsGroups.objects.filter(group_id=group_id, user_credentials_id__in=user_ids).delete()
+            UserCredentialsGroups.objects.bulk_create(
+                [UserCredentialsGroups(user_credentials_id=user_id, group_id=group_id) for user_id, group_id in to_add],
+                batch_size=1000,
+            )
+
+        changed_users = {user_id for user_id, _ in to_add | to_remove}
+        if changed_users:
+            # bulk_create не надсилає сигналів - скидаємо кеш користувачів і матрицю явно
+            invalidate_users(changed_users)
+            bump_permission_version()
 
-        self.stdout.write(self.style.SUCCESS(f'Synced {synced} users, {errors} errors'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(f'Synced {len(synced_users)} users ({len(changed_users)} changed), {errors} errors'))
@@ -3,6 +3,7 @@ from django.db import models
 # Create your models here.
 from django.db import models
 from django.contrib.auth.models import Group
+from . import permission_cache
 
 # Create your models here.
 class UserCredentials(models.Model):
@@ -47,15 +48,36 @@ class UserCredentials(models.Model):
         """
         return set()
 
+    def get_group_ids(self):
+        """
+        Повертає ідентифікатори груп користувача.
+        Результат запам'ятовується на об'єкті, тобто на час одного запиту.
+        """
+        if not hasattr(self, '_group_ids_cache'):
+            self._group_ids_cache = tuple(
+                UserCredentialsGroups.objects
+                .filter(user_credentials_id=self.pk)
+                .values_list('group_id', flat=True)
+            )
+        return self._group_ids_cache
+
+    def _get_permission_set(self):
+        if not hasattr(self, '_perm_cache'):
+            self._perm_cache = permission_cache.get_group_permissions(self.get_group_ids())
+        return self._perm_cache
+
+    def clear_permission_cache(self):
+        """
+        Скидає запам'ятовані групи та дозволи (після зміни груп користувача).
+        """
+        for attr in ('_group_ids_cache', '_perm_cache'):
+            self.__dict__.pop(attr, None)
+
     def get_group_permissions(self, obj=None):
         """
         Повертає набір дозволів, отриманих через групи користувача.
         """
-        permissions = set()
-        for group in self.groups.all():
-            for perm in group.permissions.select_related('content_type').all():
-                permissions.add(f"{perm.content_type.app_label}.{perm.codename}")
-        return permissions
+        return set(self._get_permission_set())
 
     def get_all_permissions(self, obj=None):
         """
@@ -70,7 +92,7 @@ class UserCredentials(models.Model):
         """
         if not self.is_active:
             return False
-        return perm in self.get_all_permissions(obj)
+        return perm in self._get_permission_set()
 
     def has_perms(self, perm_list, obj=None):
         """
@@ -84,7 +106,7 @@ class UserCredentials(models.Model):
         """
         if not self.is_active:
             return False
-        for perm in self.get_all_permissions():
+        for perm in self._get_permission_set():
             if perm.startswith(f"{app_label}."):
                 return True
         return False
@@ -104,4 +126,60 @@ class UserCredentialsGroups(models.Model):
 
     class Meta:
         managed = False
-        db_table = 'auth_app_usercredentials_groups'
\ No newline at end of file
+        db_table = 'auth_app_usercredentials_groups'
+
+# Лічильник версії дозволів. Таблиця створюється SQL-скриптами схеми:
+#   CREATE TABLE auth_app_permission_version (id smallint PRIMARY KEY, version bigint NOT NULL);
+#   INSERT INTO auth_app_permission_version VALUES (1, 1);
+class PermissionVersion(models.Model):
+    id = models.SmallIntegerField(primary_key=True)
+    version = models.BigIntegerField(default=1)
+
+    class Meta:
+        managed = False
+        db_table = 'auth_app_permission_version'
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(version=models.F('version') + 1):
+            cls.objects.create(pk=1, version=1)
+        return cls.current()
+
+
+# Збережені відповіді для заголовка Idempotency-Key. Таблиця створюється SQL-скриптами схеми:
+#   CREATE TABLE auth_app_idempotency_key (
+#       id bigserial PRIMARY KEY,
+#       user_id integer NOT NULL,
+#       key varchar(255) NOT NULL,
+#       fingerprint char(64) NOT NULL,
+#       status_code smallint,
+#       content_type varchar(100),
+#       location varchar(500),
+#       body bytea,
+#       created_at timestamp with time zone NOT NULL DEFAULT now(),
+#       expires_at timestamp with time zone NOT NULL,
+#       UNIQUE (user_id, key)
+#   );
+#   CREATE INDEX auth_app_idempotency_key_expires_idx ON auth_app_idempotency_key (expires_at);
+class IdempotencyKey(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    user_id = models.IntegerField()
+    key = models.CharField(max_length=255)
+    # sha256 від методу, шляху і тіла запиту
+    fingerprint = models.CharField(max_length=64)
+    # NULL - запит ще виконується
+    status_code = models.SmallIntegerField(null=True)
+    content_type = models.CharField(max_length=100, null=True)
+    location = models.CharField(max_length=500, null=True)
+    body = models.BinaryField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = 'auth_app_idempotency_key'
+        unique_together = (('user_id', 'key'),)
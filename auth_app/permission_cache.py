@@ -0,0 +1,117 @@
+"""
+Скомпільована матриця дозволів.
+
+Дозволи груп змінюються рідко (setup_roles, sync_user_groups, адмінка), а
+перевіряються на кожному запиті. Тому кожен воркер один раз завантажує всі
+пари група -> дозвіл одним запитом і тримає їх у незмінній структурі
+(frozenset на групу та на роль). has_perm після цього - лише пошук у множині.
+
+Матриця прив'язана до лічильника версії в БД (PermissionVersion), який
+збільшують setup_roles, sync_user_groups і сигнали при зміні дозволів груп.
+Воркер перечитує лічильник не частіше ніж раз на PERMISSION_VERSION_TTL секунд
+(значення кешується в Django cache), і перебудовує матрицю, коли він змінився.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+PERMISSION_VERSION_KEY = 'auth_app:permission_version'
+
+
+class PermissionMatrix:
+    __slots__ = ('version', 'by_group', 'by_role')
+
+    def __init__(self, version, by_group, by_role):
+        self.version = version
+        self.by_group = by_group
+        self.by_role = by_role
+
+
+_lock = threading.Lock()
+_matrix = None
+
+
+def _version_ttl():
+    return getattr(settings, 'PERMISSION_VERSION_TTL', 30)
+
+
+def get_permission_version():
+    """
+    Повертає поточну версію дозволів (з кешу або з лічильника в БД).
+    """
+    version = cache.get(PERMISSION_VERSION_KEY)
+    if version is None:
+        from .models import PermissionVersion
+        version = PermissionVersion.current()
+        cache.set(PERMISSION_VERSION_KEY, version, _version_ttl())
+    return version
+
+
+def bump_permission_version():
+    """
+    Збільшує лічильник версії в БД. Поточний процес (і воркери зі спільним
+    кешем) бачать нову версію одразу, інші - протягом PERMISSION_VERSION_TTL.
+    """
+    from .models import PermissionVersion
+    version = PermissionVersion.bump()
+    cache.set(PERMISSION_VERSION_KEY, version, _version_ttl())
+    return version
+
+
+def _compile(version):
+    rows = (Group.permissions.through.objects
+            .values_list('group_id', 'group__name',
+                         'permission__content_type__app_label', 'permission__codename'))
+    by_group, by_role = {}, {}
+    for group_id, group_name, app_label, codename in rows:
+        perm = f"{app_label}.{codename}"
+        by_group.setdefault(group_id, set()).add(perm)
+        by_role.setdefault(group_name, set()).add(perm)
+    return PermissionMatrix(
+        version,
+        {group_id: frozenset(perms) for group_id, perms in by_group.items()},
+        {role: frozenset(perms) for role, perms in by_role.items()},
+    )
+
+
+def get_matrix(version=None):
+    global _matrix
+    if version is None:
+        version = get_permission_version()
+    matrix = _matrix
+    if matrix is None or matrix.version != version:
+        with _lock:
+            matrix = _matrix
+            if matrix is None or matrix.version != version:
+                matrix = _matrix = _compile(version)
+    return matrix
+
+
+def get_group_permissions(group_ids, version=None):
+    """
+    Повертає frozenset дозволів виду 'app_label.codename' для набору груп.
+    """
+    by_group = get_matrix(version).by_group
+    if len(group_ids) == 1:
+        return by_group.get(group_ids[0], frozenset())
+    return frozenset().union(*(by_group.get(group_id, ()) for group_id in group_ids))
+
+
+def get_role_permissions(role, version=None):
+    return get_matrix(version).by_role.get(role, frozenset())
+
+
+def warm_up():
+    """
+    Завантажує матрицю при старті воркера, щоб перший запит не платив за це.
+    """
+    try:
+        get_matrix()
+    except DatabaseError as e:
+        logger.warning(f"Permission matrix was not preloaded: {str(e)}")
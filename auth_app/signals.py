@@ -0,0 +1,59 @@
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import UserCredentials, UserCredentialsGroups
+from .permission_cache import bump_permission_version
+from .user_cache import invalidate_user, invalidate_users
+from .username_index import username_index
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, action, **kwargs):
+    # Змінився склад дозволів групи - інвалідуємо кеш у всіх воркерах
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_permission_version()
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def permission_rows_changed(sender, **kwargs):
+    bump_permission_version()
+
+
+@receiver(m2m_changed, sender=UserCredentialsGroups)
+def user_groups_changed(sender, instance, action, pk_set=None, **kwargs):
+    # user.groups.add()/remove()/clear() - скидаємо запам'ятовані групи на об'єкті
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if isinstance(instance, UserCredentials):
+        instance.clear_permission_cache()
+        invalidate_user(instance.pk)
+    elif pk_set:
+        # Зворотний бік зв'язку: group.user_credentials.add(...)
+        invalidate_users(pk_set)
+
+
+@receiver(post_save, sender=UserCredentialsGroups)
+@receiver(post_delete, sender=UserCredentialsGroups)
+def user_group_row_changed(sender, instance, **kwargs):
+    # Якщо рядок створено через вже завантажений об'єкт користувача - скидаємо його кеш
+    user = instance._state.fields_cache.get('user_credentials')
+    if user is not None:
+        user.clear_permission_cache()
+    invalidate_user(instance.user_credentials_id)
+
+
+@receiver(post_save, sender=UserCredentials)
+@receiver(post_delete, sender=UserCredentials)
+def user_credentials_changed(sender, instance, **kwargs):
+    # Зміна логіна, ролі чи пароля - кешований рядок більше не актуальний
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=UserCredentials)
+def username_saved(sender, instance, **kwargs):
+    # Новий або перейменований логін одразу потрапляє в індекс цього воркера
+    username_index.add(instance.username)
@@ -1,3 +1,131 @@
-from django.test import TestCase
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from auth_app import tokens, user_cache
+from auth_app.models import UserCredentials, UserCredentialsGroups
+from auth_app.throttling import admit
+
+TEST_LIMITS = {'login': {'ip': (3, 1.0), 'username': (2, 0.5)}}
+
+
+@override_settings(AUTH_RATE_LIMITS=TEST_LIMITS, AUTH_RATE_LIMITS_ENABLED=True)
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().post('/auth/api/login/', REMOTE_ADDR='10.0.0.1')
+
+    def admit_at(self, now, username=None):
+        with mock.patch('auth_app.throttling.time.time', return_value=now):
+            return admit(self.request, 'login', username)
+
+    def test_ip_bucket_allows_burst_then_rejects(self):
+        self.assertEqual([self.admit_at(100)[0] for _ in range(3)], [True, True, True])
+        self.assertEqual(self.admit_at(100), (False, 1))
+
+    def test_bucket_refills_at_rate(self):
+        for _ in range(3):
+            self.admit_at(100)
+        self.assertFalse(self.admit_at(100.5)[0])
+        self.assertTrue(self.admit_at(101)[0])
+
+    def test_username_bucket_reports_retry_after(self):
+        self.admit_at(100, 'alice')
+        self.admit_at(100, 'alice')
+        self.assertEqual(self.admit_at(100, 'alice'), (False, 2))
+        # Інший логін з тієї ж адреси має власне відро (відро IP за секунду отримує токен)
+        self.assertTrue(self.admit_at(101, 'bob')[0])
+
+    @override_settings(AUTH_RATE_LIMITS_ENABLED=False)
+    def test_disabled_limits_admit_everything(self):
+        self.assertTrue(all(self.admit_at(100, 'alice')[0] for _ in range(10)))
+
+
+class UserCacheHitTests(SimpleTestCase):
+    # SimpleTestCase забороняє запити до БД, тож будь-який запит при влучанні в кеш - помилка тесту
+    def setUp(self):
+        cache.clear()
+
+    def test_cache_hit_needs_no_queries(self):
+        cache.set(user_cache._cache_key(7), {'values': (7, 'coach', 'trainer', None), 'group_ids': (2, 3)})
+        user = user_cache.get_user(7)
+        self.assertEqual((user.pk, user.username, user.user_role), (7, 'coach', 'trainer'))
+        self.assertEqual(user.get_group_ids(), (2, 3))
+
+    def test_password_hash_is_not_cached(self):
+        self.assertNotIn('password', user_cache.USER_FIELDS)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Unmanaged auth tables are created for PostgreSQL only')
+class UserCacheRoundTripTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Таблиці некеровані - створюємо їх у тестовій БД на час тесту
+        with connection.schema_editor() as editor:
+            editor.create_model(UserCredentials)
+            editor.create_model(UserCredentialsGroups)
+
+    def setUp(self):
+        cache.clear()
+        self.user = UserCredentials.objects.create(username='cached', user_role='client', password='!')
+
+    def test_miss_costs_two_queries_and_hit_none(self):
+        with self.assertNumQueries(2):
+            user_cache.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            user = user_cache.get_user(self.user.pk)
+            user.get_group_ids()
+
+
+@mock.patch('auth_app.tokens.get_permission_version', return_value=4)
+class SignedTokenTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserCredentials(user_credential_id=7, username='coach', user_role='trainer',
+                                    password='pbkdf2_sha256$1$salt$hash')
+        self.user._group_ids_cache = (3, 2)
+        self.cache_row(role='trainer', group_ids=(2, 3))
+
+    def cache_row(self, role, group_ids):
+        cache.set(user_cache._cache_key(7), {'values': (7, 'coach', role, None), 'group_ids': group_ids})
+
+    def test_access_token_round_trip(self, _):
+        user = tokens.user_from_access_token(tokens.create_access_token(self.user))
+        self.assertEqual((user.pk, user.user_role), (7, 'trainer'))
+
+    def test_tampered_access_token_is_rejected(self, _):
+        token = tokens.create_access_token(self.user)
+        with self.assertRaisesMessage(tokens.TokenError, 'Invalid token'):
+            tokens.user_from_access_token(token[:-2] + ('A' if token[-2] != 'A' else 'B') + token[-1])
+
+    def test_permission_version_change_revokes_access_token(self, version):
+        token = tokens.create_access_token(self.user)
+        version.return_value = 5
+        with self.assertRaisesMessage(tokens.TokenError, 'Token permissions are outdated'):
+            tokens.user_from_access_token(token)
+
+    def test_role_or_group_change_revokes_access_token(self, _):
+        token = tokens.create_access_token(self.user)
+        self.cache_row(role='client', group_ids=(2, 3))
+        with self.assertRaisesMessage(tokens.TokenError, 'Token permissions are outdated'):
+            tokens.user_from_access_token(token)
+        self.cache_row(role='trainer', group_ids=(2,))
+        with self.assertRaisesMessage(tokens.TokenError, 'Token permissions are outdated'):
+            tokens.user_from_access_token(token)
+
+    def test_refresh_stamp_follows_password_hash(self, _):
+        payload = tokens.refresh_token_payload(tokens.create_refresh_token(self.user))
+        self.assertEqual(payload['uid'], 7)
+        tokens.check_refresh_stamp(payload, self.user.password)
+        with self.assertRaisesMessage(tokens.TokenError, 'Token has been revoked'):
+            tokens.check_refresh_stamp(payload, 'pbkdf2_sha256$1$salt$other')
+        with self.assertRaisesMessage(tokens.TokenError, 'Token has been revoked'):
+            tokens.check_refresh_stamp({'uid': 7}, self.user.password)
+
+    def test_access_token_is_not_a_refresh_token(self, _):
+        with self.assertRaisesMessage(tokens.TokenError, 'Invalid token'):
+            tokens.refresh_token_payload(tokens.create_access_token(self.user))
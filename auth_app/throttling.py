@@ -0,0 +1,85 @@
+"""
+Обмеження частоти логінів і реєстрацій (admission control).
+
+Для кожної IP-адреси та кожного логіна в Django cache зберігається token
+bucket: (кількість токенів, час останнього оновлення). Запит, для якого в
+будь-якому з відер немає токена, відхиляється ще до перевірки пароля, тож
+перебір облікових даних не витрачає CPU на PBKDF2.
+
+Оновлення відра не атомарне (get + set), тому при одночасних запитах ліміт
+може бути перевищений на кілька спроб - для захисту від перебору цього
+достатньо. Лічильники прийнятих і відхилених запитів також лежать у кеші.
+AUTH_RATE_LIMITS_ENABLED = False вимикає відра (для bench_login).
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+BUCKET_KEY = 'auth_app:bucket:{scope}:{kind}:{value}'
+COUNTER_KEY = 'auth_app:admission:{}'
+
+# scope -> вид ключа -> (місткість відра, поповнення токенів за секунду)
+DEFAULT_RATE_LIMITS = {
+    'login': {'ip': (20, 20 / 60), 'username': (10, 10 / 600)},
+    'register': {'ip': (5, 5 / 600)},
+}
+
+
+def get_client_ip(request):
+    # За nginx реальна адреса клієнта передається в X-Real-IP
+    return request.META.get('HTTP_X_REAL_IP') or request.META.get('REMOTE_ADDR', '')
+
+
+def _take_token(key, capacity, rate, now):
+    tokens, updated_at = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + (now - updated_at) * rate)
+    if tokens < 1:
+        return False, (1 - tokens) / rate
+    cache.set(key, (tokens - 1, now), timeout=math.ceil(capacity / rate) + 1)
+    return True, 0
+
+
+def _increment(name):
+    key = COUNTER_KEY.format(name)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def admit(request, scope, username=None):
+    """
+    Повертає (allowed, retry_after_seconds) для спроби логіна/реєстрації.
+    """
+    if not getattr(settings, 'AUTH_RATE_LIMITS_ENABLED', True):
+        _increment(f'{scope}_allowed')
+        return True, 0
+    limits = getattr(settings, 'AUTH_RATE_LIMITS', DEFAULT_RATE_LIMITS)[scope]
+    now = time.time()
+    checks = [('ip', get_client_ip(request))]
+    if username and 'username' in limits:
+        # Логін хешується, щоб ключ кешу був коротким і без довільних символів
+        checks.append(('username', hashlib.sha256(username.encode('utf-8')).hexdigest()[:32]))
+
+    for kind, value in checks:
+        capacity, rate = limits[kind]
+        key = BUCKET_KEY.format(scope=scope, kind=kind, value=value)
+        allowed, retry_after = _take_token(key, capacity, rate, now)
+        if not allowed:
+            _increment(f'{scope}_rejected_{kind}')
+            return False, math.ceil(retry_after)
+
+    _increment(f'{scope}_allowed')
+    return True, 0
+
+
+def get_admission_counters():
+    names = [f'{scope}_{suffix}'
+             for scope, limits in getattr(settings, 'AUTH_RATE_LIMITS', DEFAULT_RATE_LIMITS).items()
+             for suffix in ['allowed'] + [f'rejected_{kind}' for kind in limits]]
+    values = cache.get_many([COUNTER_KEY.format(name) for name in names])
+    return {name: values.get(COUNTER_KEY.format(name), 0) for name in names}
@@ -0,0 +1,98 @@
+"""
+Підписані короткоживучі токени доступу для API.
+
+Токен - це payload, підписаний HMAC з SECRET_KEY (django.core.signing), тому
+для його перевірки не потрібна таблиця сесій. У payload вшиті id, логін, роль,
+групи користувача та штамп версії дозволів: після зміни дозволів груп старі
+токени перестають прийматися, і клієнт отримує новий через refresh-ендпоінт.
+Роль і групи з токена звіряються з рядком користувача з user_cache (звернення
+до кешу, БД лише при промаху), тож зміна ролі чи членства в групах теж
+відкликає видані access-токени.
+
+Refresh-токен містить id користувача і штамп - короткий HMAC від хешу його
+пароля. Зміна пароля (або його скидання) змінює штамп, і всі видані раніше
+refresh-токени перестають прийматися.
+"""
+from django.conf import settings
+from django.core import signing
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from . import user_cache
+from .permission_cache import get_permission_version
+
+ACCESS_TOKEN_SALT = 'auth_app.tokens.access'
+REFRESH_TOKEN_SALT = 'auth_app.tokens.refresh'
+
+
+class TokenError(Exception):
+    pass
+
+
+def access_token_lifetime():
+    return getattr(settings, 'ACCESS_TOKEN_LIFETIME', 300)
+
+
+def _refresh_lifetime():
+    return getattr(settings, 'REFRESH_TOKEN_LIFETIME', 7 * 24 * 3600)
+
+
+def create_access_token(user):
+    payload = {
+        'uid': user.pk,
+        'usr': user.username,
+        'role': user.user_role,
+        'gids': list(user.get_group_ids()),
+        'pv': get_permission_version(),
+    }
+    return signing.dumps(payload, salt=ACCESS_TOKEN_SALT, compress=True)
+
+
+def credential_stamp(password_hash):
+    return salted_hmac(REFRESH_TOKEN_SALT + '.stamp', password_hash, algorithm='sha256').hexdigest()[:16]
+
+
+def create_refresh_token(user):
+    return signing.dumps({'uid': user.pk, 'st': credential_stamp(user.password)}, salt=REFRESH_TOKEN_SALT)
+
+
+def create_token_pair(user):
+    return {
+        'access': create_access_token(user),
+        'refresh': create_refresh_token(user),
+        'expires_in': access_token_lifetime(),
+    }
+
+
+def _loads(token, salt, max_age):
+    try:
+        return signing.loads(token, salt=salt, max_age=max_age)
+    except signing.SignatureExpired:
+        raise TokenError('Token expired')
+    except signing.BadSignature:
+        raise TokenError('Invalid token')
+
+
+def user_from_access_token(token):
+    """
+    Повертає користувача токена з user_cache, якщо його роль і групи не
+    змінилися з моменту видачі токена.
+    """
+    payload = _loads(token, ACCESS_TOKEN_SALT, access_token_lifetime())
+    if payload.get('pv') != get_permission_version():
+        raise TokenError('Token permissions are outdated')
+    user = user_cache.get_user(payload['uid'])
+    if user is None:
+        raise TokenError('User not found')
+    if user.user_role != payload['role'] or sorted(user.get_group_ids()) != sorted(payload['gids']):
+        raise TokenError('Token permissions are outdated')
+    return user
+
+
+def refresh_token_payload(token):
+    return _loads(token, REFRESH_TOKEN_SALT, _refresh_lifetime())
+
+
+def check_refresh_stamp(payload, password_hash):
+    """Перевіряє, що refresh-токен виданий для поточного хешу пароля користувача."""
+    if not constant_time_compare(payload.get('st', ''), credential_stamp(password_hash)):
+        raise TokenError('Token has been revoked')
@@ -19,4 +19,7 @@ urlpatterns = [
     path('auth/api/check-user/', views.api_check_user, name='api_check_user'),
     path('auth/api/login/', views.LoginView.as_view(), name='api_login'),
     path('auth/api/user/permissions/', views.UserPermissionsView.as_view(), name='user_permissions'),
+    path('auth/api/token/', views.TokenObtainView.as_view(), name='api_token_obtain'),
+    path('auth/api/token/refresh/', views.TokenRefreshView.as_view(), name='api_token_refresh'),
+    path('auth/api/admission-stats/', views.AdmissionStatsView.as_view(), name='api_admission_stats'),
 ]
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Короткоживучий кеш рядка user_credentials для UserCredentialsBackend.get_user.
+
+Кожен автентифікований запит завантажує користувача з сесії. Рядок разом з
+ідентифікаторами груп кешується на AUTH_USER_CACHE_TTL секунд і видаляється з
+кешу сигналами при зміні логіна, ролі, пароля або груп користувача. Хеш пароля
+в кеш не потрапляє: логін і refresh-ендпоінт читають його з БД.
+
+Сигнали скидають кеш лише в тому бекенді, де їх обробили, тому для кількох
+воркерів gunicorn потрібен спільний бекенд кешу (Redis, Memcached); з
+LocMemCache інші воркери бачать стару роль до AUTH_USER_CACHE_TTL. Зміни через
+QuerySet.update() сигналів не надсилають - після них кеш скидається явно
+(invalidate_user / invalidate_users).
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import UserCredentials, UserCredentialsGroups
+
+USER_CACHE_KEY = 'auth_app:user:{}'
+USER_FIELDS = ('user_credential_id', 'username', 'user_role', 'last_login')
+
+
+def _cache_key(user_id):
+    return USER_CACHE_KEY.format(user_id)
+
+
+def get_user(user_id):
+    """
+    Повертає UserCredentials з кешу або з БД. None, якщо користувача не існує.
+    Поле password відкладене: звернення до нього піде в БД.
+    """
+    key = _cache_key(user_id)
+    data = cache.get(key)
+    if data is None:
+        values = (UserCredentials.objects
+                  .filter(pk=user_id)
+                  .values_list(*USER_FIELDS)
+                  .first())
+        if values is None:
+            return None
+        group_ids = tuple(
+            UserCredentialsGroups.objects
+            .filter(user_credentials_id=user_id)
+            .values_list('group_id', flat=True)
+        )
+        data = {'values': values, 'group_ids': group_ids}
+        cache.set(key, data, getattr(settings, 'AUTH_USER_CACHE_TTL', 60))
+
+    user = UserCredentials.from_db('default', USER_FIELDS, data['values'])
+    user._group_ids_cache = data['group_ids']
+    return user
+
+
+def invalidate_user(user_id):
+    cache.delete(_cache_key(user_id))
+
+
+def invalidate_users(user_ids):
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
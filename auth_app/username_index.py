@@ -0,0 +1,110 @@
+"""
+Перевірка доступності логіна без запиту до БД у типовому випадку.
+
+Форма реєстрації перевіряє логін на кожне натискання клавіші, і майже завжди
+відповідь - "вільний". Кожен воркер тримає фільтр Блума з усіх логінів:
+якщо логіна у фільтрі немає, він гарантовано вільний і БД не потрібна.
+Якщо фільтр каже "можливо зайнятий", відповідь підтверджується запитом exists().
+
+Фільтр доповнюється новими рядками (user_credential_id > останнього відомого)
+не частіше ніж раз на USERNAME_INDEX_REFRESH секунд, логінами, збереженими в
+цьому процесі, і повністю перебудовується раз на USERNAME_INDEX_REBUILD секунд
+(щоб підхопити перейменування та рядки, закомічені не в порядку id).
+Остаточною гарантією унікальності залишається unique-обмеження в БД.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+
+from .models import UserCredentials
+
+FALSE_POSITIVE_RATE = 0.01
+MIN_CAPACITY = 10000
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=FALSE_POSITIVE_RATE):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class UsernameIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._max_id = 0
+        self._refreshed_at = 0.0
+        self._built_at = 0.0
+
+    def _rebuild(self):
+        total = UserCredentials.objects.count()
+        bloom = BloomFilter(max(MIN_CAPACITY, total * 2))
+        max_id = 0
+        rows = UserCredentials.objects.values_list('user_credential_id', 'username').iterator(chunk_size=10000)
+        for user_id, username in rows:
+            bloom.add(username)
+            max_id = max(max_id, user_id)
+        self._bloom, self._max_id = bloom, max_id
+        self._built_at = self._refreshed_at = time.monotonic()
+
+    def _refresh(self):
+        rows = (UserCredentials.objects
+                .filter(user_credential_id__gt=self._max_id)
+                .values_list('user_credential_id', 'username'))
+        for user_id, username in rows:
+            self._bloom.add(username)
+            self._max_id = max(self._max_id, user_id)
+        self._refreshed_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if (self._bloom is not None
+                and now - self._refreshed_at < getattr(settings, 'USERNAME_INDEX_REFRESH', 5)):
+            return
+        with self._lock:
+            if (self._bloom is None
+                    or self._bloom.count > self._bloom.capacity
+                    or now - self._built_at > getattr(settings, 'USERNAME_INDEX_REBUILD', 300)):
+                self._rebuild()
+            elif now - self._refreshed_at >= getattr(settings, 'USERNAME_INDEX_REFRESH', 5):
+                self._refresh()
+
+    def add(self, username):
+        bloom = self._bloom
+        if bloom is not None:
+            with self._lock:
+                bloom.add(username)
+
+    def is_available(self, username):
+        self._ensure_fresh()
+        if username not in self._bloom:
+            return True
+        # Можливий хибнопозитивний результат фільтра - підтверджуємо в БД
+        return not UserCredentials.objects.filter(username=username).exists()
+
+
+username_index = UsernameIndex()
+
+
+def is_username_available(username):
+    return username_index.is_available(username)
@@ -7,7 +7,6 @@ from django.shortcuts import render
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.hashers import make_password
 from django.contrib import messages
 from django.contrib.auth.models import Group
 from .models import UserCredentials
@@ -15,8 +14,15 @@ from django.http import JsonResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny
 from .serializers import UserCredentialsSerializer
+from . import tokens, user_cache
+from .hashing import PasswordHashingBusy, hash_password
+from .throttling import admit, get_admission_counters
+from .username_index import is_username_available
+from django.db import IntegrityError
+
+USER_BACKEND = 'auth_app.backends.UserCredentialsBackend'
 
 def register(request):
     if request.user.is_authenticated:
@@ -37,26 +43,42 @@ def register(request):
             messages.error(request, 'Password must be at least 6 characters long')
         elif password != password_confirm:
             messages.error(request, 'Passwords do not match')
-        elif UserCredentials.objects.filter(username=username).exists():
+        elif not is_username_available(username):
             messages.error(request, 'Username already exists')
         else:
+            # Ліміт перевіряється до хешування, щоб флуд не витрачав CPU
+            allowed, retry_after = admit(request, 'register')
+            if not allowed:
+                messages.error(request, f'Забагато спроб реєстрації. Спробуйте через {retry_after} с.')
+                return render(request, 'auth_app/register.html', status=429)
+            try:
+                # Пароль хешується один раз, в обмеженому пулі процесів
+                password_hash = hash_password(password)
+            except PasswordHashingBusy:
+                messages.error(request, 'Сервер перевантажений. Спробуйте ще раз за хвилину.')
+                return render(request, 'auth_app/register.html')
+
             # Створення користувача
             user = UserCredentials(
                 username=username,
-                password=make_password(password),
+                password=password_hash,
                 user_role='client'
             )
-            user.save()
+            try:
+                user.save()
+            except IntegrityError:
+                # Логін зайняли між перевіркою та збереженням
+                messages.error(request, 'Username already exists')
+                return render(request, 'auth_app/register.html')
 
             # Додавання до групи client
             try:
                 client_group = Group.objects.get(name='client')
                 user.groups.add(client_group)
                 messages.success(request, 'Регістрація успішна!')
-                user = authenticate(request, username=username, password=password)
-                if user is not None:
-                    login(request, user)
-                    return redirect('create_profile')
+                # Повторна автентифікація не потрібна - вона б хешувала пароль вдруге
+                login(request, user, backend=USER_BACKEND)
+                return redirect('create_profile')
             except Group.DoesNotExist:
                 messages.error(request, 'Error: Client group not found. Contact admin.')
                 user.delete()
@@ -75,7 +97,15 @@ def login_view(request):
         if not username or not password:
             messages.error(request, 'Username and password are required')
         else:
-            user = authenticate(request, username=username, password=password)
+            allowed, retry_after = admit(request, 'login', username)
+            if not allowed:
+                messages.error(request, f'Забагато спроб входу. Спробуйте через {retry_after} с.')
+                return render(request, 'auth_app/login.html', status=429)
+            try:
+                user = authenticate(request, username=username, password=password)
+            except PasswordHashingBusy:
+                messages.error(request, 'Сервер перевантажений. Спробуйте ще раз за хвилину.')
+                return render(request, 'auth_app/login.html')
             if user is not None:
                 login(request, user)
                 messages.success(request, f'Ласкаво просимо, {user.username}!')
@@ -99,6 +129,18 @@ def home(request):
 
 
 
+def _hashing_busy_response():
+    response = JsonResponse({'error': 'Server is busy, try again later'}, status=503)
+    response['Retry-After'] = '5'
+    return response
+
+
+def _throttled_response(retry_after):
+    response = JsonResponse({'error': 'Too many attempts, try again later'}, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
 # API-ендпоінти для мікросервісів
 def api_register(request):
     if request.method == 'POST':
@@ -114,21 +156,30 @@ def api_register(request):
             return JsonResponse({'error': 'Password must be at least 6 characters long'}, status=400)
         if password != password_confirm:
             return JsonResponse({'error': 'Passwords do not match'}, status=400)
-        if UserCredentials.objects.filter(username=username).exists():
+        if not is_username_available(username):
             return JsonResponse({'error': 'Username already exists'}, status=400)
 
+        allowed, retry_after = admit(request, 'register')
+        if not allowed:
+            return _throttled_response(retry_after)
+        try:
+            password_hash = hash_password(password)
+        except PasswordHashingBusy:
+            return _hashing_busy_response()
+
         user = UserCredentials(
             username=username,
-            password=make_password(password),
+            password=password_hash,
             user_role='client'
         )
-        user.save()
+        try:
+            user.save()
+        except IntegrityError:
+            return JsonResponse({'error': 'Username already exists'}, status=400)
         try:
             client_group = Group.objects.get(name='client')
             user.groups.add(client_group)
-            user = authenticate(request, username=username, password=password)
-            if user:
-                login(request, user)
+            login(request, user, backend=USER_BACKEND)
             return JsonResponse({
                 'message': 'Registration successful',
                 'username': username,
@@ -148,7 +199,13 @@ def api_login(request):
         if not username or not password:
             return JsonResponse({'error': 'Username and password are required'}, status=400)
 
-        user = authenticate(request, username=username, password=password)
+        allowed, retry_after = admit(request, 'login', username)
+        if not allowed:
+            return _throttled_response(retry_after)
+        try:
+            user = authenticate(request, username=username, password=password)
+        except PasswordHashingBusy:
+            return _hashing_busy_response()
         if user is not None:
             login(request, user)
             return JsonResponse({
@@ -175,7 +232,7 @@ def api_check_user(request):
         username = request.GET.get('username', '').strip()
         if not username:
             return JsonResponse({'error': 'Username is required'}, status=400)
-        exists = UserCredentials.objects.filter(username=username).exists()
+        exists = not is_username_available(username)
         return JsonResponse({
             'username': username,
             'exists': exists
@@ -188,7 +245,13 @@ class LoginView(APIView):
     def post(self, request):
         username = request.data.get('username')
         password = request.data.get('password')
-        user = authenticate(request, username=username, password=password)
+        allowed, retry_after = admit(request, 'login', username)
+        if not allowed:
+            return _throttled_response(retry_after)
+        try:
+            user = authenticate(request, username=username, password=password)
+        except PasswordHashingBusy:
+            return _hashing_busy_response()
         if user:
             serializer = UserCredentialsSerializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -199,4 +262,61 @@ class UserPermissionsView(APIView):
 
     def get(self, request):
         serializer = UserCredentialsSerializer(request.user)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+
+class AdmissionStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.user_role != 'admin':
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(get_admission_counters())
+
+
+class TokenObtainView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        username = request.data.get('username')
+        password = request.data.get('password')
+        allowed, retry_after = admit(request, 'login', username)
+        if not allowed:
+            return _throttled_response(retry_after)
+        try:
+            user = authenticate(request, username=username, password=password)
+        except PasswordHashingBusy:
+            return _hashing_busy_response()
+        if user:
+            return Response(tokens.create_token_pair(user), status=status.HTTP_200_OK)
+        return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenRefreshView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        refresh = request.data.get('refresh')
+        if not refresh:
+            return Response({'error': 'Refresh token is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            payload = tokens.refresh_token_payload(refresh)
+        except tokens.TokenError as e:
+            return Response({'error': str(e)}, status=status.HTTP_401_UNAUTHORIZED)
+        # Хеш пароля для штампа читається з БД, а не з кешу: зміна пароля в будь-якому
+        # воркері одразу відкликає refresh-токени. Роль і групи - з кешованого рядка.
+        password_hash = (UserCredentials.objects.filter(pk=payload['uid'])
+                         .values_list('password', flat=True).first())
+        user = user_cache.get_user(payload['uid']) if password_hash is not None else None
+        if user is None:
+            return Response({'error': 'User not found'}, status=status.HTTP_401_UNAUTHORIZED)
+        try:
+            tokens.check_refresh_stamp(payload, password_hash)
+        except tokens.TokenError as e:
+            return Response({'error': str(e)}, status=status.HTTP_401_UNAUTHORIZED)
+        return Response({
+            'access': tokens.create_access_token(user),
+            'expires_in': tokens.access_token_lifetime(),
+        }, status=status.HTTP_200_OK)
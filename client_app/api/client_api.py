@@ -4,21 +4,38 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from django.db import IntegrityError
 from ..models import Client
+from ..ledger import get_balance, get_balances
 from auth_app.models import UserCredentials
 from training_app.models import Trainers
 from rest_framework import serializers
 import logging
+from sportmanagment.pagination import KeysetPagination
 
 logger = logging.getLogger(__name__)
 
+CLIENT_FILTERS = {
+    'trainer': 'trainer_id',
+    'user_credential': 'user_credential_id',
+    'email': 'email',
+    'phone': 'phone',
+}
+
 class ClientSerializer(serializers.ModelSerializer):
     user_credential = serializers.PrimaryKeyRelatedField(queryset=UserCredentials.objects.all())
     trainer = serializers.PrimaryKeyRelatedField(queryset=Trainers.objects.all(), allow_null=True)
+    # Баланс змінюється лише через журнал (client_app.ledger); clients.balance не оновлюється.
+    # Для списку баланси сторінки передаються в context['balances'] одним запитом get_balances.
+    balance = serializers.SerializerMethodField()
 
     class Meta:
         model = Client
         fields = ['user_id', 'first_name', 'last_name', 'email', 'phone', 'birth', 'gender', 'balance', 'created_at', 'updated_at', 'user_credential', 'trainer']
 
+    def get_balance(self, client):
+        balances = self.context.get('balances')
+        balance = balances[client.user_id] if balances is not None else get_balance(client.user_id)
+        return serializers.DecimalField(max_digits=10, decimal_places=2).to_representation(balance)
+
 class ClientListAPI(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -26,10 +43,12 @@ class ClientListAPI(APIView):
         if not request.user.has_perm('auth_app.view_clients'):
             logger.warning(f"User {request.user.username} attempted to access ClientListAPI without permission")
             return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
-        clients = Client.objects.all()
-        serializer = ClientSerializer(clients, many=True)
+        paginator = KeysetPagination('user_id', filters=CLIENT_FILTERS)
+        clients = paginator.paginate_queryset(Client.objects.all(), request)
+        balances = get_balances([client.user_id for client in clients])
+        serializer = ClientSerializer(clients, many=True, context={'balances': balances})
         logger.debug(f"ClientListAPI accessed by user: {request.user.username}")
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         if not request.user.has_perm('auth_app.add_clients'):
@@ -40,7 +59,7 @@ class ClientListAPI(APIView):
             try:
                 client = Client.objects.create(**serializer.validated_data)
                 logger.info(f"User {request.user.username} created client: {client.first_name} {client.last_name}")
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
+                return Response(ClientSerializer(client).data, status=status.HTTP_201_CREATED)
             except IntegrityError as e:
                 logger.error(f"User {request.user.username} failed to create client: {str(e)}")
                 return Response({"error": "Client with this email or phone already exists"}, status=status.HTTP_400_BAD_REQUEST)
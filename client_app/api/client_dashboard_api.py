@@ -0,0 +1,33 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from ..dashboard import get_dashboard
+from ..models import Client
+from ..profiles import get_client_profile
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ClientDashboardAPI(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.user_role != 'client':
+            logger.warning(f"User {request.user.username} (role: {request.user.user_role}) attempted to access ClientDashboardAPI")
+            return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            client = get_client_profile(request)
+        except Client.DoesNotExist:
+            return Response({"error": "Client profile not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        data, etag = get_dashboard(client)
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        # Відповідь персональна - лише кеш клієнта, з перевіркою через If-None-Match
+        response['Cache-Control'] = 'private, no-cache'
+        return response
@@ -7,6 +7,7 @@ from ..models import ClientFeedback, Client
 from training_app.models import Trainers
 from rest_framework import serializers
 import logging
+from sportmanagment.pagination import KeysetPagination
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +26,11 @@ class ClientFeedbackListAPI(APIView):
         if not request.user.has_perm('auth_app.view_client_feedbacks'):
             logger.warning(f"User {request.user.username} attempted to access ClientFeedbackListAPI without permission")
             return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
-        feedbacks = ClientFeedback.objects.all()
+        paginator = KeysetPagination('feedback_id', filters={'user': 'user_id', 'trainer': 'trainer_id'})
+        feedbacks = paginator.paginate_queryset(ClientFeedback.objects.all(), request)
         serializer = ClientFeedbackSerializer(feedbacks, many=True)
         logger.debug(f"ClientFeedbackListAPI accessed by user: {request.user.username}")
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         if not request.user.has_perm('auth_app.add_client_feedbacks'):
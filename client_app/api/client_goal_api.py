@@ -7,6 +7,7 @@ from ..models import ClientGoal, Client
 from gym_app.models import Goal
 from rest_framework import serializers
 import logging
+from sportmanagment.pagination import KeysetPagination
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +26,11 @@ class ClientGoalListAPI(APIView):
         if not request.user.has_perm('auth_app.view_client_goals'):
             logger.warning(f"User {request.user.username} attempted to access ClientGoalListAPI without permission")
             return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
-        goals = ClientGoal.objects.all()
+        paginator = KeysetPagination('client_goal_id', filters={'user': 'user_id', 'goal': 'goal_id'})
+        goals = paginator.paginate_queryset(ClientGoal.objects.all(), request)
         serializer = ClientGoalSerializer(goals, many=True)
         logger.debug(f"ClientGoalListAPI accessed by user: {request.user.username}")
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         if not request.user.has_perm('auth_app.add_client_goals'):
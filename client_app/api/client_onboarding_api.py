@@ -0,0 +1,43 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from django.contrib.auth.models import Group
+from auth_app.hashing import PasswordHashingBusy
+from ..onboarding import onboard_clients
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Паролі з API хешуються у спільному пулі логінів (PASSWORD_HASHING_WORKERS процесів),
+# тому більші імпорти виконуються командою onboard_clients
+MAX_ROWS = 200
+
+
+class ClientOnboardingAPI(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not request.user.has_perms(['auth_app.add_user_credentials', 'auth_app.add_clients']):
+            logger.warning(f"User {request.user.username} attempted bulk client onboarding without permission")
+            return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+        rows = request.data.get('rows')
+        if not isinstance(rows, list) or not rows:
+            return Response({"error": "Field 'rows' must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > MAX_ROWS:
+            return Response({"error": f"At most {MAX_ROWS} rows per request; use the onboard_clients command for larger imports"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not all(isinstance(row, dict) for row in rows):
+            return Response({"error": "Every row must be an object"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            report = onboard_clients(rows)
+        except Group.DoesNotExist:
+            logger.error("Bulk onboarding failed: client group not found")
+            return Response({"error": "Client group not found"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        except PasswordHashingBusy:
+            logger.warning(f"Bulk onboarding by {request.user.username} rejected: password hashing pool is busy")
+            response = Response({"error": "Server is busy, try again later"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = '5'
+            return response
+        logger.info(f"User {request.user.username} onboarded {report['created']} clients ({report['failed']} failed)")
+        return Response(report, status=status.HTTP_200_OK)
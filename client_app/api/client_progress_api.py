@@ -7,9 +7,13 @@ from ..models import ClientProgress, Client
 from training_app.models import TrainingSessions
 from rest_framework import serializers
 import logging
+from sportmanagment.pagination import KeysetPagination
+from sportmanagment.streaming import export_requested, stream_export
 
 logger = logging.getLogger(__name__)
 
+PROGRESS_EXPORT_FIELDS = ('progress_id', 'result', 'feedback', 'user', 'session')
+
 class ClientProgressSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=Client.objects.all())
     session = serializers.PrimaryKeyRelatedField(queryset=TrainingSessions.objects.all())
@@ -25,10 +29,14 @@ class ClientProgressListAPI(APIView):
         if not request.user.has_perm('auth_app.view_client_progress'):
             logger.warning(f"User {request.user.username} attempted to access ClientProgressListAPI without permission")
             return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
-        progress = ClientProgress.objects.all()
+        paginator = KeysetPagination('progress_id', filters={'user': 'user_id', 'session': 'session_id'})
+        if export_requested(request):
+            progress = paginator.filter_queryset(ClientProgress.objects.all(), request)
+            return stream_export(request, progress, PROGRESS_EXPORT_FIELDS)
+        progress = paginator.paginate_queryset(ClientProgress.objects.all(), request)
         serializer = ClientProgressSerializer(progress, many=True)
         logger.debug(f"ClientProgressListAPI accessed by user: {request.user.username}")
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         if not request.user.has_perm('auth_app.add_client_progress'):
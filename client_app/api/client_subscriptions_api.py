@@ -7,6 +7,8 @@ from ..models import ClientSubscription, Client
 from gym_app.models import Subscription
 from rest_framework import serializers
 import logging
+from auth_app.idempotency import idempotent
+from sportmanagment.pagination import KeysetPagination
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +18,7 @@ class ClientSubscriptionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ClientSubscription
-        fields = ['user_subscription_id', 'start_date', 'end_date', 'user', 'subscription']
+        fields = ['user_subscription_id', 'start_date', 'end_date', 'user', 'subscription', 'auto_renew']
 
 class ClientSubscriptionListAPI(APIView):
     permission_classes = [IsAuthenticated]
@@ -25,11 +27,13 @@ class ClientSubscriptionListAPI(APIView):
         if not request.user.has_perm('auth_app.view_client_subscriptions'):
             logger.warning(f"User {request.user.username} attempted to access ClientSubscriptionListAPI without permission")
             return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
-        subscriptions = ClientSubscription.objects.all()
+        paginator = KeysetPagination('user_subscription_id', filters={'user': 'user_id', 'subscription': 'subscription_id'})
+        subscriptions = paginator.paginate_queryset(ClientSubscription.objects.all(), request)
         serializer = ClientSubscriptionSerializer(subscriptions, many=True)
         logger.debug(f"ClientSubscriptionListAPI accessed by user: {request.user.username}")
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
+    @idempotent
     def post(self, request):
         if not request.user.has_perm('auth_app.add_client_subscriptions'):
             logger.warning(f"User {request.user.username} attempted to create subscription without permission")
@@ -2,14 +2,21 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from ..models import ClientTrainingRegistration, Client
+from ..reservations import AlreadyRegistered, SessionFull, release_seat, reserve_seat, transfer_seat
+from training_app.conflicts import find_client_conflict
 from training_app.models import TrainingSessions
 from rest_framework import serializers
 import logging
+from auth_app.idempotency import idempotent
+from sportmanagment.pagination import KeysetPagination
+from sportmanagment.streaming import export_requested, stream_export
 
 logger = logging.getLogger(__name__)
 
+REGISTRATION_EXPORT_FIELDS = ('registration_id', 'user', 'session')
+
 class ClientTrainingRegistrationSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=Client.objects.all())
     session = serializers.PrimaryKeyRelatedField(queryset=TrainingSessions.objects.all())
@@ -25,22 +32,36 @@ class ClientTrainingRegistrationListAPI(APIView):
         if not request.user.has_perm('auth_app.view_client_training_registrations'):
             logger.warning(f"User {request.user.username} attempted to access ClientTrainingRegistrationListAPI without permission")
             return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
-        registrations = ClientTrainingRegistration.objects.all()
+        paginator = KeysetPagination('registration_id', filters={'user': 'user_id', 'session': 'session_id'})
+        if export_requested(request):
+            registrations = paginator.filter_queryset(ClientTrainingRegistration.objects.all(), request)
+            return stream_export(request, registrations, REGISTRATION_EXPORT_FIELDS)
+        registrations = paginator.paginate_queryset(ClientTrainingRegistration.objects.all(), request)
         serializer = ClientTrainingRegistrationSerializer(registrations, many=True)
         logger.debug(f"ClientTrainingRegistrationListAPI accessed by user: {request.user.username}")
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
+    @idempotent
     def post(self, request):
         if not request.user.has_perm('auth_app.add_client_training_registrations'):
             logger.warning(f"User {request.user.username} attempted to create registration without permission")
             return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
         serializer = ClientTrainingRegistrationSerializer(data=request.data)
         if serializer.is_valid():
+            client, session = serializer.validated_data['user'], serializer.validated_data['session']
+            conflicting_session_id = find_client_conflict(client.pk, session)
+            if conflicting_session_id is not None:
+                logger.warning(f"User {request.user.username} failed to create registration: overlaps session {conflicting_session_id}")
+                return Response({"error": "Client is already registered for an overlapping session",
+                                 "session_id": conflicting_session_id}, status=status.HTTP_409_CONFLICT)
             try:
-                registration = ClientTrainingRegistration.objects.create(**serializer.validated_data)
+                registration = reserve_seat(client, session.pk)
                 logger.info(f"User {request.user.username} created registration: {registration.registration_id}")
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
-            except IntegrityError as e:
+                return Response(ClientTrainingRegistrationSerializer(registration).data, status=status.HTTP_201_CREATED)
+            except SessionFull:
+                logger.warning(f"User {request.user.username} failed to create registration: session is full")
+                return Response({"error": "Session is full or not planned"}, status=status.HTTP_409_CONFLICT)
+            except AlreadyRegistered as e:
                 logger.error(f"User {request.user.username} failed to create registration: {str(e)}")
                 return Response({"error": "Registration for this user and session already exists"}, status=status.HTTP_400_BAD_REQUEST)
         logger.warning(f"User {request.user.username} failed to create registration: {serializer.errors}")
@@ -70,7 +91,17 @@ class ClientTrainingRegistrationDetailAPI(APIView):
             registration = ClientTrainingRegistration.objects.get(registration_id=registration_id)
             serializer = ClientTrainingRegistrationSerializer(registration, data=request.data, partial=True)
             if serializer.is_valid():
-                serializer.save()
+                session = serializer.validated_data.pop('session', None)
+                try:
+                    with transaction.atomic():
+                        if session is not None:
+                            # Зміна сесії переносить зайняте місце
+                            transfer_seat(registration, session.pk)
+                        serializer.save()
+                except SessionFull:
+                    return Response({"error": "Session is full or not planned"}, status=status.HTTP_409_CONFLICT)
+                except (AlreadyRegistered, IntegrityError):
+                    return Response({"error": "Registration for this user and session already exists"}, status=status.HTTP_400_BAD_REQUEST)
                 logger.info(f"User {request.user.username} updated registration: {registration.registration_id}")
                 return Response(serializer.data)
             logger.warning(f"User {request.user.username} failed to update registration: {serializer.errors}")
@@ -86,7 +117,7 @@ class ClientTrainingRegistrationDetailAPI(APIView):
         try:
             registration = ClientTrainingRegistration.objects.get(registration_id=registration_id)
             registration_id = registration.registration_id
-            registration.delete()
+            release_seat(registration)
             logger.info(f"User {request.user.username} deleted registration: {registration_id}")
             return Response(status=status.HTTP_204_NO_CONTENT)
         except ClientTrainingRegistration.DoesNotExist:
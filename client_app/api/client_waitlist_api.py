@@ -0,0 +1,44 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from ..models import Client, ClientTrainingRegistration
+from ..profiles import get_client_profile
+from ..reservations import leave_waitlist, waitlist_position
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ClientWaitlistAPI(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, session_id):
+        if not request.user.has_perm('auth_app.view_client_training_registrations'):
+            logger.warning(f"User {request.user.username} attempted to access ClientWaitlistAPI without permission")
+            return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            client = get_client_profile(request)
+        except Client.DoesNotExist:
+            return Response({"error": "Client profile not found"}, status=status.HTTP_404_NOT_FOUND)
+        position = waitlist_position(client, session_id)
+        registered = position is None and ClientTrainingRegistration.objects.filter(
+            user=client, session_id=session_id).exists()
+        return Response({
+            'session_id': session_id,
+            'position': position,
+            'registered': registered,
+        })
+
+    def delete(self, request, session_id):
+        if not request.user.has_perm('auth_app.delete_client_training_registrations'):
+            logger.warning(f"User {request.user.username} attempted to leave waitlist without permission")
+            return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            client = get_client_profile(request)
+        except Client.DoesNotExist:
+            return Response({"error": "Client profile not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not leave_waitlist(client, session_id):
+            return Response({"error": "Not in waitlist"}, status=status.HTTP_404_NOT_FOUND)
+        logger.info(f"User {request.user.username} left waitlist for session {session_id}")
+        return Response(status=status.HTTP_204_NO_CONTENT)
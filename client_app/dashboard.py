@@ -0,0 +1,135 @@
+"""
+Зведені дані головного екрана клієнта одним запитом.
+
+Профіль і тренер уже завантажені get_client_profile, а решта частин
+(баланс, абонементи, цілі, найближчі сесії з прапорцями реєстрації, останній
+прогрес) - це п'ять коротких індексних запитів, які виконуються послідовно
+через з'єднання самого запиту. Окремі потоки з власними з'єднаннями при
+CONN_MAX_AGE = 0 відкривали б нове з'єднання з БД на кожну частину.
+
+Готовий результат кешується на DASHBOARD_CACHE_TTL секунд разом з ETag
+(sha256 від JSON). Кеш клієнта скидається сигналами при зміні його
+абонементів, цілей, прогресу, реєстрацій, черги очікування та балансу.
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists, OuterRef, Q
+
+from training_app.lifecycle import ended
+from training_app.models import TrainingSessions
+from .entitlements import active_until
+from .ledger import get_balance
+from .models import ClientGoal, ClientProgress, ClientSubscription, ClientTrainingRegistration, \
+    SessionWaitlistEntry
+
+DASHBOARD_CACHE_KEY = 'client_app:dashboard:{}'
+UPCOMING_SESSIONS_LIMIT = 20
+RECENT_PROGRESS_LIMIT = 10
+
+def _cache_key(client_id):
+    return DASHBOARD_CACHE_KEY.format(client_id)
+
+
+def _subscriptions(client):
+    return list(ClientSubscription.objects
+                .filter(user_id=client.user_id, end_date__gt=datetime.now())
+                .order_by('start_date')
+                .values('user_subscription_id', 'start_date', 'end_date', 'auto_renew',
+                        'subscription_id', 'subscription__subscription_name'))
+
+
+def _goals(client):
+    return list(ClientGoal.objects
+                .filter(user_id=client.user_id)
+                .order_by('-assigned_at')
+                .values('client_goal_id', 'goal_id', 'goal__goal_name', 'description',
+                        'is_achieved', 'assigned_at'))
+
+
+def _upcoming_sessions(client):
+    # Сесії свого тренера і всі, на які клієнт уже записаний
+    visible = Q(is_registered=True)
+    if client.trainer_id:
+        visible |= Q(trainer_id=client.trainer_id)
+    sessions = (TrainingSessions.objects
+                .annotate(
+                    is_registered=Exists(ClientTrainingRegistration.objects.filter(
+                        session=OuterRef('pk'), user_id=client.user_id)),
+                    is_waitlisted=Exists(SessionWaitlistEntry.objects.filter(
+                        session=OuterRef('pk'), user_id=client.user_id)),
+                )
+                .filter(visible,
+                        status='заплановано',
+                        session_date__gte=datetime.now().date())
+                .exclude(ended())
+                .order_by('session_date', 'start_time', 'session_id')
+                .values('session_id', 'session_date', 'start_time', 'end_time', 'max_participants',
+                        'registered_count', 'training_type__title', 'location__location_name',
+                        'is_registered', 'is_waitlisted'))
+    return list(sessions[:UPCOMING_SESSIONS_LIMIT])
+
+
+def _recent_progress(client):
+    return list(ClientProgress.objects
+                .filter(user_id=client.user_id)
+                .order_by('-session__session_date', '-progress_id')
+                .values('progress_id', 'session_id', 'session__session_date', 'result', 'feedback')
+                [:RECENT_PROGRESS_LIMIT])
+
+
+def build_dashboard(client):
+    trainer = client.trainer
+    data = {
+        'profile': {
+            'user_id': client.user_id,
+            'first_name': client.first_name,
+            'last_name': client.last_name,
+            'email': client.email,
+            'phone': client.phone,
+            'birth': client.birth,
+            'gender': client.gender,
+        },
+        'trainer': trainer and {
+            'trainer_id': trainer.trainer_id,
+            'first_name': trainer.first_name,
+            'last_name': trainer.last_name,
+            'phone': trainer.phone,
+            'specialization': trainer.specialization,
+        },
+        # Інтервали абонементів зазвичай уже в кеші entitlements
+        'active_until': active_until(client.user_id),
+        'balance': get_balance(client.user_id),
+        'subscriptions': _subscriptions(client),
+        'goals': _goals(client),
+        'upcoming_sessions': _upcoming_sessions(client),
+        'recent_progress': _recent_progress(client),
+    }
+    return data
+
+
+def get_dashboard(client):
+    """
+    Повертає (data, etag) з кешу або будує дані заново.
+    """
+    key = _cache_key(client.user_id)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    data = build_dashboard(client)
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+    etag = '"{}"'.format(hashlib.sha256(body.encode('utf-8')).hexdigest()[:32])
+    cache.set(key, (data, etag), getattr(settings, 'DASHBOARD_CACHE_TTL', 30))
+    return data, etag
+
+
+def invalidate(client_id):
+    cache.delete(_cache_key(client_id))
+
+
+def invalidate_many(client_ids):
+    cache.delete_many([_cache_key(client_id) for client_id in client_ids])
@@ -0,0 +1,66 @@
+"""
+Перевірка права клієнта на послуги: чи є в нього активний абонемент у момент T
+і до якого часу.
+
+Для кожного клієнта кешуються інтервали (start_date, end_date) абонементів, що
+ще не закінчилися на момент завантаження. Вони читаються одним запитом по
+індексу
+    CREATE INDEX client_subscriptions_user_end_idx
+        ON "client_scheme"."client_subscriptions" (user_id, end_date);
+а далі перевірка - лише прохід по кількох інтервалах у пам'яті. Кеш скидається
+сигналами при збереженні/видаленні ClientSubscription і явно після масових
+змін (bulk_create/update сигналів не надсилають).
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import ClientSubscription
+
+ENTITLEMENT_CACHE_KEY = 'client_app:entitlement:{}'
+
+
+def _cache_key(client_id):
+    return ENTITLEMENT_CACHE_KEY.format(client_id)
+
+
+def _intervals(client_id):
+    key = _cache_key(client_id)
+    intervals = cache.get(key)
+    if intervals is None:
+        intervals = tuple(
+            ClientSubscription.objects
+            .filter(user_id=client_id, end_date__gt=datetime.now())
+            .order_by('end_date')
+            .values_list('start_date', 'end_date')
+        )
+        cache.set(key, intervals, getattr(settings, 'ENTITLEMENT_CACHE_TTL', 3600))
+    return intervals
+
+
+def active_until(client_id, at=None):
+    """
+    Кінець активного на момент at абонемента (найпізніший, якщо їх кілька)
+    з урахуванням абонементів, що починаються впритул до кінця попереднього.
+    None - активного абонемента немає.
+    """
+    at = at or datetime.now()
+    until = None
+    # Інтервали відсортовані за end_date, тож кожен підхоплений лише подовжує покриття
+    for start_date, end_date in _intervals(client_id):
+        if start_date <= (until or at) < end_date:
+            until = end_date
+    return until
+
+
+def has_active_subscription(client_id, at=None):
+    return active_until(client_id, at) is not None
+
+
+def invalidate(client_id):
+    cache.delete(_cache_key(client_id))
+
+
+def invalidate_many(client_ids):
+    cache.delete_many([_cache_key(client_id) for client_id in client_ids])
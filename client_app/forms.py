@@ -44,6 +44,10 @@ class PurchaseSubscriptionForm(forms.Form):
         label='Абонемент',
         empty_label='Виберіть абонемент'
     )
+    auto_renew = forms.BooleanField(
+        required=False,
+        label='Продовжувати автоматично'
+    )
 
 class ClientGoalForm(forms.ModelForm):
     class Meta:
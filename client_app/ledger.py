@@ -0,0 +1,91 @@
+"""
+Баланс клієнта як журнал рухів коштів.
+
+Кожне поповнення чи списання - один INSERT у BalanceLedgerEntry; рядок
+клієнта при цьому не переписується. Поточний баланс = знімок
+(BalanceSnapshot: сума згорнутих записів) + сума записів з folded = false.
+Знімки періодично доганяє команда compact_balance_ledger, перевіряє -
+reconcile_balance_ledger.
+
+Списання блокує рядок клієнта (SELECT ... FOR UPDATE), тому паралельні
+покупки одного клієнта виконуються по черзі і не заводять баланс у мінус.
+Поповнення блокування не потребують - вони лише збільшують суму.
+"""
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import BalanceLedgerEntry, BalanceSnapshot, Client
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0.00')
+BALANCE_FIELD = DecimalField(max_digits=10, decimal_places=2)
+
+
+class InsufficientFunds(Exception):
+    def __init__(self, balance, amount):
+        super().__init__(f"Balance {balance} is less than {amount}")
+        self.balance = balance
+        self.amount = amount
+
+
+def _balance_expression():
+    # Знімок і незгорнуті записи читаються одним оператором, тобто з одного знімка БД:
+    # згортання, закомічене між двома окремими запитами, не може врахувати запис двічі чи жодного разу
+    snapshot = Subquery(BalanceSnapshot.objects.filter(user_id=OuterRef('user_id')).values('balance'))
+    unfolded = Subquery(BalanceLedgerEntry.objects
+                        .filter(user_id=OuterRef('user_id'), folded=False)
+                        .values('user_id')
+                        .annotate(total=Sum('amount'))
+                        .values('total'))
+    return ExpressionWrapper(Coalesce(snapshot, Value(ZERO)) + Coalesce(unfolded, Value(ZERO)), output_field=BALANCE_FIELD)
+
+
+def get_balance(client_id):
+    balance = (Client.objects
+               .filter(user_id=client_id)
+               .annotate(current_balance=_balance_expression())
+               .values_list('current_balance', flat=True)
+               .first())
+    return ZERO if balance is None else balance
+
+
+def get_balances(client_ids):
+    """Баланси кількох клієнтів одним запитом: {client_id: balance}."""
+    balances = {client_id: ZERO for client_id in client_ids}
+    balances.update(Client.objects
+                    .filter(user_id__in=client_ids)
+                    .annotate(current_balance=_balance_expression())
+                    .values_list('user_id', 'current_balance'))
+    return balances
+
+
+def record(client_id, amount, kind, reference=None):
+    return BalanceLedgerEntry.objects.create(user_id=client_id, amount=amount, kind=kind, reference=reference)
+
+
+def top_up(client_id, amount, reference=None):
+    entry = record(client_id, amount, 'top_up', reference)
+    logger.info(f"Client {client_id} balance topped up by {amount} (entry {entry.entry_id})")
+    return entry
+
+
+def charge(client_id, amount, kind='purchase', reference=None):
+    """
+    Списує amount з балансу або кидає InsufficientFunds. Якщо викликається
+    всередині transaction.atomic, блокування клієнта тримається до кінця
+    зовнішньої транзакції - разом із пов'язаними вставками (наприклад, абонемента).
+    """
+    with transaction.atomic():
+        # Блокування лише серіалізує списання; сам рядок клієнта не змінюється
+        list(Client.objects.select_for_update().filter(user_id=client_id).values_list('user_id'))
+        balance = get_balance(client_id)
+        if balance < amount:
+            raise InsufficientFunds(balance, amount)
+        entry = record(client_id, -amount, kind, reference)
+    logger.info(f"Client {client_id} charged {amount} for {kind} (entry {entry.entry_id})")
+    return entry
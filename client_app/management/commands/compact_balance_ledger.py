@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from client_app.ledger import ZERO
+from client_app.models import BalanceLedgerEntry, BalanceSnapshot, Client
+
+
+class Command(BaseCommand):
+    help = 'Fold unfolded balance ledger entries into per-client snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Clients per transaction')
+
+    def handle(self, *args, **options):
+        after, compacted, folded = 0, 0, 0
+        while True:
+            client_ids = list(Client.objects.filter(user_id__gt=after)
+                              .order_by('user_id')
+                              .values_list('user_id', flat=True)[:options['chunk_size']])
+            if not client_ids:
+                break
+            after = client_ids[-1]
+
+            with transaction.atomic():
+                snapshots = {
+                    snapshot.user_id: snapshot
+                    for snapshot in BalanceSnapshot.objects.select_for_update().filter(user_id__in=client_ids)
+                }
+                # Згортаються лише видимі (закомічені) записи, і саме вони позначаються folded.
+                # Запис транзакції, що ще триває, лишається незгорнутим і буде врахований наступним проходом,
+                # тож водяний знак за entry_id не може його "перестрибнути".
+                entries = list(BalanceLedgerEntry.objects
+                               .select_for_update()
+                               .filter(user_id__in=client_ids, folded=False)
+                               .values_list('entry_id', 'user_id', 'amount'))
+                if not entries:
+                    continue
+                deltas, last_ids = {}, {}
+                for entry_id, user_id, amount in entries:
+                    deltas[user_id] = deltas.get(user_id, ZERO) + amount
+                    last_ids[user_id] = max(last_ids.get(user_id, 0), entry_id)
+
+                updated = []
+                for user_id, delta in deltas.items():
+                    snapshot = snapshots.get(user_id)
+                    updated.append(BalanceSnapshot(
+                        user_id=user_id,
+                        balance=(snapshot.balance if snapshot else ZERO) + delta,
+                        last_entry_id=max(snapshot.last_entry_id if snapshot else 0, last_ids[user_id]),
+                        updated_at=timezone.now(),
+                    ))
+                BalanceSnapshot.objects.bulk_create(
+                    updated,
+                    update_conflicts=True,
+                    unique_fields=['user'],
+                    update_fields=['balance', 'last_entry_id', 'updated_at'],
+                )
+                BalanceLedgerEntry.objects.filter(entry_id__in=[entry[0] for entry in entries]).update(folded=True)
+            compacted += len(updated)
+            folded += len(entries)
+
+        self.stdout.write(self.style.SUCCESS(f'Folded {folded} ledger entries into {compacted} client snapshots'))
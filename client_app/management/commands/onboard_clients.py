@@ -0,0 +1,38 @@
+import csv
+import json
+
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+
+from client_app.onboarding import DEFAULT_CHUNK_SIZE, onboard_clients
+
+
+class Command(BaseCommand):
+    help = ('Bulk-create client accounts from a CSV file with columns '
+            'username,password,first_name,last_name,email,phone,birth,gender')
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--report', help='Write the per-row report as JSON to this file')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['csv_path'], newline='', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+        except OSError as e:
+            raise CommandError(str(e))
+
+        try:
+            report = onboard_clients(rows, chunk_size=options['chunk_size'], all_cores=True)
+        except Group.DoesNotExist:
+            raise CommandError('Client group not found. Run setup_roles first.')
+
+        for entry in report['rows']:
+            if entry['status'] != 'created':
+                self.stdout.write(self.style.ERROR(
+                    f"Row {entry['row']} ({entry['username']}): {'; '.join(entry['errors'])}"))
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Created {report['created']} clients, {report['failed']} failed"))
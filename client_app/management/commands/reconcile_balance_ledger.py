@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from client_app.models import BalanceLedgerEntry, BalanceSnapshot
+
+
+class Command(BaseCommand):
+    help = 'Verify that every balance snapshot equals the sum of the folded ledger entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--fix', action='store_true', help='Overwrite drifted snapshots with the ledger sum')
+
+    def handle(self, *args, **options):
+        ledger_total = Coalesce(
+            Subquery(
+                BalanceLedgerEntry.objects
+                .filter(user_id=OuterRef('user_id'), folded=True)
+                .values('user_id')
+                .annotate(total=Sum('amount'))
+                .values('total'),
+            ),
+            Value(0),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        )
+
+        after, checked, mismatched = 0, 0, []
+        while True:
+            # Keyset по user_id: кожна пачка - один запит з корельованою сумою згорнутих записів клієнта
+            rows = list(BalanceSnapshot.objects
+                        .filter(user_id__gt=after)
+                        .order_by('user_id')
+                        .annotate(ledger_total=ledger_total)
+                        .values_list('user_id', 'balance', 'ledger_total')[:options['chunk_size']])
+            if not rows:
+                break
+            after = rows[-1][0]
+            checked += len(rows)
+            for user_id, balance, total in rows:
+                if balance != total:
+                    mismatched.append(user_id)
+                    self.stdout.write(self.style.ERROR(f'  client {user_id}: snapshot {balance}, ledger {total}'))
+
+        self.stdout.write(f'Checked {checked} snapshots, {len(mismatched)} mismatched')
+        negative = BalanceSnapshot.objects.filter(balance__lt=0).count()
+        if negative:
+            self.stdout.write(self.style.ERROR(f'{negative} snapshots have a negative balance'))
+
+        if mismatched and options['fix']:
+            BalanceSnapshot.objects.filter(user_id__in=mismatched).update(balance=ledger_total)
+            self.stdout.write(self.style.WARNING(f'Rewrote {len(mismatched)} snapshots from the ledger'))
+        elif mismatched:
+            raise CommandError('Ledger and snapshots disagree; rerun with --fix to rebuild them')
+        self.stdout.write(self.style.SUCCESS('Reconciliation finished'))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from client_app.models import ClientTrainingRegistration
+from training_app.models import TrainingSessions
+
+
+class Command(BaseCommand):
+    help = 'Recompute training_sessions.registered_count from client_training_registrations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report sessions whose counter drifted')
+
+    def handle(self, *args, **options):
+        actual = Coalesce(
+            Subquery(
+                ClientTrainingRegistration.objects
+                .filter(session_id=OuterRef('session_id'))
+                .values('session_id')
+                .annotate(total=Count('registration_id'))
+                .values('total'),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+        drifted = (TrainingSessions.objects
+                   .annotate(actual=actual)
+                   .exclude(registered_count=F('actual')))
+
+        if options['dry_run']:
+            rows = list(drifted.values_list('session_id', 'registered_count', 'actual'))
+            for session_id, stored, real in rows:
+                self.stdout.write(f'  session {session_id}: stored {stored}, actual {real}')
+            self.stdout.write(self.style.WARNING(f'Dry run: {len(rows)} sessions drifted, no changes were written'))
+            return
+
+        # Один UPDATE для всіх сесій, у яких лічильник розійшовся з реєстраціями
+        updated = (TrainingSessions.objects
+                   .filter(session_id__in=drifted.values('session_id'))
+                   .update(registered_count=actual))
+        self.stdout.write(self.style.SUCCESS(f'Recounted seats for {updated} sessions'))
@@ -0,0 +1,142 @@
+"""
+Нічна обробка абонементів, що закінчуються.
+
+Абонементи з end_date у вікні [now - --grace-days, now + --days) обходяться
+keyset-пачками
+за user_subscription_id. Нижня межа в минулому підхоплює абонементи, що
+закінчились між запусками, якщо попередній запуск запізнився, впав чи був
+пропущений. Кожна пачка - окрема коротка транзакція: рядки
+клієнтів блокуються (SELECT ... FOR UPDATE, як у ledger.charge), баланси
+читаються одним запитом, а нові абонементи та списання вставляються через
+bulk_create. Абонемент, уже перекритий іншим (куплений вручну або продовжений
+попереднім запуском), пропускається, тож повторний запуск нічого не задвоює.
+
+Результат кожного абонемента пишеться в CSV-звіт запуску.
+"""
+import csv
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from client_app import dashboard
+from client_app.entitlements import invalidate_many
+from client_app.ledger import get_balances
+from client_app.models import BalanceLedgerEntry, Client, ClientSubscription
+
+def expiring_subscriptions(now, days, grace_days):
+    """Абонементи, що закінчуються у вікні запуску і ще не перекриті іншими."""
+    # Абонемент уже перекритий, якщо інший абонемент клієнта діє в момент його закінчення
+    covered = ClientSubscription.objects.filter(
+        user_id=OuterRef('user_id'),
+        start_date__lte=OuterRef('end_date'),
+        end_date__gt=OuterRef('end_date'),
+    )
+    return (ClientSubscription.objects
+            .filter(end_date__gte=now - timedelta(days=grace_days), end_date__lt=now + timedelta(days=days))
+            .exclude(Exists(covered)))
+
+
+REPORT_FIELDS = ['user_subscription_id', 'user_id', 'subscription_id', 'end_date', 'outcome',
+                 'new_user_subscription_id', 'amount', 'balance']
+
+
+class Command(BaseCommand):
+    help = 'Renew auto-renewing client subscriptions that expire soon and report expiring ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=1, help='Process subscriptions ending within this many days')
+        parser.add_argument('--grace-days', type=int, default=7,
+                            help='Also process subscriptions that already ended within this many days '
+                                 '(catch-up after a late or missed run)')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Subscriptions per transaction')
+        parser.add_argument('--report', help='CSV report path (default: subscription-renewals-<timestamp>.csv)')
+        parser.add_argument('--dry-run', action='store_true', help='Report outcomes without writing anything')
+
+    def handle(self, *args, **options):
+        now = datetime.now()
+        report_path = options['report'] or f"subscription-renewals-{now:%Y%m%d-%H%M%S}.csv"
+        expiring = expiring_subscriptions(now, options['days'], options['grace_days'])
+
+        totals = {'renewed': 0, 'insufficient_funds': 0, 'expiring': 0}
+        after = 0
+        with open(report_path, 'w', newline='', encoding='utf-8') as report_file:
+            report = csv.DictWriter(report_file, fieldnames=REPORT_FIELDS)
+            report.writeheader()
+            while True:
+                chunk = list(expiring.filter(user_subscription_id__gt=after)
+                             .order_by('user_subscription_id')
+                             .values_list('user_subscription_id', flat=True)[:options['chunk_size']])
+                if not chunk:
+                    break
+                after = chunk[-1]
+                rows = self._process_chunk(expiring, chunk, options['dry_run'])
+                for row in rows:
+                    totals[row['outcome']] += 1
+                    report.writerow(row)
+
+        summary = ', '.join(f'{outcome}: {count}' for outcome, count in totals.items())
+        prefix = 'Dry run, nothing written. ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(f'{prefix}{summary}. Report: {report_path}'))
+
+    def _process_chunk(self, expiring, chunk, dry_run):
+        with transaction.atomic():
+            client_ids = sorted(set(expiring.filter(user_subscription_id__in=chunk).values_list('user_id', flat=True)))
+            # Порядок блокувань за user_id - як і в інших записувачів балансу, без взаємних блокувань
+            list(Client.objects.select_for_update().filter(user_id__in=client_ids)
+                 .order_by('user_id').values_list('user_id'))
+            # Перечитуємо під блокуванням: між вибіркою id і блокуванням клієнт міг купити абонемент сам
+            subscriptions = list(expiring.filter(user_subscription_id__in=chunk)
+                                 .select_related('subscription')
+                                 .order_by('user_subscription_id'))
+            balances = get_balances(client_ids)
+
+            rows, renewals, charges = [], [], []
+            renewed_until = {}
+            for current in subscriptions:
+                plan = current.subscription
+                row = {
+                    'user_subscription_id': current.user_subscription_id,
+                    'user_id': current.user_id,
+                    'subscription_id': plan.subscription_id,
+                    'end_date': current.end_date.isoformat(),
+                    'outcome': 'expiring',
+                    'new_user_subscription_id': None,
+                    'amount': None,
+                    'balance': balances[current.user_id],
+                }
+                rows.append(row)
+                if not current.auto_renew or renewed_until.get(current.user_id, current.end_date) > current.end_date:
+                    continue
+                if balances[current.user_id] < plan.price:
+                    row['outcome'] = 'insufficient_funds'
+                    continue
+                balances[current.user_id] -= plan.price
+                row.update(outcome='renewed', amount=plan.price)
+                end_date = current.end_date + timedelta(days=plan.duration_days)
+                renewed_until[current.user_id] = end_date
+                renewals.append((row, ClientSubscription(
+                    user_id=current.user_id,
+                    subscription_id=plan.subscription_id,
+                    start_date=current.end_date,
+                    end_date=end_date,
+                    auto_renew=True,
+                )))
+                charges.append((current.user_id, plan.price))
+
+            if dry_run or not renewals:
+                transaction.set_rollback(True)
+                return rows
+            created = ClientSubscription.objects.bulk_create([renewal for _, renewal in renewals])
+            for (row, _), renewal in zip(renewals, created):
+                row['new_user_subscription_id'] = renewal.user_subscription_id
+            BalanceLedgerEntry.objects.bulk_create([
+                BalanceLedgerEntry(user_id=client_id, amount=-price, kind='renewal',
+                                   reference=f'client_subscription:{renewal.user_subscription_id}')
+                for (client_id, price), renewal in zip(charges, created)
+            ])
+        # bulk_create не надсилає сигналів - скидаємо кеш абонементів явно
+        invalidate_many(renewed_until)
+        dashboard.invalidate_many(renewed_until)
+        return rows
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from client_app.notifications import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Send queued client notifications (run from cron or as a long-running worker with --interval)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Notifications per transaction')
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and poll the queue every this many seconds (0 - drain once and exit)')
+
+    def handle(self, *args, **options):
+        while True:
+            total_sent = total_failed = 0
+            # Один прохід по черзі за keyset: невдалі сповіщення повторюються лише в наступному проході
+            last_id = 0
+            while last_id is not None:
+                sent, failed, last_id = deliver_pending(options['batch_size'], last_id)
+                total_sent += sent
+                total_failed += failed
+            if total_sent or total_failed or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(f'Sent {total_sent} notifications, {total_failed} failed'))
+            if not options['interval']:
+                break
+            close_old_connections()
+            time.sleep(options['interval'])
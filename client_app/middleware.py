@@ -0,0 +1,17 @@
+from django.utils.functional import SimpleLazyObject
+
+from .profiles import get_profile
+
+
+class ProfileMiddleware:
+    """
+    Додає до запиту лінивий атрибут request.profile - профіль клієнта або тренера
+    відповідно до ролі. Запит до БД виконується лише при першому зверненні.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.profile = SimpleLazyObject(lambda: get_profile(request))
+        return self.get_response(request)
@@ -42,15 +42,12 @@ class Client(models.Model):
     )
     birth = models.DateField(null=False)
     gender = models.CharField(max_length=6, choices=GENDER_CHOICES, null=False)
-    balance = models.DecimalField(
-        max_digits=8,
-        decimal_places=2,
-        null=False,
-        default=0.00,
-        validators=[
-            MinValueValidator(0.00, message='Баланс не може бути від’ємним.')
-        ]
-    )
+    # Колонка clients.balance більше не читається і не пишеться: баланс - це журнал
+    # client_app.ledger. Вона потрібна лише для переносу залишків ('opening'-записи,
+    # див. BalanceLedgerEntry); до того нові рядки отримують значення за замовчуванням
+    #   ALTER TABLE "client_scheme"."clients" ALTER COLUMN balance SET DEFAULT 0;
+    # а після переносу колонка видаляється:
+    #   ALTER TABLE "client_scheme"."clients" DROP COLUMN balance;
     created_at = models.DateTimeField(null=False, auto_now_add=True)
     updated_at = models.DateTimeField(null=False, auto_now=True)
     user_credential = models.ForeignKey(
@@ -79,8 +76,6 @@ class Client(models.Model):
             raise ValidationError({'email': 'Email не може бути порожнім.'})
         if self.phone and not self.phone:
             raise ValidationError({'phone': 'Телефон не може бути порожнім.'})
-        if self.balance < 0:
-            raise ValidationError({'balance': 'Баланс не може бути від’ємним.'})
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
@@ -112,6 +107,45 @@ class ClientTrainingRegistration(models.Model):
         return f"Registration {self.registration_id} for {self.user} on session {self.session}"
 
 
+# Черга очікування на заповнені сесії. Таблиця створюється SQL-скриптом схеми:
+#   CREATE TABLE "client_scheme"."session_waitlist" (
+#       waitlist_id serial PRIMARY KEY,
+#       user_id integer NOT NULL REFERENCES "client_scheme"."clients" (user_id) ON DELETE CASCADE,
+#       session_id integer NOT NULL REFERENCES "training_scheme"."training_sessions" (session_id) ON DELETE CASCADE,
+#       created_at timestamp with time zone NOT NULL DEFAULT now(),
+#       UNIQUE (user_id, session_id)
+#   );
+#   CREATE INDEX session_waitlist_session_idx ON "client_scheme"."session_waitlist" (session_id, waitlist_id);
+class SessionWaitlistEntry(models.Model):
+    waitlist_id = models.AutoField(primary_key=True)
+    user = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries',
+        db_column='user_id',
+        null=False
+    )
+    session = models.ForeignKey(
+        TrainingSessions,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries',
+        db_column='session_id',
+        null=False
+    )
+    created_at = models.DateTimeField(null=False, auto_now_add=True)
+
+    class Meta:
+        db_table = '"client_scheme"."session_waitlist"'
+        managed = False
+        unique_together = (('user', 'session'),)
+
+    def __str__(self):
+        return f"Waitlist entry {self.waitlist_id} for {self.user} on session {self.session}"
+
+
+# Перевірки активного абонемента (client_app.entitlements) спираються на індекс
+#   CREATE INDEX client_subscriptions_user_end_idx
+#       ON "client_scheme"."client_subscriptions" (user_id, end_date);
 class ClientSubscription(models.Model):
     user_subscription_id = models.AutoField(primary_key=True)
     start_date = models.DateTimeField(null=False)
@@ -130,6 +164,12 @@ class ClientSubscription(models.Model):
         db_column='subscription_id',
         null=False
     )
+    # Продовжується командою renew_subscriptions за рахунок балансу. Колонка:
+    #   ALTER TABLE "client_scheme"."client_subscriptions"
+    #       ADD COLUMN auto_renew boolean NOT NULL DEFAULT false;
+    #   CREATE INDEX client_subscriptions_renew_idx
+    #       ON "client_scheme"."client_subscriptions" (end_date, user_subscription_id) WHERE auto_renew;
+    auto_renew = models.BooleanField(default=False)
 
     class Meta:
         db_table = '"client_scheme"."client_subscriptions"'
@@ -246,4 +286,134 @@ class ClientFeedback(models.Model):
             raise ValidationError({'rating': 'Рейтинг повинен бути від 1 до 5.'})
 
     def __str__(self):
-        return f"Feedback {self.feedback_id} from {self.user} for {self.trainer}"
\ No newline at end of file
+        return f"Feedback {self.feedback_id} from {self.user} for {self.trainer}"
+
+# Журнал рухів балансу (лише вставки). Таблиці створюються SQL-скриптом схеми:
+#   CREATE TABLE "client_scheme"."balance_ledger" (
+#       entry_id bigserial PRIMARY KEY,
+#       user_id integer NOT NULL REFERENCES "client_scheme"."clients" (user_id) ON DELETE CASCADE,
+#       amount numeric(10, 2) NOT NULL,
+#       kind varchar(20) NOT NULL,
+#       reference varchar(100),
+#       created_at timestamp with time zone NOT NULL DEFAULT now()
+#   );
+#   CREATE INDEX balance_ledger_user_entry_idx ON "client_scheme"."balance_ledger" (user_id, entry_id);
+# Записи, уже враховані в знімку, позначаються folded; незгорнуті читаються по частковому індексу:
+#   ALTER TABLE "client_scheme"."balance_ledger" ADD COLUMN folded boolean NOT NULL DEFAULT false;
+#   CREATE INDEX balance_ledger_unfolded_idx
+#       ON "client_scheme"."balance_ledger" (user_id) INCLUDE (amount) WHERE NOT folded;
+# Для знімків, зроблених раніше за водяним знаком last_entry_id:
+#   UPDATE "client_scheme"."balance_ledger" l SET folded = true
+#   FROM "client_scheme"."balance_snapshots" s
+#   WHERE l.user_id = s.user_id AND l.entry_id <= s.last_entry_id;
+#   CREATE TABLE "client_scheme"."balance_snapshots" (
+#       user_id integer PRIMARY KEY REFERENCES "client_scheme"."clients" (user_id) ON DELETE CASCADE,
+#       balance numeric(10, 2) NOT NULL,
+#       last_entry_id bigint NOT NULL,
+#       updated_at timestamp with time zone NOT NULL DEFAULT now()
+#   );
+# Початкові баланси переносяться в журнал одним записом на клієнта:
+#   INSERT INTO "client_scheme"."balance_ledger" (user_id, amount, kind)
+#   SELECT user_id, balance, 'opening' FROM "client_scheme"."clients" WHERE balance <> 0;
+class BalanceLedgerEntry(models.Model):
+    KIND_CHOICES = [
+        ('opening', 'Початковий баланс'),
+        ('top_up', 'Поповнення'),
+        ('purchase', 'Покупка'),
+        ('renewal', 'Продовження абонемента'),
+        ('refund', 'Повернення'),
+        ('adjustment', 'Коригування'),
+    ]
+
+    entry_id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        related_name='balance_entries',
+        db_column='user_id',
+        null=False
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2, null=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, null=False)
+    reference = models.CharField(max_length=100, null=True, blank=True)
+    created_at = models.DateTimeField(null=False, auto_now_add=True)
+    folded = models.BooleanField(default=False, null=False)
+
+    class Meta:
+        db_table = '"client_scheme"."balance_ledger"'
+        managed = False
+
+    def __str__(self):
+        return f"Ledger entry {self.entry_id}: {self.amount} ({self.kind}) for {self.user_id}"
+
+
+class BalanceSnapshot(models.Model):
+    # Сума всіх записів журналу з folded = true; last_entry_id - найбільший згорнутий запис (довідково)
+    user = models.OneToOneField(
+        Client,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='balance_snapshot',
+        db_column='user_id'
+    )
+    balance = models.DecimalField(max_digits=10, decimal_places=2, null=False)
+    last_entry_id = models.BigIntegerField(null=False)
+    updated_at = models.DateTimeField(null=False, auto_now=True)
+
+    class Meta:
+        db_table = '"client_scheme"."balance_snapshots"'
+        managed = False
+
+    def __str__(self):
+        return f"Balance snapshot for {self.user_id}: {self.balance} at entry {self.last_entry_id}"
+
+
+# Черга сповіщень клієнтам (outbox): записи вставляються в одній транзакції зі
+# зміною, про яку сповіщають, а надсилає їх окремий процес - команда send_client_notifications.
+#   CREATE TABLE "client_scheme"."client_notifications" (
+#       notification_id bigserial PRIMARY KEY,
+#       user_id integer NOT NULL REFERENCES "client_scheme"."clients" (user_id) ON DELETE CASCADE,
+#       session_id integer REFERENCES "training_scheme"."training_sessions" (session_id) ON DELETE SET NULL,
+#       kind varchar(30) NOT NULL,
+#       subject varchar(255) NOT NULL,
+#       message text NOT NULL,
+#       attempts integer NOT NULL DEFAULT 0,
+#       created_at timestamp with time zone NOT NULL DEFAULT now(),
+#       sent_at timestamp with time zone
+#   );
+#   CREATE INDEX client_notifications_pending_idx
+#       ON "client_scheme"."client_notifications" (notification_id) WHERE sent_at IS NULL;
+class ClientNotification(models.Model):
+    KIND_CHOICES = [
+        ('session_cancelled', 'Сесію скасовано'),
+    ]
+
+    notification_id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        db_column='user_id',
+        null=False
+    )
+    session = models.ForeignKey(
+        TrainingSessions,
+        on_delete=models.SET_NULL,
+        related_name='notifications',
+        db_column='session_id',
+        null=True,
+        blank=True
+    )
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES, null=False)
+    subject = models.CharField(max_length=255, null=False)
+    message = models.TextField(null=False)
+    attempts = models.IntegerField(default=0, null=False)
+    created_at = models.DateTimeField(null=False, auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = '"client_scheme"."client_notifications"'
+        managed = False
+
+    def __str__(self):
+        return f"Notification {self.notification_id} ({self.kind}) for {self.user_id}"
@@ -0,0 +1,70 @@
+"""
+Сповіщення клієнтів через чергу в БД.
+
+Код, що змінює дані, лише вставляє рядки ClientNotification у своїй
+транзакції (bulk_create), тож сповіщення не губляться при відкаті і не
+сповільнюють запит. Надсилає їх команда send_client_notifications: вона
+забирає пачку неотриманих рядків через SELECT ... FOR UPDATE SKIP LOCKED,
+тому кілька воркерів можуть працювати паралельно без подвійних листів.
+Невдала спроба збільшує attempts; після NOTIFICATION_MAX_ATTEMPTS рядок
+більше не вибирається.
+"""
+import logging
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ClientNotification
+
+logger = logging.getLogger(__name__)
+
+SESSION_CANCELLED_SUBJECT = 'Тренування скасовано'
+
+
+def session_cancelled(client_id, session_id, session_date, start_time, reason=None):
+    message = f'Тренування {session_date:%d.%m.%Y} о {start_time:%H:%M}, на яке ви зареєстровані, скасовано.'
+    if reason:
+        message += f' Причина: {reason}'
+    return ClientNotification(
+        user_id=client_id,
+        session_id=session_id,
+        kind='session_cancelled',
+        subject=SESSION_CANCELLED_SUBJECT,
+        message=message,
+    )
+
+
+def enqueue(notifications):
+    return ClientNotification.objects.bulk_create(notifications, batch_size=1000)
+
+
+def deliver_pending(batch_size=100, after_id=0):
+    """
+    Надсилає одну пачку сповіщень з notification_id > after_id.
+    Повертає (sent, failed, last_id); last_id None - черга вичерпана.
+    """
+    max_attempts = getattr(settings, 'NOTIFICATION_MAX_ATTEMPTS', 5)
+    sent, failed = [], []
+    with transaction.atomic():
+        batch = list(ClientNotification.objects
+                     .select_for_update(skip_locked=True, of=('self',))
+                     .select_related('user')
+                     .filter(sent_at__isnull=True, attempts__lt=max_attempts, notification_id__gt=after_id)
+                     .order_by('notification_id')[:batch_size])
+        for notification in batch:
+            try:
+                send_mail(notification.subject, notification.message,
+                          settings.DEFAULT_FROM_EMAIL, [notification.user.email])
+                sent.append(notification.notification_id)
+            except Exception as e:
+                logger.error(f"Failed to send notification {notification.notification_id}: {str(e)}")
+                failed.append(notification.notification_id)
+        if sent:
+            ClientNotification.objects.filter(notification_id__in=sent).update(
+                sent_at=timezone.now(), attempts=F('attempts') + 1)
+        if failed:
+            ClientNotification.objects.filter(notification_id__in=failed).update(attempts=F('attempts') + 1)
+    return len(sent), len(failed), batch[-1].notification_id if batch else None
@@ -0,0 +1,149 @@
+"""
+Масове створення клієнтів (корпоративні абонементи).
+
+Замість api_register для кожного користувача окремо: усі рядки валідуються
+в пам'яті, колізії логінів, email і телефонів перевіряються одним запитом на
+поле, паролі хешуються пулом процесів, а UserCredentials, зв'язки з групою client
+та профілі Client вставляються через bulk_create пачками, по одній транзакції
+на пачку. Результат - звіт по кожному вхідному рядку.
+"""
+import logging
+
+from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+
+from auth_app.hashing import hash_passwords, hash_passwords_parallel
+from auth_app.models import UserCredentials, UserCredentialsGroups
+from .models import Client
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FIELDS = ('first_name', 'last_name', 'email', 'phone', 'birth', 'gender')
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _validate_row(row):
+    # JSON-завантаження може містити числа, списки чи об'єкти - це помилка рядка, а не 500
+    not_strings = [field for field in ('username', 'password') + PROFILE_FIELDS
+                   if row.get(field) is not None and not isinstance(row.get(field), str)]
+    if not_strings:
+        return '', '', Client(), [f"{field}: must be a string" for field in not_strings]
+
+    errors = []
+    username = (row.get('username') or '').strip()
+    password = row.get('password') or ''
+    if len(username) < 3:
+        errors.append('Username must be at least 3 characters long')
+    elif len(username) > 64:
+        errors.append('Username must be at most 64 characters long')
+    if len(password) < 6:
+        errors.append('Password must be at least 6 characters long')
+
+    client = Client(**{field: row.get(field) for field in PROFILE_FIELDS})
+    try:
+        client.clean_fields(exclude=['user_credential', 'trainer'])
+    except ValidationError as e:
+        for field, messages in e.message_dict.items():
+            errors.extend(f"{field}: {message}" for message in messages)
+    return username, password, client, errors
+
+
+def _mark_duplicates(entries, key, label):
+    seen = set()
+    for entry in entries:
+        value = key(entry)
+        if value in seen:
+            entry['errors'].append(f"Duplicate {label} in upload")
+        seen.add(value)
+
+
+def onboard_clients(rows, chunk_size=DEFAULT_CHUNK_SIZE, all_cores=False):
+    """
+    Створює клієнтів з рядків виду
+    {'username', 'password', 'first_name', 'last_name', 'email', 'phone', 'birth', 'gender'}.
+    Повертає {'created': int, 'failed': int, 'rows': [звіт по кожному рядку]}.
+    all_cores=True хешує паролі окремим пулом на всі ядра - лише для management-команди;
+    із запиту паролі йдуть через спільний обмежений пул і можуть дати PasswordHashingBusy.
+    """
+    client_group = Group.objects.get(name='client')
+    rows = list(rows)
+
+    entries = []
+    for index, row in enumerate(rows):
+        username, password, client, errors = _validate_row(row)
+        entries.append({
+            'row': index,
+            'username': username,
+            'status': 'error',
+            'errors': errors,
+            'user_credential_id': None,
+            '_password': password,
+            '_client': client,
+        })
+
+    _mark_duplicates(entries, lambda e: e['username'], 'username')
+    _mark_duplicates(entries, lambda e: e['_client'].email, 'email')
+    _mark_duplicates(entries, lambda e: e['_client'].phone, 'phone')
+
+    # Колізії з існуючими записами - один запит на кожне унікальне поле
+    candidates = [e for e in entries if not e['errors']]
+    taken_usernames = set(UserCredentials.objects
+                          .filter(username__in=[e['username'] for e in candidates])
+                          .values_list('username', flat=True))
+    taken_emails = set(Client.objects
+                       .filter(email__in=[e['_client'].email for e in candidates])
+                       .values_list('email', flat=True))
+    taken_phones = set(Client.objects
+                       .filter(phone__in=[e['_client'].phone for e in candidates])
+                       .values_list('phone', flat=True))
+    for entry in candidates:
+        if entry['username'] in taken_usernames:
+            entry['errors'].append('Username already exists')
+        if entry['_client'].email in taken_emails:
+            entry['errors'].append('Email already exists')
+        if entry['_client'].phone in taken_phones:
+            entry['errors'].append('Phone already exists')
+
+    valid = [e for e in candidates if not e['errors']]
+    hash_batch = hash_passwords_parallel if all_cores else hash_passwords
+    for entry, password_hash in zip(valid, hash_batch([e['_password'] for e in valid])):
+        entry['_password'] = password_hash
+
+    for start in range(0, len(valid), chunk_size):
+        _create_chunk(valid[start:start + chunk_size], client_group)
+
+    created = 0
+    for entry in entries:
+        del entry['_password'], entry['_client']
+        if entry['status'] == 'created':
+            created += 1
+    logger.info(f"Onboarded {created} of {len(entries)} clients")
+    return {'created': created, 'failed': len(entries) - created, 'rows': entries}
+
+
+def _create_chunk(chunk, client_group):
+    try:
+        with transaction.atomic():
+            users = UserCredentials.objects.bulk_create([
+                UserCredentials(username=e['username'], password=e['_password'], user_role='client')
+                for e in chunk
+            ])
+            UserCredentialsGroups.objects.bulk_create([
+                UserCredentialsGroups(user_credentials=user, group=client_group) for user in users
+            ])
+            clients = []
+            for entry, user in zip(chunk, users):
+                entry['_client'].user_credential = user
+                clients.append(entry['_client'])
+            Client.objects.bulk_create(clients)
+    except DatabaseError as e:
+        # Пачка відкочується повністю (наприклад, паралельна реєстрація з тим самим логіном)
+        logger.error(f"Onboarding chunk of {len(chunk)} rows rolled back: {str(e)}")
+        for entry in chunk:
+            entry['errors'].append(f"Chunk rolled back: {str(e)}")
+        return
+
+    for entry, user in zip(chunk, users):
+        entry['status'] = 'created'
+        entry['user_credential_id'] = user.pk
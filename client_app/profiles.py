@@ -0,0 +1,70 @@
+"""
+Профіль поточного користувача (Client або Trainers) у межах одного запиту.
+
+Більшість views починається з пошуку профілю за request.user, а деякі шукають
+і клієнта, і тренера. Профіль завантажується один раз і запам'ятовується на
+HttpRequest, тож усі views, API та middleware працюють з одним і тим самим
+об'єктом. Якщо профілю немає, функції піднімають DoesNotExist, як і
+Model.objects.get, тому існуючі блоки try/except не змінюються.
+"""
+from training_app.models import Trainers
+from .models import Client
+
+
+def _profile_cache(request):
+    # DRF Request проксує атрибути HttpRequest, але записує власні - кешуємо на оригіналі
+    request = getattr(request, '_request', request)
+    if not hasattr(request, '_profile_cache'):
+        request._profile_cache = {}
+    return request._profile_cache
+
+
+def get_client_profile(request):
+    """
+    Повертає профіль клієнта поточного користувача з уже підвантаженим тренером.
+    """
+    cache = _profile_cache(request)
+    if 'client' not in cache:
+        cache['client'] = (Client.objects
+                           .select_related('trainer')
+                           .filter(user_credential_id=request.user.pk)
+                           .first())
+    if cache['client'] is None:
+        raise Client.DoesNotExist('Client profile not found')
+    return cache['client']
+
+
+def get_trainer_profile(request):
+    """
+    Повертає профіль тренера поточного користувача.
+    """
+    cache = _profile_cache(request)
+    if 'trainer' not in cache:
+        cache['trainer'] = Trainers.objects.filter(user_credential_id=request.user.pk).first()
+    if cache['trainer'] is None:
+        raise Trainers.DoesNotExist('Trainer profile not found')
+    return cache['trainer']
+
+
+def has_client_profile(request):
+    try:
+        get_client_profile(request)
+        return True
+    except Client.DoesNotExist:
+        return False
+
+
+def get_profile(request):
+    """
+    Повертає профіль відповідно до ролі користувача або None.
+    """
+    if not request.user.is_authenticated:
+        return None
+    try:
+        if request.user.user_role == 'client':
+            return get_client_profile(request)
+        if request.user.user_role == 'trainer':
+            return get_trainer_profile(request)
+    except (Client.DoesNotExist, Trainers.DoesNotExist):
+        pass
+    return None
@@ -0,0 +1,189 @@
+"""
+Бронювання місць на тренувальні сесії.
+
+Кількість зайнятих місць зберігається в TrainingSessions.registered_count.
+Місце займається умовним UPDATE ... SET registered_count = registered_count + 1
+WHERE registered_count < max_participants: Postgres блокує рядок сесії і
+перевіряє умову заново після паралельних оновлень, тому зайвих реєстрацій не
+буває, а COUNT(*) по реєстраціях не потрібен. Інкремент і вставка реєстрації
+виконуються в одній короткій транзакції; скасування зменшує лічильник.
+
+Якщо місць немає, клієнт стає в чергу очікування (SessionWaitlistEntry).
+Звільнене місце в тій самій транзакції віддається першому в черзі, тому
+клієнтам не потрібно повторювати спроби реєстрації. Перед цим для нього
+виконуються ті самі перевірки, що й при прямій реєстрації (активний абонемент,
+відсутність перетину з іншими його сесіями); хто їх не проходить, вибуває з
+черги, і місце дістається наступному.
+"""
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from training_app.conflicts import find_client_conflict
+from training_app.models import TrainingSessions
+from .entitlements import has_active_subscription
+from .models import ClientTrainingRegistration, SessionWaitlistEntry
+
+logger = logging.getLogger(__name__)
+
+PLANNED_STATUS = 'заплановано'
+
+
+class ReservationError(Exception):
+    pass
+
+
+class SessionFull(ReservationError):
+    pass
+
+
+class AlreadyRegistered(ReservationError):
+    pass
+
+
+def _take_seat(session_id):
+    return (TrainingSessions.objects
+            .filter(session_id=session_id, status=PLANNED_STATUS,
+                    registered_count__lt=F('max_participants'))
+            .update(registered_count=F('registered_count') + 1))
+
+
+def _decrement(session_id):
+    TrainingSessions.objects.filter(session_id=session_id, registered_count__gt=0) \
+        .update(registered_count=F('registered_count') - 1)
+
+
+def _ineligibility(entry, session):
+    if not has_active_subscription(entry.user_id):
+        return 'no active subscription'
+    conflicting_session_id = find_client_conflict(entry.user_id, session)
+    if conflicting_session_id is not None:
+        return f'overlaps session {conflicting_session_id}'
+    return None
+
+
+def _promote_waitlisted(session_id):
+    """
+    Віддає вільне місце першому в черзі, що може бути зареєстрований.
+    Викликається всередині транзакції.
+    """
+    session = None
+    while True:
+        entry = (SessionWaitlistEntry.objects.select_for_update()
+                 .filter(session_id=session_id)
+                 .order_by('waitlist_id')
+                 .first())
+        if entry is None or not _take_seat(session_id):
+            return None
+        session = session or TrainingSessions.objects.get(session_id=session_id)
+        reason = _ineligibility(entry, session)
+        if reason is not None:
+            # Місце повертається, клієнт вибуває з черги, місце пропонується наступному
+            _decrement(session_id)
+            entry.delete()
+            logger.info(f"Client {entry.user_id} dropped from waitlist of session {session_id}: {reason}")
+            continue
+        try:
+            with transaction.atomic():
+                registration = ClientTrainingRegistration.objects.create(user_id=entry.user_id, session_id=session_id)
+        except IntegrityError:
+            # Клієнт уже зареєстрований - місце повертається, запис із черги прибирається
+            _decrement(session_id)
+            entry.delete()
+            continue
+        entry.delete()
+        logger.info(f"Client {entry.user_id} promoted from waitlist to session {session_id}")
+        return registration
+
+
+def _free_seat(session_id):
+    _decrement(session_id)
+    _promote_waitlisted(session_id)
+
+
+def reserve_seat(client, session_id):
+    """
+    Реєструє клієнта на сесію. Кидає SessionFull, якщо вільних місць немає
+    (або сесія вже не запланована), і AlreadyRegistered при повторній реєстрації.
+    """
+    try:
+        with transaction.atomic():
+            if not _take_seat(session_id):
+                raise SessionFull(f"Session {session_id} has no free seats")
+            return ClientTrainingRegistration.objects.create(user=client, session_id=session_id)
+    except IntegrityError:
+        # Інкремент відкочено разом із транзакцією
+        raise AlreadyRegistered(f"Client {client.pk} is already registered for session {session_id}")
+
+
+def release_seat(registration):
+    """
+    Видаляє реєстрацію і віддає місце першому в черзі (або звільняє його).
+    Повертає False, якщо реєстрацію вже видалено.
+    """
+    with transaction.atomic():
+        deleted, _ = ClientTrainingRegistration.objects.filter(pk=registration.pk).delete()
+        if not deleted:
+            return False
+        _free_seat(registration.session_id)
+    return True
+
+
+def transfer_seat(registration, session_id):
+    """
+    Переносить реєстрацію на іншу сесію: місце в новій займається за тими ж
+    правилами, що й при реєстрації, а в старій звільняється.
+    """
+    old_session_id = registration.session_id
+    if old_session_id == session_id:
+        return registration
+    try:
+        with transaction.atomic():
+            if not _take_seat(session_id):
+                raise SessionFull(f"Session {session_id} has no free seats")
+            registration.session_id = session_id
+            registration.save(update_fields=['session'])
+            _free_seat(old_session_id)
+    except IntegrityError:
+        registration.session_id = old_session_id
+        raise AlreadyRegistered(f"Client {registration.user_id} is already registered for session {session_id}")
+    return registration
+
+
+def waitlist_position(client, session_id):
+    """
+    Позиція клієнта в черзі (1 - наступний), або None, якщо його в черзі немає.
+    """
+    entry_id = (SessionWaitlistEntry.objects
+                .filter(user=client, session_id=session_id)
+                .values_list('waitlist_id', flat=True)
+                .first())
+    if entry_id is None:
+        return None
+    return SessionWaitlistEntry.objects.filter(session_id=session_id, waitlist_id__lte=entry_id).count()
+
+
+def join_waitlist(client, session_id):
+    """
+    Ставить клієнта в чергу на сесію (повторний виклик нічого не змінює) і
+    повертає його позицію. Повертає None, якщо місце звільнилося і клієнта
+    одразу зареєстровано. Кидає AlreadyRegistered, якщо він уже зареєстрований.
+    """
+    if ClientTrainingRegistration.objects.filter(user=client, session_id=session_id).exists():
+        raise AlreadyRegistered(f"Client {client.pk} is already registered for session {session_id}")
+    try:
+        with transaction.atomic():
+            SessionWaitlistEntry.objects.create(user=client, session_id=session_id)
+    except IntegrityError:
+        pass  # Уже в черзі
+    else:
+        # Місце могло звільнитися, поки клієнт ставав у чергу
+        with transaction.atomic():
+            _promote_waitlisted(session_id)
+    return waitlist_position(client, session_id)
+
+
+def leave_waitlist(client, session_id):
+    deleted, _ = SessionWaitlistEntry.objects.filter(user=client, session_id=session_id).delete()
+    return bool(deleted)
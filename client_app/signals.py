@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import dashboard
+from .entitlements import invalidate
+from .models import BalanceLedgerEntry, Client, ClientGoal, ClientProgress, ClientSubscription, \
+    ClientTrainingRegistration, SessionWaitlistEntry
+
+
+@receiver(post_save, sender=ClientSubscription)
+@receiver(post_delete, sender=ClientSubscription)
+def client_subscription_changed(sender, instance, **kwargs):
+    # Куплений, змінений або видалений абонемент - перечитуємо інтервали клієнта
+    invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_save, sender=ClientSubscription)
+@receiver(post_delete, sender=ClientSubscription)
+@receiver(post_save, sender=ClientGoal)
+@receiver(post_delete, sender=ClientGoal)
+@receiver(post_save, sender=ClientProgress)
+@receiver(post_delete, sender=ClientProgress)
+@receiver(post_save, sender=ClientTrainingRegistration)
+@receiver(post_delete, sender=ClientTrainingRegistration)
+@receiver(post_save, sender=SessionWaitlistEntry)
+@receiver(post_delete, sender=SessionWaitlistEntry)
+@receiver(post_save, sender=BalanceLedgerEntry)
+def client_dashboard_changed(sender, instance, **kwargs):
+    dashboard.invalidate(instance.user_id)
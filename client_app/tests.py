@@ -1,3 +1,156 @@
-from django.test import TestCase
+import threading
+import unittest
+from datetime import datetime, time, timedelta
 
-# Create your tests here.
+from django.db import connection, connections
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase
+
+from auth_app.models import UserCredentials
+from client_app import entitlements
+from client_app.management.commands.renew_subscriptions import expiring_subscriptions
+from client_app.onboarding import _validate_row
+from client_app.reservations import _take_seat
+from gym_app.models import Gym, GymLocation
+from training_app.models import Trainers, TrainingSessions, TrainingType
+
+# Моделі некеровані (managed = False), тож тестова БД не має їхніх таблиць -
+# тест створює потрібні схеми і таблиці сам і прибирає їх після себе
+SEAT_RACE_MODELS = [UserCredentials, Gym, GymLocation, TrainingType, Trainers, TrainingSessions]
+SEAT_RACE_SCHEMAS = ['gym_scheme', 'training_scheme']
+
+
+class ExpiringSubscriptionsWindowTests(SimpleTestCase):
+    def test_window_reaches_back_by_grace_days(self):
+        now = datetime(2030, 5, 10, 3, 0)
+        sql, params = expiring_subscriptions(now, days=1, grace_days=7).query.sql_with_params()
+        self.assertIn(now - timedelta(days=7), params)
+        self.assertIn(now + timedelta(days=1), params)
+        self.assertNotIn(now, params)
+
+    def test_zero_grace_keeps_the_old_window(self):
+        now = datetime(2030, 5, 10, 3, 0)
+        sql, params = expiring_subscriptions(now, days=1, grace_days=0).query.sql_with_params()
+        self.assertIn(now, params)
+
+
+class EntitlementIntervalTests(SimpleTestCase):
+    NOW = datetime(2030, 3, 1, 12, 0)
+
+    def set_intervals(self, *intervals):
+        # Інтервали в кеші відсортовані за end_date, як їх повертає _intervals
+        cache.set(entitlements._cache_key(1), tuple(sorted(intervals, key=lambda interval: interval[1])))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_no_subscription(self):
+        self.set_intervals()
+        self.assertIsNone(entitlements.active_until(1, self.NOW))
+        self.assertFalse(entitlements.has_active_subscription(1, self.NOW))
+
+    def test_chained_subscriptions_extend_coverage(self):
+        self.set_intervals(
+            (datetime(2030, 2, 1), datetime(2030, 3, 10)),
+            (datetime(2030, 3, 10), datetime(2030, 4, 10)),
+            (datetime(2030, 4, 5), datetime(2030, 5, 5)),
+        )
+        self.assertEqual(entitlements.active_until(1, self.NOW), datetime(2030, 5, 5))
+
+    def test_gap_breaks_the_chain(self):
+        self.set_intervals(
+            (datetime(2030, 2, 1), datetime(2030, 3, 10)),
+            (datetime(2030, 3, 11), datetime(2030, 4, 10)),
+        )
+        self.assertEqual(entitlements.active_until(1, self.NOW), datetime(2030, 3, 10))
+
+    def test_future_subscription_is_not_active_yet(self):
+        self.set_intervals((datetime(2030, 3, 5), datetime(2030, 4, 5)))
+        self.assertIsNone(entitlements.active_until(1, self.NOW))
+        self.assertTrue(entitlements.has_active_subscription(1, datetime(2030, 3, 5)))
+
+
+class OnboardingRowValidationTests(SimpleTestCase):
+    VALID_ROW = {
+        'username': 'client01', 'password': 'secret123', 'first_name': 'Olena', 'last_name': 'Koval',
+        'email': 'olena@example.com', 'phone': '+380501234567', 'birth': '1995-04-12', 'gender': 'female',
+    }
+
+    def test_valid_row_has_no_errors(self):
+        username, password, client, errors = _validate_row(dict(self.VALID_ROW, username='  client01 '))
+        self.assertEqual(errors, [])
+        self.assertEqual(username, 'client01')
+        self.assertEqual(client.email, 'olena@example.com')
+
+    def test_short_credentials_are_rejected(self):
+        errors = _validate_row(dict(self.VALID_ROW, username='ab', password='123'))[3]
+        self.assertIn('Username must be at least 3 characters long', errors)
+        self.assertIn('Password must be at least 6 characters long', errors)
+
+    def test_non_string_values_are_row_errors(self):
+        errors = _validate_row(dict(self.VALID_ROW, username=123, password=123456, email=['a@b.cd']))[3]
+        self.assertEqual(errors, ['username: must be a string', 'password: must be a string',
+                                  'email: must be a string'])
+
+    def test_invalid_profile_fields_are_reported(self):
+        errors = _validate_row(dict(self.VALID_ROW, phone='12', birth='not a date'))[3]
+        self.assertTrue(any(error.startswith('phone:') for error in errors))
+        self.assertTrue(any(error.startswith('birth:') for error in errors))
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Row-level locking race needs PostgreSQL')
+class SeatReservationRaceTests(TransactionTestCase):
+    SEATS = 5
+    ATTEMPTS = 40
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with connection.cursor() as cursor:
+            for schema in SEAT_RACE_SCHEMAS:
+                cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+        with connection.schema_editor() as editor:
+            for model in SEAT_RACE_MODELS:
+                editor.create_model(model)
+
+    @classmethod
+    def tearDownClass(cls):
+        with connection.schema_editor() as editor:
+            for model in reversed(SEAT_RACE_MODELS):
+                editor.delete_model(model)
+        super().tearDownClass()
+
+    def setUp(self):
+        user = UserCredentials.objects.create(username='race-trainer', user_role='trainer', password='!')
+        gym = Gym.objects.create(gym_name='Race gym', address='-', phone='+380000000000', email='race@example.com')
+        location = GymLocation.objects.create(location_name='Race hall', capacity=50, gym=gym)
+        trainer = Trainers.objects.create(
+            first_name='Race', last_name='Trainer', birth=datetime(1990, 1, 1).date(), gender='male',
+            phone='+380000000001', qualification='-', specialization='-', client_qty_constraint=100,
+            user_credential=user,
+        )
+        self.session = TrainingSessions.objects.create(
+            session_date=datetime(2030, 1, 1), start_time=time(6, 0), end_time=time(7, 0),
+            max_participants=self.SEATS, trainer=trainer, location=location,
+        )
+
+    def test_parallel_take_seat_never_oversubscribes(self):
+        barrier = threading.Barrier(self.ATTEMPTS)
+        taken = []
+
+        def attempt():
+            try:
+                barrier.wait()
+                taken.append(_take_seat(self.session.session_id))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=attempt) for _ in range(self.ATTEMPTS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.session.refresh_from_db()
+        self.assertEqual(sum(taken), self.SEATS)
+        self.assertEqual(self.session.registered_count, self.SEATS)
@@ -1,6 +1,7 @@
 from django.urls import path
 from . import views
-from .api import client_api, client_training_registration_api, client_subscriptions_api, client_progress_api, client_goal_api, client_feedbacks_api
+from .api import client_api, client_training_registration_api, client_subscriptions_api, client_progress_api, client_goal_api, client_feedbacks_api, \
+    client_onboarding_api, client_waitlist_api, client_dashboard_api
 
 urlpatterns = [
     path('client_profile/', views.client_profile, name='client_profile'),
@@ -38,8 +39,11 @@ urlpatterns = [
     # API endpoints
     path('api/clients/', client_api.ClientListAPI.as_view(), name='api_client_list'),
     path('api/clients/<int:user_id>/', client_api.ClientDetailAPI.as_view(), name='api_client_detail'),
+    path('api/client/dashboard/', client_dashboard_api.ClientDashboardAPI.as_view(), name='api_client_dashboard'),
+    path('api/clients/onboard/', client_onboarding_api.ClientOnboardingAPI.as_view(), name='api_client_onboard'),
     path('api/training_registrations/', client_training_registration_api.ClientTrainingRegistrationListAPI.as_view(), name='api_training_registration_list'),
     path('api/training_registrations/<int:registration_id>/', client_training_registration_api.ClientTrainingRegistrationDetailAPI.as_view(), name='api_training_registration_detail'),
+    path('api/waitlist/<int:session_id>/', client_waitlist_api.ClientWaitlistAPI.as_view(), name='api_waitlist'),
     path('api/subscriptions/', client_subscriptions_api.ClientSubscriptionListAPI.as_view(), name='api_subscription_list'),
     path('api/subscriptions/<int:user_subscription_id>/', client_subscriptions_api.ClientSubscriptionDetailAPI.as_view(), name='api_subscription_detail'),
     path('api/progress/', client_progress_api.ClientProgressListAPI.as_view(), name='api_progress_list'),
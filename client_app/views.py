@@ -1,26 +1,37 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib import messages
+from training_app.conflicts import CONFLICT_MESSAGES, find_client_conflict
+from training_app.lifecycle import ended
 from training_app.models import Trainers, TrainingSessions
-from .models import Client, ClientSubscription, ClientGoal, ClientFeedback, ClientProgress, ClientTrainingRegistration
+from .models import Client, ClientSubscription, ClientGoal, ClientFeedback, ClientProgress, ClientTrainingRegistration, \
+    SessionWaitlistEntry
 from .forms import ClientForm, BalanceTopUpForm, PurchaseSubscriptionForm, ClientGoalForm, ClientFeedbackForm, \
     ClientProgressForm
+from auth_app.idempotency import idempotent, mark_succeeded
 from auth_app.models import UserCredentials
+from .profiles import get_client_profile, get_trainer_profile, has_client_profile
+from .entitlements import has_active_subscription
+from .ledger import InsufficientFunds, charge, get_balance, top_up
+from .reservations import AlreadyRegistered, SessionFull, join_waitlist, release_seat, reserve_seat
 from django.db import IntegrityError, transaction
-from django.db.models import Exists, OuterRef, Case, When, Value, BooleanField
+from django.db.models import Exists, OuterRef, Q
 import logging
 from django.core.exceptions import ValidationError
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta
 from django.db.utils import DatabaseError, InternalError
 
 logger = logging.getLogger(__name__)
 
+CLIENTS_PAGE_SIZE = 50
+CLIENT_PROFILE_FIELDS = ('user_id', 'first_name', 'last_name', 'email', 'phone', 'birth')
+
 @login_required
 @permission_required(('auth_app.view_clients', 'auth_app.change_clients'), raise_exception=True)
 def client_profile(request):
     try:
         # Отримуємо профіль клієнта
-        client = Client.objects.get(user_credential=request.user)
+        client = get_client_profile(request)
 
         # Перевіряємо роль
         if request.user.user_role != 'client':
@@ -52,8 +63,8 @@ def client_profile(request):
                 if balance_form.is_valid():
                     amount = balance_form.cleaned_data['amount']
                     try:
-                        client.balance += amount
-                        client.save()
+                        # Один INSERT у журнал замість перезапису рядка клієнта
+                        top_up(client.user_id, amount)
                         logger.info(f"User {request.user.username} topped up balance by {amount} for client: {client.user_id}")
                         messages.success(request, f'Баланс поповнено на {amount} грн.')
                         return redirect('client_profile')
@@ -72,6 +83,7 @@ def client_profile(request):
             'trainer': client.trainer if client.trainer else None,
             'client_form': client_form,
             'balance_form': balance_form,
+            'balance': get_balance(client.user_id),
         }
         return render(request, 'clients/client_profile.html', context)
 
@@ -89,7 +101,7 @@ def client_profile(request):
 def create_profile(request):
     try:
         # Перевіряємо, чи профіль уже існує
-        if Client.objects.filter(user_credential=request.user).exists():
+        if has_client_profile(request):
             logger.info(f"User {request.user.username} already has a client profile, redirecting to client_profile")
             messages.info(request, 'Ваш профіль уже створено.')
             return redirect('client_profile')
@@ -132,15 +144,83 @@ def create_profile(request):
         messages.error(request, 'Сталася помилка при завантаженні сторінки.')
         return redirect('home')
 
+def _admin_clients_page(params):
+    """
+    Сторінка клієнтів для адміністратора: облікові записи з роллю client разом із
+    профілем і тренером (LEFT JOIN), keyset-пагінація за user_credential_id
+    (параметр after), фільтри name, email, phone, trainer. Спершу вибираються
+    id облікових записів сторінки (DISTINCT, бо в користувача може бути кілька
+    профілів), потім одним запитом - їхні профілі.
+    """
+    # Умови на профіль збираються в один filter(), щоб join до clients був один
+    profile_filter = Q()
+    name = params.get('name', '').strip()
+    for part in name.split():
+        profile_filter &= (Q(client_profiles__first_name__icontains=part) |
+                           Q(client_profiles__last_name__icontains=part))
+    email = params.get('email', '').strip()
+    if email:
+        profile_filter &= Q(client_profiles__email__icontains=email)
+    phone = params.get('phone', '').strip()
+    if phone:
+        profile_filter &= Q(client_profiles__phone__contains=phone)
+    trainer = params.get('trainer', '').strip()
+    if trainer.isdigit():
+        profile_filter &= Q(client_profiles__trainer_id=int(trainer))
+    users = UserCredentials.objects.filter(profile_filter, user_role='client')
+
+    after = params.get('after', '')
+    if after.isdigit():
+        users = users.filter(user_credential_id__gt=int(after))
+
+    page_ids = list(users.order_by('user_credential_id')
+                    .values_list('user_credential_id', flat=True)
+                    .distinct()[:CLIENTS_PAGE_SIZE + 1])
+    next_after = None
+    if len(page_ids) > CLIENTS_PAGE_SIZE:
+        page_ids = page_ids[:CLIENTS_PAGE_SIZE]
+        next_after = page_ids[-1]
+
+    fields = ['user_credential_id', 'username']
+    fields += [f'client_profiles__{field}' for field in CLIENT_PROFILE_FIELDS]
+    fields += ['client_profiles__trainer__first_name', 'client_profiles__trainer__last_name']
+    rows = (users.filter(user_credential_id__in=page_ids)
+            .order_by('user_credential_id', 'client_profiles__user_id')
+            .values_list(*fields))
+
+    clients_data = []
+    last_user_id = None
+    for row in rows:
+        user_id, username = row[0], row[1]
+        if user_id == last_user_id:
+            # Як і раніше, показується лише перший профіль користувача
+            continue
+        last_user_id = user_id
+        profile = dict(zip(CLIENT_PROFILE_FIELDS, row[2:2 + len(CLIENT_PROFILE_FIELDS)]))
+        trainer_first_name, trainer_last_name = row[-2:]
+        client = None
+        if profile['user_id'] is not None:
+            client = profile
+            client['trainer'] = None
+            if trainer_first_name is not None:
+                client['trainer'] = {'first_name': trainer_first_name, 'last_name': trainer_last_name}
+        clients_data.append({
+            'user': {'user_credential_id': user_id, 'username': username},
+            'client': client,
+        })
+    return clients_data, next_after
+
+
 @login_required
 @permission_required('auth_app.view_clients', raise_exception=True)
 def clients_list(request):
     try:
         clients_data = []
+        extra_context = {}
 
         if request.user.user_role == 'trainer':
             try:
-                trainer = Trainers.objects.get(user_credential=request.user)
+                trainer = get_trainer_profile(request)
                 clients = (Client.objects.filter(trainer=trainer)
                 .select_related('user_credential')
                 .prefetch_related('goals__goal'))
@@ -167,13 +247,17 @@ def clients_list(request):
                 return redirect('home')
         elif request.user.user_role == 'admin':
             # Для админов показываем всех пользователей с user_role='client'
-            users = UserCredentials.objects.filter(user_role='client')
-            for user in users:
-                client = Client.objects.filter(user_credential=user).first()
-                clients_data.append({
-                    'user': user,
-                    'client': client
-                })
+            clients_data, next_after = _admin_clients_page(request.GET)
+            filters = request.GET.copy()
+            filters.pop('after', None)
+            extra_context = {
+                'filters': {key: request.GET.get(key, '') for key in ('name', 'email', 'phone', 'trainer')},
+                'trainers': Trainers.objects.order_by('last_name', 'first_name')
+                .values('trainer_id', 'first_name', 'last_name'),
+                'next_after': next_after,
+                'is_first_page': not request.GET.get('after'),
+                'filter_query': filters.urlencode(),
+            }
             logger.info(f"Admin {request.user.username} viewed all clients list")
         else:
             logger.warning(
@@ -184,6 +268,7 @@ def clients_list(request):
         context = {
             'clients_data': clients_data,
             'user_role': request.user.user_role,
+            **extra_context,
         }
         return render(request, 'clients/clients_list.html', context)
 
@@ -242,7 +327,7 @@ def client_subscriptions_list(request):
 
         if request.user.user_role == 'client':
             try:
-                client = Client.objects.get(user_credential=request.user)
+                client = get_client_profile(request)
                 subscriptions = ClientSubscription.objects.filter(user=client).select_related('user', 'subscription')
                 logger.info(f"Client {request.user.username} viewed their subscriptions list")
             except Client.DoesNotExist:
@@ -251,7 +336,7 @@ def client_subscriptions_list(request):
                 return redirect('create_profile')
         elif request.user.user_role == 'trainer':
             try:
-                trainer = Trainers.objects.get(user_credential=request.user)
+                trainer = get_trainer_profile(request)
                 subscriptions = ClientSubscription.objects.filter(user__trainer=trainer).select_related('user', 'subscription')
                 logger.info(f"Trainer {request.user.username} viewed their clients' subscriptions list")
             except Trainers.DoesNotExist:
@@ -281,6 +366,7 @@ def client_subscriptions_list(request):
 
 @login_required
 @permission_required('auth_app.add_client_subscriptions', raise_exception=True)
+@idempotent
 def purchase_subscription(request):
     try:
         if request.user.user_role != 'client':
@@ -288,7 +374,7 @@ def purchase_subscription(request):
             messages.error(request, 'Покупка абонемента дозволена лише клієнтам.')
             return redirect('home')
         try:
-            client = Client.objects.get(user_credential=request.user)
+            client = get_client_profile(request)
         except Client.DoesNotExist:
             logger.warning(f"User {request.user.username} has no client profile")
             messages.error(request, 'Профіль клієнта не знайдено. Створіть профіль.')
@@ -297,27 +383,32 @@ def purchase_subscription(request):
             form = PurchaseSubscriptionForm(request.POST)
             if form.is_valid():
                 subscription = form.cleaned_data['subscription']
+                auto_renew = form.cleaned_data['auto_renew']
                 try:
                     with transaction.atomic():
-                        if client.balance < subscription.price:
-                            logger.warning(f"User {request.user.username} has insufficient balance for subscription {subscription.subscription_id}")
-                            messages.error(request, 'Недостатньо коштів на балансі.')
-                            return redirect('client_profile')
                         start_date = datetime.now()
                         end_date = start_date + timedelta(days=subscription.duration_days)
                         client_subscription = ClientSubscription(
                             user=client,
                             subscription=subscription,
                             start_date=start_date,
-                            end_date=end_date
+                            end_date=end_date,
+                            auto_renew=auto_renew
                         )
                         client_subscription.clean()
                         client_subscription.save()
-                        client.balance -= subscription.price
-                        client.save()
+                        # Списання під блокуванням клієнта; нестача коштів відкочує і абонемент
+                        charge(client.user_id, subscription.price,
+                               reference=f'client_subscription:{client_subscription.user_subscription_id}')
                         logger.info(f"User {request.user.username} purchased subscription {subscription.subscription_id} for client {client.user_id}")
                         messages.success(request, f'Абонемент "{subscription.subscription_name}" успішно придбано!')
+                        # Відповідь стає повторюваною лише після фіксації транзакції
+                        transaction.on_commit(lambda: mark_succeeded(request))
                         return redirect('client_subscriptions_list')
+                except InsufficientFunds:
+                    logger.warning(f"User {request.user.username} has insufficient balance for subscription {subscription.subscription_id}")
+                    messages.error(request, 'Недостатньо коштів на балансі.')
+                    return redirect('client_profile')
                 except ValidationError as e:
                     logger.warning(f"Validation error for user {request.user.username} purchasing subscription: {str(e)}")
                     messages.error(request, f'Помилка: {str(e)}')
@@ -332,6 +423,7 @@ def purchase_subscription(request):
         context = {
             'form': form,
             'client': client,
+            'balance': get_balance(client.user_id),
         }
         return render(request, 'client_subscriptions/purchase_subscription.html', context)
     except Exception as e:
@@ -373,7 +465,7 @@ def client_goals_list(request):
             messages.error(request, 'Доступ до списку цілей дозволено лише клієнтам.')
             return redirect('home')
         try:
-            client = Client.objects.get(user_credential=request.user)
+            client = get_client_profile(request)
             goals = ClientGoal.objects.filter(user=client).select_related('user', 'goal')
             context = {
                 'goals': goals,
@@ -398,7 +490,7 @@ def add_client_goal(request):
             messages.error(request, 'Додавання цілей дозволено лише клієнтам.')
             return redirect('home')
         try:
-            client = Client.objects.get(user_credential=request.user)
+            client = get_client_profile(request)
         except Client.DoesNotExist:
             logger.warning(f"User {request.user.username} has no client profile")
             messages.error(request, 'Профіль клієнта не знайдено. Створіть профіль.')
@@ -446,7 +538,7 @@ def edit_client_goal(request, client_goal_id):
             messages.error(request, 'Редагування цілей дозволено лише клієнтам.')
             return redirect('client_goals_list')
         try:
-            client = Client.objects.get(user_credential=request.user)
+            client = get_client_profile(request)
             goal = ClientGoal.objects.get(client_goal_id=client_goal_id, user=client)
         except Client.DoesNotExist:
             logger.warning(f"User {request.user.username} has no client profile")
@@ -496,7 +588,7 @@ def delete_client_goal(request, client_goal_id):
             return redirect('client_goals_list')
         if request.method == 'POST':
             try:
-                client = Client.objects.get(user_credential=request.user)
+                client = get_client_profile(request)
                 goal = ClientGoal.objects.get(client_goal_id=client_goal_id, user=client)
                 goal_name = goal.goal.goal_name
                 goal.delete()
@@ -536,7 +628,7 @@ def client_feedbacks_list(request):
         #     messages.error(request, 'Доступ до списку відгуків дозволено лише клієнтам.')
         #     return redirect('home')
         try:
-            client = Client.objects.get(user_credential=request.user)
+            client = get_client_profile(request)
             feedbacks = ClientFeedback.objects.filter(user=client).select_related('user', 'trainer')
             logger.info(f"Client {request.user.username} viewed their feedbacks list")
             context = {
@@ -562,7 +654,7 @@ def add_client_feedback(request):
             messages.error(request, 'Додавання відгуків дозволено лише клієнтам.')
             return redirect('client_feedbacks_list')
         try:
-            client = Client.objects.get(user_credential=request.user)
+            client = get_client_profile(request)
             if not client.trainer:
                 logger.warning(f"User {request.user.username} has no assigned trainer")
                 messages.error(request, 'У вас немає призначеного тренера для залишення відгуку.')
@@ -619,7 +711,7 @@ def edit_client_feedback(request, feedback_id):
             messages.error(request, 'Редагування відгуків дозволено лише клієнтам.')
             return redirect('client_feedbacks_list')
         try:
-            client = Client.objects.get(user_credential=request.user)
+            client = get_client_profile(request)
             feedback = ClientFeedback.objects.get(feedback_id=feedback_id, user=client)
         except Client.DoesNotExist:
             logger.warning(f"User {request.user.username} has no client profile")
@@ -678,7 +770,7 @@ def delete_client_feedback(request, feedback_id):
             return redirect('client_feedbacks_list')
         if request.method == 'POST':
             try:
-                client = Client.objects.get(user_credential=request.user)
+                client = get_client_profile(request)
                 feedback = ClientFeedback.objects.get(feedback_id=feedback_id, user=client)
                 feedback_title = feedback.title
                 feedback.delete()
@@ -701,6 +793,7 @@ def delete_client_feedback(request, feedback_id):
 
 @login_required
 @permission_required('auth_app.view_trainers', raise_exception=True)
+@idempotent
 def assign_trainer(request, trainer_id):
     try:
         if request.user.user_role != 'client':
@@ -712,7 +805,7 @@ def assign_trainer(request, trainer_id):
             messages.error(request, 'Невалідний запит.')
             return redirect('trainers_list')
         try:
-            client = Client.objects.get(user_credential=request.user)
+            client = get_client_profile(request)
             trainer = Trainers.objects.get(trainer_id=trainer_id)
         except Client.DoesNotExist:
             logger.warning(f"User {request.user.username} has no client profile")
@@ -722,6 +815,11 @@ def assign_trainer(request, trainer_id):
             logger.warning(f"Trainer {trainer_id} not found for user {request.user.username}")
             messages.error(request, 'Тренера не знайдено.')
             return redirect('trainers_list')
+        if not has_active_subscription(client.user_id):
+            # Перевірка з кешу замість розбору помилки тригера БД
+            logger.warning(f"User {request.user.username} attempted to assign trainer {trainer_id} without an active subscription")
+            messages.error(request, 'Помилка: для призначення тренера потрібен активний абонемент.')
+            return redirect('client_subscriptions_list')
         try:
             with transaction.atomic():
                 try:
@@ -733,6 +831,7 @@ def assign_trainer(request, trainer_id):
                         return redirect('trainers_list')
                 logger.info(f"User {request.user.username} assigned trainer {trainer.user_credential.username} (trainer_id: {trainer_id})")
                 messages.success(request, f'Ви успішно записалися до тренера {trainer.first_name} {trainer.last_name}!')
+                transaction.on_commit(lambda: mark_succeeded(request))
                 return redirect('trainers_list')
         except DatabaseError as e:
             logger.warning(f"User {request.user.username} failed to assign trainer {trainer_id} due to database error: {str(e)}")
@@ -760,7 +859,7 @@ def trainer_feedbacks(request):
             messages.error(request, 'Перегляд відгуків дозволено лише тренерам.')
             return redirect('home')
         try:
-            trainer = Trainers.objects.get(user_credential=request.user)
+            trainer = get_trainer_profile(request)
         except Trainers.DoesNotExist:
             logger.warning(f"User {request.user.username} has no trainer profile")
             messages.error(request, 'Профіль тренера не знайдено.')
@@ -788,8 +887,8 @@ def client_training_registrations(request):
             messages.error(request, 'Перегляд тренувальних сесій дозволено лише клієнтам.')
             return redirect('home')
         try:
-            client = Client.objects.get(user_credential=request.user)
-            if client.subscriptions.count() == 0:
+            client = get_client_profile(request)
+            if not has_active_subscription(client.user_id):
                 messages.error(request, 'Необхідно мати активний абонемент для перегляду тренувальних сесій.')
                 return redirect('client_subscriptions_list')
         except Client.DoesNotExist:
@@ -813,25 +912,20 @@ def client_training_registrations(request):
                     )
                 )
             ).annotate(
-                is_finished=Case(
-                    When(
-                        session_date__lt=datetime.now().date(),
-                        then=Value(True)
-                    ),
-                    When(
-                        session_date=datetime.now().date(),
-                        end_time__lt=datetime.now().time(),
-                        then=Value(True)
-                    ),
-                    default=Value(False),
-                    output_field=BooleanField()
-            )).order_by('session_date', 'start_time')
+                is_waitlisted=Exists(
+                    SessionWaitlistEntry.objects.filter(
+                        session=OuterRef('pk'),
+                        user=client
+                    )
+                )
+            ).exclude(
+                # Сесії, які закінчились, але ще не позначені командою finish_training_sessions
+                ended()
+            ).order_by('session_date', 'start_time')
             logger.info(f"User {request.user.username} viewed training sessions (count: {sessions.count()})")
         return render(request, 'client_trainings/client_trainings.html', {
             'sessions': sessions,
             'client': client,
-            'today': date.today(),
-            'now_time': datetime.now().time(),
         })
     except Exception as e:
         logger.error(f"Error accessing client trainings for user {request.user.username}: {str(e)}")
@@ -841,6 +935,7 @@ def client_training_registrations(request):
 
 @login_required
 @permission_required('auth_app.add_client_training_registrations', raise_exception=True)
+@idempotent
 def register_for_session(request, session_id):
     try:
         if request.user.user_role != 'client':
@@ -852,7 +947,7 @@ def register_for_session(request, session_id):
             messages.error(request, 'Невалідний запит.')
             return redirect('client_trainings')
         try:
-            client = Client.objects.get(user_credential=request.user)
+            client = get_client_profile(request)
             session = TrainingSessions.objects.get(session_id=session_id, status='заплановано')
         except Client.DoesNotExist:
             logger.warning(f"User {request.user.username} has no client profile")
@@ -866,21 +961,31 @@ def register_for_session(request, session_id):
             logger.warning(f"User {request.user.username} attempted to register for session {session_id} not belonging to their trainer")
             messages.error(request, 'Ви можете реєструватися лише на сесії вашого тренера.')
             return redirect('client_trainings')
-        current_participants = ClientTrainingRegistration.objects.filter(session=session).count()
-        if current_participants >= session.max_participants:
-            logger.warning(f"User {request.user.username} failed to register for session {session_id}: session is full")
-            messages.error(request, 'Сесія заповнена. Оберіть іншу.')
+        conflicting_session_id = find_client_conflict(client.user_id, session)
+        if conflicting_session_id is not None:
+            logger.warning(f"User {request.user.username} attempted to register for session {session_id} overlapping session {conflicting_session_id}")
+            messages.error(request, CONFLICT_MESSAGES['client'])
             return redirect('client_trainings')
         try:
-            with transaction.atomic():
-                registration = ClientTrainingRegistration.objects.create(
-                    user=client,
-                    session=session
-                )
-                logger.info(f"User {request.user.username} registered for session {session_id}")
-                messages.success(request, f'Ви успішно зареєструвалися на сесію {session.session_date.strftime("%d.%m.%Y")} {session.start_time.strftime("%H:%M")}!')
-                return redirect('client_trainings')
-        except IntegrityError:
+            # Місце займається атомарно разом зі вставкою реєстрації
+            registration = reserve_seat(client, session.session_id)
+            logger.info(f"User {request.user.username} registered for session {session_id}")
+            messages.success(request, f'Ви успішно зареєструвалися на сесію {session.session_date.strftime("%d.%m.%Y")} {session.start_time.strftime("%H:%M")}!')
+            mark_succeeded(request)
+            return redirect('client_trainings')
+        except SessionFull:
+            # Замість повторних спроб клієнт один раз стає в чергу очікування
+            position = join_waitlist(client, session.session_id)
+            if position is None:
+                logger.info(f"User {request.user.username} registered for session {session_id} from waitlist")
+                messages.success(request, 'Місце звільнилося - ви зареєстровані на сесію!')
+            else:
+                logger.info(f"User {request.user.username} joined waitlist for session {session_id} at position {position}")
+                messages.info(request, f'Сесія заповнена. Вас додано до черги очікування, ваша позиція: {position}. '
+                                       f'Якщо місце звільниться, вас буде зареєстровано автоматично.')
+            mark_succeeded(request)
+            return redirect('client_trainings')
+        except AlreadyRegistered:
             logger.warning(f"User {request.user.username} already registered for session {session_id}")
             messages.error(request, 'Ви вже зареєстровані на цю сесію.')
             return redirect('client_trainings')
@@ -907,7 +1012,7 @@ def cancel_registration(request, session_id):
             messages.error(request, 'Невалідний запит.')
             return redirect('client_trainings')
         try:
-            client = Client.objects.get(user_credential=request.user)
+            client = get_client_profile(request)
             session = TrainingSessions.objects.get(session_id=session_id, status='заплановано')
             registration = ClientTrainingRegistration.objects.get(user=client, session=session)
         except Client.DoesNotExist:
@@ -924,7 +1029,7 @@ def cancel_registration(request, session_id):
             return redirect('client_trainings')
         try:
             with transaction.atomic():
-                registration.delete()
+                release_seat(registration)
                 logger.info(f"User {request.user.username} cancelled registration for session {session_id}")
                 messages.success(request, f'Реєстрацію на сесію {session.session_date.strftime("%d.%m.%Y")} {session.start_time.strftime("%H:%M")} скасовано!')
                 return redirect('client_trainings')
@@ -944,7 +1049,7 @@ def cancel_registration(request, session_id):
 @permission_required('auth_app.view_client_progress', raise_exception=True)
 def client_progress(request):
     try:
-        client = Client.objects.get(user_credential=request.user)
+        client = get_client_profile(request)
         progress_records = ClientProgress.objects.filter(
             user=client
         ).select_related('session', 'session__training_type').order_by('-session__session_date')
@@ -966,7 +1071,7 @@ def client_progress(request):
 @permission_required('auth_app.add_client_progress', raise_exception=True)
 def add_client_progress(request, session_id, client_id):
     try:
-        trainer = Trainers.objects.get(user_credential=request.user)
+        trainer = get_trainer_profile(request)
         try:
             session = TrainingSessions.objects.get(session_id=session_id, trainer=trainer, status='завершено')
             client = Client.objects.get(user_id=client_id)
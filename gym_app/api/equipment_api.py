@@ -6,6 +6,7 @@ from django.db import IntegrityError
 from ..models import Equipment
 from rest_framework import serializers
 import logging
+from sportmanagment.pagination import KeysetPagination
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +22,11 @@ class EquipmentListAPI(APIView):
         if not request.user.has_perm('auth_app.view_equipment'):
             logger.warning(f"User {request.user.username} attempted to access EquipmentListAPI without permission")
             return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
-        equipment = Equipment.objects.all().values('equipment_id', 'equipment_name', 'description')
+        paginator = KeysetPagination('equipment_id')
+        equipment = Equipment.objects.values('equipment_id', 'equipment_name', 'description')
+        equipment = paginator.paginate_queryset(equipment, request)
         logger.debug(f"EquipmentListAPI accessed by user: {request.user.username}")
-        return Response(list(equipment))
+        return paginator.get_paginated_response(equipment)
 
     def post(self, request):
         if not request.user.has_perm('auth_app.add_equipment'):
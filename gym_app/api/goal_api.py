@@ -6,6 +6,7 @@ from django.db import IntegrityError
 from ..models import Goal
 from rest_framework import serializers
 import logging
+from sportmanagment.pagination import KeysetPagination
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +22,11 @@ class GoalListAPI(APIView):
         if not request.user.has_perm('auth_app.view_goals'):
             logger.warning(f"User {request.user.username} attempted to access GoalListAPI without permission")
             return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
-        goals = Goal.objects.all().values('goal_id', 'goal_name', 'description')
+        paginator = KeysetPagination('goal_id')
+        goals = Goal.objects.values('goal_id', 'goal_name', 'description')
+        goals = paginator.paginate_queryset(goals, request)
         logger.debug(f"GoalListAPI accessed by user: {request.user.username}")
-        return Response(list(goals))
+        return paginator.get_paginated_response(goals)
 
     def post(self, request):
         if not request.user.has_perm('auth_app.add_goals'):
@@ -7,6 +7,7 @@ from django.db import IntegrityError
 from ..models import Gym
 from rest_framework import serializers
 import logging
+from sportmanagment.pagination import KeysetPagination
 
 logger = logging.getLogger(__name__)
 
@@ -22,9 +23,11 @@ class GymListAPI(APIView):
         if not request.user.has_perm('auth_app.view_gyms'):
             logger.warning(f"User {request.user.username} attempted to access GymListAPI without permission")
             return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
-        gyms = Gym.objects.all().values('gym_id', 'gym_name', 'address', 'phone', 'email')
+        paginator = KeysetPagination('gym_id')
+        gyms = Gym.objects.values('gym_id', 'gym_name', 'address', 'phone', 'email')
+        gyms = paginator.paginate_queryset(gyms, request)
         logger.debug(f"GymListAPI accessed by user: {request.user.username}")
-        return Response(list(gyms))
+        return paginator.get_paginated_response(gyms)
 
     def post(self, request):
         if not request.user.has_perm('auth_app.add_gyms'):
@@ -6,6 +6,7 @@ from django.db import IntegrityError
 from ..models import GymEquipment, Equipment, GymLocation
 from rest_framework import serializers
 import logging
+from sportmanagment.pagination import KeysetPagination
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +29,11 @@ class GymEquipmentListAPI(APIView):
             equipment = GymEquipment.objects.filter(location_id=location_id)
         else:
             equipment = GymEquipment.objects.all()
+        paginator = KeysetPagination('gym_equipment_id', filters={'location': 'location_id', 'equipment': 'equipment_id'})
+        equipment = paginator.paginate_queryset(equipment, request)
         serializer = GymEquipmentSerializer(equipment, many=True)
         logger.debug(f"GymEquipmentListAPI accessed by user: {request.user.username}")
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         if not request.user.has_perm('auth_app.add_gym_equipment'):
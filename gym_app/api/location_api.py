@@ -6,6 +6,7 @@ from django.db import IntegrityError
 from ..models import GymLocation, Gym
 from rest_framework import serializers
 import logging
+from sportmanagment.pagination import KeysetPagination
 
 logger = logging.getLogger(__name__)
 
@@ -27,9 +28,11 @@ class GymLocationListAPI(APIView):
             locations = GymLocation.objects.filter(gym_id=gym_id)
         else:
             locations = GymLocation.objects.all()
+        paginator = KeysetPagination('location_id', filters={'gym': 'gym_id'})
+        locations = paginator.paginate_queryset(locations, request)
         serializer = GymLocationSerializer(locations, many=True)
         logger.debug(f"GymLocationListAPI accessed by user: {request.user.username}")
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         if not request.user.has_perm('auth_app.add_gym_locations'):
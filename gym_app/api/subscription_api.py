@@ -6,6 +6,7 @@ from django.db import IntegrityError
 from ..models import Subscription
 from rest_framework import serializers
 import logging
+from sportmanagment.pagination import KeysetPagination
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +22,11 @@ class SubscriptionListAPI(APIView):
         if not request.user.has_perm('auth_app.view_subscriptions'):
             logger.warning(f"User {request.user.username} attempted to access SubscriptionListAPI without permission")
             return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
-        subscriptions = Subscription.objects.all().values('subscription_id', 'subscription_name', 'price', 'duration_days', 'description')
+        paginator = KeysetPagination('subscription_id')
+        subscriptions = Subscription.objects.values('subscription_id', 'subscription_name', 'price', 'duration_days', 'description')
+        subscriptions = paginator.paginate_queryset(subscriptions, request)
         logger.debug(f"SubscriptionListAPI accessed by user: {request.user.username}")
-        return Response(list(subscriptions))
+        return paginator.get_paginated_response(subscriptions)
 
     def post(self, request):
         if not request.user.has_perm('auth_app.add_subscriptions'):
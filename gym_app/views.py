@@ -8,6 +8,7 @@ from rest_framework.permissions import IsAuthenticated
 from .models import Gym, Equipment, GymLocation, GymEquipment, Subscription, Goal
 from .forms import GymForm, EquipmentForm, LocationForm, GymEquipmentForm, SubscriptionForm, GoalForm
 from django.db import IntegrityError
+from sportmanagment.pagination import KeysetPagination
 
 # Create your views here.
 
@@ -71,9 +72,11 @@ class GymListAPI(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        gyms = Gym.objects.all().values('gym_id', 'gym_name', 'address', 'phone', 'email')
+        paginator = KeysetPagination('gym_id')
+        gyms = Gym.objects.values('gym_id', 'gym_name', 'address', 'phone', 'email')
+        gyms = paginator.paginate_queryset(gyms, request)
         #logger.debug(f"API accessed by user: {request.user.username}")
-        return Response(list(gyms))
+        return paginator.get_paginated_response(gyms)
 
 
 ################### equipment #####################
@@ -139,8 +142,10 @@ class EquipmentListAPI(APIView):
     def get(self, request):
         if not request.user.has_perm('auth_app.view_equipment'):
             return Response({"error": "Permission denied"}, status=403)
-        equipment = Equipment.objects.all().values('equipment_id', 'equipment_name', 'description')
-        return Response(list(equipment))
+        paginator = KeysetPagination('equipment_id')
+        equipment = Equipment.objects.values('equipment_id', 'equipment_name', 'description')
+        equipment = paginator.paginate_queryset(equipment, request)
+        return paginator.get_paginated_response(equipment)
 
 
 ####### location #######
@@ -0,0 +1,145 @@
+"""
+Спільна keyset-пагінація для списків DRF API.
+
+Замість OFFSET сторінка обмежується умовою "ключ більший за останній показаний",
+тому вартість запиту не залежить від номера сторінки, а в пам'яті одночасно
+лежить не більше page_size + 1 рядків. Курсор непрозорий для клієнта:
+base64 від JSON з порядком сортування та значеннями ключа останнього рядка.
+
+Фільтри та поля сортування задаються білим списком у кожному view. Для
+сортування за непервинним полем ключем є пара (поле, pk), і в БД має бути
+складений індекс на ці дві колонки.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering_query_param = 'ordering'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, pk_field, filters=None, orderings=(), page_size=None):
+        """
+        pk_field - первинний ключ моделі (унікальний, не NULL);
+        filters - {параметр запиту: lookup}, наприклад {'trainer': 'trainer_id'};
+        orderings - додаткові дозволені поля сортування (не NULL).
+        """
+        self.pk_field = pk_field
+        self.filters = filters or {}
+        self.orderings = {pk_field, *orderings}
+        if page_size:
+            self.page_size = page_size
+        self.next_cursor = None
+
+    def filter_queryset(self, queryset, request):
+        for param, lookup in self.filters.items():
+            value = request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                queryset = queryset.filter(**{lookup: value})
+            except (ValueError, TypeError, DjangoValidationError):
+                raise ValidationError({param: 'Invalid value'})
+        return queryset
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_query_param) or self.pk_field
+        if ordering.lstrip('-') not in self.orderings:
+            raise ValidationError({self.ordering_query_param: f"Allowed values: {', '.join(sorted(self.orderings))}"})
+        return ordering
+
+    def _keys(self, ordering):
+        field = ordering.lstrip('-')
+        return [field] if field == self.pk_field else [field, self.pk_field]
+
+    def encode_cursor(self, ordering, values):
+        payload = json.dumps({'o': ordering, 'v': values}, cls=DjangoJSONEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            ordering, values = payload['o'], payload['v']
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(ordering, str) or ordering.lstrip('-') not in self.orderings
+                or not isinstance(values, list) or len(values) != len(self._keys(ordering))):
+            raise NotFound(self.invalid_cursor_message)
+        return ordering, values
+
+    def _after(self, keys, values, descending):
+        # (k1, k2) > (v1, v2)  ==  k1 > v1 OR (k1 = v1 AND k2 > v2)
+        operator = 'lt' if descending else 'gt'
+        condition = Q()
+        for index, key in enumerate(keys):
+            step = Q(**{f'{key}__{operator}': values[index]})
+            for previous_key, previous_value in zip(keys[:index], values[:index]):
+                step &= Q(**{previous_key: previous_value})
+            condition |= step
+        return condition
+
+    @staticmethod
+    def _value(item, key):
+        return item[key] if isinstance(item, dict) else getattr(item, key)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        queryset = self.filter_queryset(queryset, request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            # Порядок сортування фіксується в курсорі першої сторінки
+            ordering, values = self.decode_cursor(cursor)
+        else:
+            ordering, values = self.get_ordering(request), None
+        descending = ordering.startswith('-')
+        keys = self._keys(ordering)
+
+        if values is not None:
+            try:
+                queryset = queryset.filter(self._after(keys, values, descending))
+            except (ValueError, TypeError, DjangoValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        page_size = self.get_page_size(request)
+        order_by = [f'-{key}' if descending else key for key in keys]
+        page = list(queryset.order_by(*order_by)[:page_size + 1])
+
+        self.next_cursor = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = self.encode_cursor(ordering, [self._value(page[-1], key) for key in keys])
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.ordering_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
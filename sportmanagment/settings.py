@@ -52,6 +52,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'client_app.middleware.ProfileMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -91,6 +92,64 @@ DATABASES = {
     }
 }
 
+# Кеш використовується для штампів версій дозволів і короткоживучих даних авторизації.
+# Для кількох воркерів gunicorn потрібен спільний бекенд (наприклад, FileBasedCache або Redis).
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', 'sportmanagment'),
+    }
+}
+
+# Як часто (секунди) воркер перевіряє лічильник версії дозволів у БД
+PERMISSION_VERSION_TTL = int(os.getenv('PERMISSION_VERSION_TTL', 30))
+
+# Скільки секунд рядок користувача живе в кеші UserCredentialsBackend.get_user
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 60))
+
+# Скільки секунд живуть у кеші інтервали абонементів клієнта (client_app.entitlements)
+ENTITLEMENT_CACHE_TTL = int(os.getenv('ENTITLEMENT_CACHE_TTL', 3600))
+
+# Листи клієнтам надсилає команда send_client_notifications; за замовчуванням - у консоль
+EMAIL_BACKEND = os.getenv('DJANGO_EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 25))
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@sportmanagment.local')
+# Після стількох невдалих спроб сповіщення більше не надсилається
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', 5))
+
+# Зведені дані головного екрана клієнта (client_app.dashboard): час життя в кеші
+DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', 30))
+
+# Скільки секунд зберігається відповідь для повторів з тим самим Idempotency-Key
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', 24 * 60 * 60))
+
+# Час життя підписаних токенів API (секунди)
+ACCESS_TOKEN_LIFETIME = int(os.getenv('ACCESS_TOKEN_LIFETIME', 300))
+REFRESH_TOKEN_LIFETIME = int(os.getenv('REFRESH_TOKEN_LIFETIME', 7 * 24 * 3600))
+
+# Індекс логінів для перевірки доступності: докачування нових рядків і повна перебудова (секунди)
+USERNAME_INDEX_REFRESH = 5
+USERNAME_INDEX_REBUILD = 300
+
+# Пул процесів для хешування паролів (0 - хешувати в процесі воркера)
+PASSWORD_HASHING_WORKERS = int(os.getenv('PASSWORD_HASHING_WORKERS', 2))
+PASSWORD_HASHING_QUEUE_LIMIT = int(os.getenv('PASSWORD_HASHING_QUEUE_LIMIT', 16))
+PASSWORD_HASHING_TIMEOUT = 10
+
+# Token bucket для логіна та реєстрації: (місткість, поповнення токенів за секунду)
+AUTH_RATE_LIMITS = {
+    'login': {
+        'ip': (int(os.getenv('LOGIN_RATE_IP_BURST', 20)), 20 / 60),
+        'username': (int(os.getenv('LOGIN_RATE_USERNAME_BURST', 10)), 10 / 600),
+    },
+    'register': {
+        'ip': (int(os.getenv('REGISTER_RATE_IP_BURST', 5)), 5 / 600),
+    },
+}
+# Вимикає обмеження лише для навантажувальних замірів (bench_login) на окремому сервері
+AUTH_RATE_LIMITS_ENABLED = os.getenv('AUTH_RATE_LIMITS_ENABLED', '1') != '0'
+
 AUTHENTICATION_BACKENDS = [
     'auth_app.backends.UserCredentialsBackend',  
     'django.contrib.auth.backends.ModelBackend',  
@@ -99,6 +158,7 @@ AUTHENTICATION_BACKENDS = [
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
+        'auth_app.authentication.SignedTokenAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -0,0 +1,77 @@
+"""
+Потокове вивантаження великих колекцій з list API.
+
+Параметр ?export=ndjson (рядок JSON на запис) або ?export=json (масив JSON,
+що віддається частинами). Рядки читаються серверним курсором через
+values_list(...).iterator(chunk_size), перетворюються на JSON без DRF-серіалізаторів
+і одразу пишуться у StreamingHttpResponse, тож пам'ять не залежить від розміру
+таблиці, а перший байт іде клієнту після першої пачки рядків.
+
+Параметр називається export, а не format, бо format DRF використовує для
+вибору рендерера.
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+EXPORT_QUERY_PARAM = 'export'
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+EXPORT_CHUNK_SIZE = 2000
+# Скільки рядків склеюється в один шматок відповіді
+EXPORT_BATCH_SIZE = 200
+
+
+def export_requested(request):
+    return request.query_params.get(EXPORT_QUERY_PARAM) in EXPORT_FORMATS
+
+
+def _encoded_rows(rows, fields):
+    encode = DjangoJSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+    for row in rows:
+        yield encode(dict(zip(fields, row)))
+
+
+def _batched(lines, separator):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield separator.join(batch)
+            batch = []
+    if batch:
+        yield separator.join(batch)
+
+
+def _ndjson(lines):
+    for chunk in _batched(lines, '\n'):
+        yield chunk + '\n'
+
+
+def _json_array(lines):
+    # Відкривальна дужка йде одразу, до першого запиту в БД
+    yield '['
+    first = True
+    for chunk in _batched(lines, ','):
+        yield chunk if first else ',' + chunk
+        first = False
+    yield ']'
+
+
+def stream_export(request, queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Повертає StreamingHttpResponse з полями fields усіх рядків queryset
+    у порядку первинного ключа.
+    """
+    export_format = request.query_params.get(EXPORT_QUERY_PARAM)
+    rows = (queryset.order_by(queryset.model._meta.pk.name)
+            .values_list(*fields)
+            .iterator(chunk_size=chunk_size))
+    lines = _encoded_rows(rows, fields)
+    content = _ndjson(lines) if export_format == 'ndjson' else _json_array(lines)
+
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[export_format])
+    # nginx не повинен буферизувати відповідь цілком
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sportmanagment.settings')
 
 application = get_wsgi_application()
+
+# Матриця дозволів завантажується при старті воркера, а не на першому запиті
+from auth_app.permission_cache import warm_up  # noqa: E402
+
+warm_up()
@@ -1,10 +1,10 @@
 from rest_framework import serializers
+from training_app.conflicts import CONFLICT_MESSAGES, find_conflicts
 from training_app.models import TrainingType, Trainers, TrainingSessions
 from gym_app.models import GymLocation
 from auth_app.models import UserCredentials
 from datetime import datetime
 from django.core.validators import RegexValidator
-from django.db.models import Q
 
 class TrainingTypeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -90,7 +90,7 @@ class TrainingSessionsSerializer(serializers.ModelSerializer):
         fields = [
             'session_id', 'session_date', 'start_time', 'end_time', 'max_participants',
             'training_type', 'training_type_id', 'trainer', 'trainer_id', 'location',
-            'location_id', 'status'
+            'location_id', 'status', 'registered_count'
         ]
 
     def validate_session_date(self, value):
@@ -103,7 +103,8 @@ class TrainingSessionsSerializer(serializers.ModelSerializer):
         start_time = data.get('start_time')
         end_time = data.get('end_time')
         session_date = data.get('session_date')
-        trainer = data.get('trainer')
+        # Якщо view зберігає сесію з іншим тренером (профіль користувача), перевіряємо саме його
+        trainer = self.context['trainer'] if 'trainer' in self.context else data.get('trainer')
 
         if start_time and end_time and start_time >= end_time:
             raise serializers.ValidationError('Час початку повинен бути раніше часу закінчення.')
@@ -118,4 +119,44 @@ class TrainingSessionsSerializer(serializers.ModelSerializer):
             if existing_session.exists():
                 raise serializers.ValidationError('Сесія на цей час для цього тренера вже існує.')
 
-        return data
\ No newline at end of file
+        # При частковому оновленні відсутні поля беремо з поточної сесії
+        def current(field):
+            return data.get(field, getattr(self.instance, field, None))
+
+        session_date, start_time, end_time = current('session_date'), current('start_time'), current('end_time')
+        location = current('location')
+        if 'trainer' not in self.context:
+            trainer = current('trainer')
+        if session_date and start_time and end_time and start_time < end_time and current('status') != 'скасовано':
+            conflicts = find_conflicts(
+                session_date, start_time, end_time,
+                trainer_id=trainer.pk if trainer else None,
+                location_id=location.pk if location else None,
+                exclude_session_id=self.instance.pk if self.instance else None,
+            )
+            if conflicts:
+                raise serializers.ValidationError([CONFLICT_MESSAGES[kind] for kind in conflicts])
+
+        return data
+
+
+class TrainingSessionsCancelSerializer(serializers.Serializer):
+    MAX_SESSION_IDS = 1000
+
+    session_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, max_length=MAX_SESSION_IDS
+    )
+    trainer_id = serializers.IntegerField(required=False, min_value=1)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    reason = serializers.CharField(required=False, allow_blank=True, max_length=255)
+
+    def validate(self, data):
+        if data.get('session_ids'):
+            return data
+        if not all(data.get(field) for field in ('trainer_id', 'date_from', 'date_to')):
+            raise serializers.ValidationError('Вкажіть session_ids або trainer_id, date_from і date_to.')
+        if data['date_from'] > data['date_to']:
+            raise serializers.ValidationError('date_from не може бути пізніше date_to.')
+        return data
+
@@ -5,6 +5,7 @@ from training_app.models import Trainers
 from .serializers import TrainersSerializer
 from rest_framework.permissions import IsAuthenticated
 import logging
+from sportmanagment.pagination import KeysetPagination
 
 logger = logging.getLogger(__name__)
 
@@ -13,10 +14,11 @@ class TrainersListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        trainers = Trainers.objects.all()
+        paginator = KeysetPagination('trainer_id', filters={'user_credential': 'user_credential_id'})
+        trainers = paginator.paginate_queryset(Trainers.objects.all(), request)
         serializer = TrainersSerializer(trainers, many=True)
         logger.debug(f"User {request.user.username} viewed trainers: {[t.trainer_id for t in trainers]}")
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         if not request.user.has_perm('auth_app.add_trainers'):
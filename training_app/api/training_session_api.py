@@ -1,39 +1,106 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from training_app.cancellation import cancel_sessions
 from training_app.models import TrainingSessions, Trainers
-from .serializers import TrainingSessionsSerializer
+from .serializers import TrainingSessionsCancelSerializer, TrainingSessionsSerializer
+from auth_app.idempotency import idempotent
+from client_app.profiles import get_trainer_profile
 
 from rest_framework.permissions import IsAuthenticated
 import logging
+from django.core.files.storage import default_storage
+from datetime import datetime, time, timedelta
+from sportmanagment.pagination import KeysetPagination
+from sportmanagment.streaming import export_requested, stream_export
 
 logger = logging.getLogger(__name__)
 
+# Сортування та фільтр за датою спираються на індекс
+# CREATE INDEX training_sessions_date_id_idx ON "training_scheme"."training_sessions" (session_date, session_id);
+SESSION_FILTERS = {
+    'trainer': 'trainer_id',
+    'location': 'location_id',
+    'training_type': 'training_type_id',
+    'date_from': 'session_date__gte',
+    'date_to': 'session_date__lte',
+}
+
+# Поля швидкого шляху читання списку: один SELECT з JOIN і словники з values()
+# замість вкладених серіалізаторів. Форма відповіді та сама, що в TrainingSessionsSerializer.
+SESSION_LIST_VALUES = (
+    'session_id', 'session_date', 'start_time', 'end_time', 'max_participants', 'status', 'registered_count',
+    'training_type_id', 'training_type__title', 'training_type__description',
+    'trainer_id', 'trainer__first_name', 'trainer__last_name', 'trainer__birth', 'trainer__gender',
+    'trainer__phone', 'trainer__qualification', 'trainer__specialization', 'trainer__bio', 'trainer__photo',
+    'trainer__client_qty_constraint', 'location__location_name',
+)
+TRAINER_VALUES = ('first_name', 'last_name', 'birth', 'gender', 'phone', 'qualification', 'specialization', 'bio',
+                  'client_qty_constraint')
+
+SESSION_EXPORT_FIELDS = (
+    'session_id', 'session_date', 'start_time', 'end_time', 'max_participants',
+    'training_type_id', 'trainer_id', 'location_id', 'status',
+)
+
+
+def session_rows(rows):
+    """Перетворює рядки SESSION_LIST_VALUES на відповідь у форматі TrainingSessionsSerializer."""
+    results = []
+    for row in rows:
+        trainer = {'trainer_id': row['trainer_id']}
+        trainer.update((field, row[f'trainer__{field}']) for field in TRAINER_VALUES)
+        trainer['full_name'] = f"{trainer['first_name']} {trainer['last_name']}"
+        photo = row['trainer__photo']
+        trainer['photo'] = default_storage.url(photo) if photo else None
+        results.append({
+            'session_id': row['session_id'],
+            'session_date': row['session_date'],
+            'start_time': row['start_time'],
+            'end_time': row['end_time'],
+            'max_participants': row['max_participants'],
+            'training_type': row['training_type_id'] and {
+                'training_type_id': row['training_type_id'],
+                'title': row['training_type__title'],
+                'description': row['training_type__description'],
+            },
+            'trainer': trainer,
+            'location': row['location__location_name'],
+            'status': row['status'],
+            'registered_count': row['registered_count'],
+        })
+    return results
+
 
 class TrainingSessionsListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        sessions = TrainingSessions.objects.all()
-        serializer = TrainingSessionsSerializer(sessions, many=True)
-        logger.debug(f"User {request.user.username} viewed training sessions: {[s.session_id for s in sessions]}")
-        return Response(serializer.data)
+        paginator = KeysetPagination('session_id', filters=SESSION_FILTERS, orderings=('session_date',))
+        if export_requested(request):
+            sessions = paginator.filter_queryset(TrainingSessions.objects.all(), request)
+            return stream_export(request, sessions, SESSION_EXPORT_FIELDS)
+        rows = paginator.paginate_queryset(TrainingSessions.objects.values(*SESSION_LIST_VALUES), request)
+        logger.debug(f"User {request.user.username} viewed {len(rows)} training sessions")
+        return paginator.get_paginated_response(session_rows(rows))
 
     def post(self, request):
         if not request.user.has_perm('training_app.add_training_session'):
             logger.warning(f"User {request.user.username} attempted to create training session without permission")
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
-        serializer = TrainingSessionsSerializer(data=request.data)
+        try:
+            trainer = get_trainer_profile(request)
+        except Trainers.DoesNotExist:
+            logger.error(f"User {request.user.username} has no trainer profile")
+            return Response({'error': 'Trainer profile not found'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Сесія зберігається з тренером користувача, тож і перетини перевіряються для нього
+        serializer = TrainingSessionsSerializer(data=request.data, context={'trainer': trainer})
         if serializer.is_valid():
-            try:
-                trainer = Trainers.objects.get(user_credential=request.user)
-                serializer.save(trainer=trainer)
-                logger.info(f"User {request.user.username} created training session: {serializer.data['session_id']}")
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
-            except Trainers.DoesNotExist:
-                logger.error(f"User {request.user.username} has no trainer profile")
-                return Response({'error': 'Trainer profile not found'}, status=status.HTTP_400_BAD_REQUEST)
+            serializer.save(trainer=trainer)
+            logger.info(f"User {request.user.username} created training session: {serializer.data['session_id']}")
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
         logger.warning(f"User {request.user.username} failed to create training session: {serializer.errors}")
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -84,4 +151,42 @@ class TrainingSessionsDetailView(APIView):
 
         session.delete()
         logger.info(f"User {request.user.username} deleted training session: {pk}")
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TrainingSessionsCancelView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @idempotent
+    def post(self, request):
+        if not request.user.has_perm('auth_app.change_training_sessions'):
+            logger.warning(f"User {request.user.username} attempted to cancel training sessions without permission")
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = TrainingSessionsCancelSerializer(data=request.data)
+        if not serializer.is_valid():
+            logger.warning(f"User {request.user.username} failed to cancel training sessions: {serializer.errors}")
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        sessions = TrainingSessions.objects.all()
+        if request.user.user_role == 'trainer':
+            # Тренер скасовує лише власні сесії
+            try:
+                sessions = sessions.filter(trainer=get_trainer_profile(request))
+            except Trainers.DoesNotExist:
+                logger.error(f"User {request.user.username} has no trainer profile")
+                return Response({'error': 'Trainer profile not found'}, status=status.HTTP_400_BAD_REQUEST)
+        if data.get('session_ids'):
+            sessions = sessions.filter(session_id__in=data['session_ids'])
+        else:
+            sessions = sessions.filter(
+                trainer_id=data['trainer_id'],
+                session_date__gte=datetime.combine(data['date_from'], time.min),
+                session_date__lt=datetime.combine(data['date_to'] + timedelta(days=1), time.min),
+            )
+
+        cancelled, notified = cancel_sessions(sessions, data.get('reason'))
+        logger.info(f"User {request.user.username} cancelled training sessions {cancelled}, {notified} clients notified")
+        return Response({'cancelled': cancelled, 'notified': notified})
+
@@ -5,6 +5,7 @@ from training_app.models import TrainingType
 from .serializers import TrainingTypeSerializer
 from rest_framework.permissions import IsAuthenticated
 import logging
+from sportmanagment.pagination import KeysetPagination
 
 logger = logging.getLogger(__name__)
 
@@ -13,11 +14,12 @@ class TrainingTypeListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        training_types = TrainingType.objects.all()
+        paginator = KeysetPagination('training_type_id')
+        training_types = paginator.paginate_queryset(TrainingType.objects.all(), request)
         serializer = TrainingTypeSerializer(training_types, many=True)
         logger.debug(
             f"User {request.user.username} viewed training types: {[t.training_type_id for t in training_types]}")
-        return Response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         if not request.user.has_perm('auth_app.add_training_type'):
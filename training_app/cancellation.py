@@ -0,0 +1,51 @@
+"""
+Масове скасування тренувальних сесій.
+
+Сесії, що потрапили під вибірку, блокуються і переводяться в статус
+'скасовано' одним UPDATE. Зареєстровані клієнти читаються одним запитом, і для
+кожного в тій самій транзакції ставиться в чергу сповіщення
+(client_app.notifications); надсилає їх фоновий воркер, а не запит.
+Черга очікування скасованих сесій очищується - місця в них більше не з'являться.
+"""
+import logging
+
+from django.db import transaction
+
+from client_app import dashboard
+from client_app.models import ClientTrainingRegistration, SessionWaitlistEntry
+from client_app.notifications import enqueue, session_cancelled
+from .models import TrainingSessions
+
+logger = logging.getLogger(__name__)
+
+CANCELLABLE_STATUS = 'заплановано'
+
+
+def cancel_sessions(sessions, reason=None):
+    """
+    Скасовує заплановані сесії з queryset sessions.
+    Повертає (cancelled_session_ids, notified_count).
+    """
+    with transaction.atomic():
+        session_ids = list(sessions
+                           .filter(status=CANCELLABLE_STATUS)
+                           .select_for_update()
+                           .order_by('session_id')
+                           .values_list('session_id', flat=True))
+        if not session_ids:
+            return [], 0
+        TrainingSessions.objects.filter(session_id__in=session_ids).update(status='скасовано')
+
+        registrations = list(ClientTrainingRegistration.objects
+                             .filter(session_id__in=session_ids)
+                             .values_list('user_id', 'session_id', 'session__session_date', 'session__start_time'))
+        enqueue([
+            session_cancelled(client_id, session_id, session_date, start_time, reason)
+            for client_id, session_id, session_date, start_time in registrations
+        ])
+        SessionWaitlistEntry.objects.filter(session_id__in=session_ids).delete()
+
+    # UPDATE і bulk_create не надсилають сигналів - скидаємо кеш головного екрана явно
+    dashboard.invalidate_many({client_id for client_id, *_ in registrations})
+    logger.info(f"Cancelled {len(session_ids)} training sessions, queued {len(registrations)} notifications")
+    return session_ids, len(registrations)
@@ -0,0 +1,183 @@
+"""
+Перевірка перетину тренувальних сесій у часі.
+
+Сесія займає інтервал [session_date + start_time, session_date + end_time).
+Перетинатися не можуть сесії одного тренера, сесії в одній локації та
+сесії, на які зареєстровано одного клієнта. Скасовані сесії не враховуються.
+
+Запити до БД звужуються рівністю за тренером/локацією і діапазоном однієї
+доби, тож ідуть по індексах
+  CREATE INDEX training_sessions_trainer_day_idx
+      ON "training_scheme"."training_sessions" (trainer_id, session_date, start_time);
+  CREATE INDEX training_sessions_location_day_idx
+      ON "training_scheme"."training_sessions" (location_id, session_date, start_time);
+і читають лише сесії цього дня. Остаточна гарантія для тренерів і локацій -
+exclusion-обмеження, яке відхиляє перетин навіть при паралельних вставках
+(порушення приходить як IntegrityError):
+  CREATE EXTENSION IF NOT EXISTS btree_gist;
+  ALTER TABLE "training_scheme"."training_sessions"
+      ADD COLUMN period tsrange GENERATED ALWAYS AS
+          (tsrange(session_date::date + start_time, session_date::date + end_time)) STORED;
+  ALTER TABLE "training_scheme"."training_sessions"
+      ADD CONSTRAINT training_sessions_trainer_no_overlap
+          EXCLUDE USING gist (trainer_id WITH =, period WITH &&) WHERE (status <> 'скасовано'),
+      ADD CONSTRAINT training_sessions_location_no_overlap
+          EXCLUDE USING gist (location_id WITH =, period WITH &&) WHERE (status <> 'скасовано');
+
+Окреме правило для локації: нова сесія не може починатися раніше, ніж через
+LOCATION_GAP після кінця будь-якої запланованої сесії в цій локації того ж дня.
+
+Для пакетної перевірки (наприклад, генерації серії сесій) IntervalIndex
+тримає інтервали в пам'яті і відповідає на запит перетину за O(log n).
+"""
+import bisect
+from datetime import datetime, time, timedelta
+
+from client_app.models import ClientTrainingRegistration
+from .models import TrainingSessions
+
+CANCELLED = 'скасовано'
+PLANNED = 'заплановано'
+LOCATION_GAP = timedelta(hours=1)
+
+CONFLICT_MESSAGES = {
+    'trainer': 'Тренер уже має заняття, що перетинається з цим часом.',
+    'location': 'Локація зайнята іншим заняттям у цей час.',
+    'client': 'Ви вже зареєстровані на сесію, що перетинається за часом.',
+    'location_gap': 'Неможливо створити тренування: між закінченням попередньої сесії в цій локації '
+                    'і початком нової має пройти щонайменше одна година.',
+    'past': 'Дата і час тренування не можуть бути в минулому.',
+}
+
+
+def _day(session_date):
+    day = session_date.date() if isinstance(session_date, datetime) else session_date
+    return datetime.combine(day, time.min)
+
+
+def session_interval(session_date, start_time, end_time):
+    day = _day(session_date)
+    return datetime.combine(day, start_time), datetime.combine(day, end_time)
+
+
+def _same_day_overlapping(session_date, start_time, end_time):
+    day = _day(session_date)
+    return {
+        'session_date__gte': day,
+        'session_date__lt': day + timedelta(days=1),
+        'start_time__lt': end_time,
+        'end_time__gt': start_time,
+    }
+
+
+def find_conflicts(session_date, start_time, end_time, trainer_id=None, location_id=None,
+                   exclude_session_id=None):
+    """
+    Повертає {'trainer': session_id, 'location': session_id} для знайдених
+    перетинів; відсутній ключ означає, що конфлікту немає.
+    """
+    sessions = (TrainingSessions.objects
+                .filter(**_same_day_overlapping(session_date, start_time, end_time))
+                .exclude(status=CANCELLED))
+    if exclude_session_id is not None:
+        sessions = sessions.exclude(session_id=exclude_session_id)
+    conflicts = {}
+    for kind, value in (('trainer', trainer_id), ('location', location_id)):
+        if value is None:
+            continue
+        session_id = sessions.filter(**{f'{kind}_id': value}).values_list('session_id', flat=True).first()
+        if session_id is not None:
+            conflicts[kind] = session_id
+    return conflicts
+
+
+def violates_location_gap(start, other_end):
+    return start < other_end + LOCATION_GAP
+
+
+def find_location_gap_conflict(location_id, session_date, start_time, exclude_session_id=None):
+    """
+    Повертає id запланованої сесії в локації того ж дня, після кінця якої до
+    start_time не минає LOCATION_GAP, або None.
+    """
+    day = _day(session_date)
+    start = datetime.combine(day, start_time)
+    sessions = TrainingSessions.objects.filter(
+        location_id=location_id,
+        status=PLANNED,
+        session_date__gte=day,
+        session_date__lt=day + timedelta(days=1),
+    )
+    if exclude_session_id is not None:
+        sessions = sessions.exclude(session_id=exclude_session_id)
+    for session_id, end_time in sessions.values_list('session_id', 'end_time'):
+        if violates_location_gap(start, datetime.combine(day, end_time)):
+            return session_id
+    return None
+
+
+def find_client_conflict(client_id, session):
+    """
+    Повертає id сесії, на яку клієнт уже зареєстрований і яка перетинається
+    з session, або None.
+    """
+    overlapping = _same_day_overlapping(session.session_date, session.start_time, session.end_time)
+    return (ClientTrainingRegistration.objects
+            .filter(user_id=client_id, **{f'session__{lookup}': value for lookup, value in overlapping.items()})
+            .exclude(session__status=CANCELLED)
+            .exclude(session_id=session.session_id)
+            .values_list('session_id', flat=True)
+            .first())
+
+
+class IntervalIndex:
+    """
+    Інтервали [start, end) одного ключа (тренера, локації) без злиття,
+    відсортовані за початком. Для кожного префікса зберігається індекс
+    інтервалу з найпізнішим кінцем: серед інтервалів, що почались до end,
+    перетин з [start, end) є тоді й лише тоді, коли цей кінець пізніше start,
+    і саме цей інтервал перетинається. Тому запит - один bisect.
+    """
+
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+        self._owners = []
+        self._latest = []
+
+    def _match(self, start, end):
+        count = bisect.bisect_left(self._starts, end)
+        if not count:
+            return None
+        index = self._latest[count - 1]
+        return index if self._ends[index] > start else None
+
+    def overlaps(self, start, end):
+        return self._match(start, end) is not None
+
+    def overlapping(self, start, end):
+        """Повертає власника (id сесії) інтервалу, що перетинається з [start, end), або None."""
+        index = self._match(start, end)
+        return None if index is None else self._owners[index]
+
+    def add(self, start, end, owner=None):
+        position = bisect.bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._ends.insert(position, end)
+        self._owners.insert(position, owner)
+        # Префіксні максимуми перераховуються від точки вставки; серія додає дати
+        # за зростанням, тож зазвичай це лише останній елемент
+        del self._latest[position:]
+        for index in range(position, len(self._starts)):
+            previous = self._latest[index - 1] if index else None
+            keep = previous is not None and self._ends[previous] >= self._ends[index]
+            self._latest.append(previous if keep else index)
+
+    @classmethod
+    def for_sessions(cls, sessions):
+        """Будує індекси {ключ: IntervalIndex} з кортежів (ключ, session_id, session_date, start_time, end_time)."""
+        indexes = {}
+        for key, session_id, session_date, start_time, end_time in sessions:
+            start, end = session_interval(session_date, start_time, end_time)
+            indexes.setdefault(key, cls()).add(start, end, session_id)
+        return indexes
@@ -1,9 +1,11 @@
 from django import forms
 from django.core.exceptions import ValidationError
 
+from .conflicts import CONFLICT_MESSAGES, find_conflicts, find_location_gap_conflict
 from .models import TrainingType, Trainers, TrainingSessions
-from gym_app.models import Gym
-from datetime import date, datetime, timedelta
+from .series import MAX_SERIES_DAYS
+from gym_app.models import Gym, GymLocation
+from datetime import date, datetime
 
 
 class TrainingTypeForm(forms.ModelForm):
@@ -73,6 +75,11 @@ class TrainingSessionForm(forms.ModelForm):
             'status': forms.Select(),
         }
 
+    def __init__(self, *args, trainer=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Нова сесія ще не має тренера - view передає його для перевірки перетинів
+        self.trainer = trainer
+
     def clean_session_date(self):
         session_date = self.cleaned_data['session_date']
         today = datetime.now().date()
@@ -110,28 +117,23 @@ class TrainingSessionForm(forms.ModelForm):
         location = cleaned_data.get('location')
 
         if session_date and start_time and location:
-            # Об'єднуємо дату і час початку нової сесії
-            session_start = datetime.combine(session_date.date(), start_time)
-
-            # Шукаємо попередні сесії в тій самій локації
-            previous_sessions = (TrainingSessions.objects.filter(
-                location=location,
-                status='заплановано',  # Тільки заплановані сесії
-                session_date__date=session_date.date()  # На ту саму дату
-            ))
-            #.exclude(
-            #    end_time__lte=start_time  # Виключаємо сесії, що закінчилися до початку нової
-            #))
-
-            for session in previous_sessions:
-                # Отримуємо час закінчення попередньої сесії
-                prev_session_end = datetime.combine(session.session_date.date(), session.end_time)
-                # Перевіряємо, чи пройшла година між закінченням попередньої та початком нової
-                if session_start < prev_session_end + timedelta(hours=1):
-                    raise ValidationError(
-                        'Неможливо створити тренування: між закінченням попередньої сесії в цій локації '
-                        'і початком нової має пройти щонайменше одна година.'
-                    )
+            # Година між кінцем попередньої сесії в локації і початком нової (сама сесія не враховується)
+            if find_location_gap_conflict(location.pk, session_date, start_time,
+                                          exclude_session_id=self.instance.pk) is not None:
+                raise ValidationError(CONFLICT_MESSAGES['location_gap'])
+
+        end_time = cleaned_data.get('end_time')
+        trainer_id = self.trainer.pk if self.trainer else self.instance.trainer_id
+        if (session_date and start_time and end_time and start_time < end_time
+                and cleaned_data.get('status') != 'скасовано'):
+            conflicts = find_conflicts(
+                session_date, start_time, end_time,
+                trainer_id=trainer_id,
+                location_id=location.pk if location else None,
+                exclude_session_id=self.instance.pk,
+            )
+            for kind in conflicts:
+                self.add_error(None, CONFLICT_MESSAGES[kind])
 
         return cleaned_data
 
@@ -183,4 +185,70 @@ class LocationRankingForm(forms.Form):
         required=False,
         label='Дата закінчення',
         widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
-    )
\ No newline at end of file
+    )
+
+class TrainingSeriesForm(forms.Form):
+    WEEKDAY_CHOICES = [
+        (0, 'Понеділок'),
+        (1, 'Вівторок'),
+        (2, 'Середа'),
+        (3, 'Четвер'),
+        (4, "П'ятниця"),
+        (5, 'Субота'),
+        (6, 'Неділя'),
+    ]
+
+    first_date = forms.DateField(label='Перша дата', widget=forms.DateInput(attrs={'type': 'date'}))
+    until_date = forms.DateField(label='Остання дата', widget=forms.DateInput(attrs={'type': 'date'}))
+    weekdays = forms.TypedMultipleChoiceField(
+        choices=WEEKDAY_CHOICES,
+        coerce=int,
+        label='Дні тижня',
+        widget=forms.CheckboxSelectMultiple
+    )
+    exclude_dates = forms.CharField(
+        required=False,
+        label='Дати-винятки (РРРР-ММ-ДД, через кому або з нового рядка)',
+        widget=forms.Textarea(attrs={'rows': 3})
+    )
+    start_time = forms.TimeField(label='Час початку', widget=forms.TimeInput(attrs={'type': 'time'}))
+    end_time = forms.TimeField(label='Час закінчення', widget=forms.TimeInput(attrs={'type': 'time'}))
+    max_participants = forms.IntegerField(label='Максимальна кількість учасників', min_value=1)
+    training_type = forms.ModelChoiceField(
+        queryset=TrainingType.objects.all(),
+        required=False,
+        label='Тип тренування'
+    )
+    gym = forms.ModelChoiceField(queryset=Gym.objects.all(), label='Зал', empty_label='Виберіть зал')
+    location = forms.ModelChoiceField(queryset=GymLocation.objects.all(), label='Локація')
+
+    def clean_exclude_dates(self):
+        raw = self.cleaned_data['exclude_dates']
+        dates = set()
+        for value in raw.replace(',', '\n').split():
+            try:
+                dates.add(date.fromisoformat(value))
+            except ValueError:
+                raise forms.ValidationError(f'Некоректна дата: {value}')
+        return dates
+
+    def clean(self):
+        cleaned_data = super().clean()
+        first_date = cleaned_data.get('first_date')
+        until_date = cleaned_data.get('until_date')
+        start_time = cleaned_data.get('start_time')
+        end_time = cleaned_data.get('end_time')
+
+        if first_date and first_date < datetime.now().date():
+            self.add_error('first_date', 'Дата сесії не може бути в минулому.')
+        if first_date and until_date:
+            if until_date < first_date:
+                self.add_error('until_date', 'Остання дата не може бути раніше першої.')
+            elif (until_date - first_date).days > MAX_SERIES_DAYS:
+                self.add_error('until_date', f'Серія не може тривати довше {MAX_SERIES_DAYS} днів.')
+        if start_time and end_time and start_time >= end_time:
+            self.add_error('end_time', 'Час початку повинен бути раніше часу закінчення.')
+        gym, location = cleaned_data.get('gym'), cleaned_data.get('location')
+        if gym and location and location.gym_id != gym.pk:
+            self.add_error('location', 'Локація не належить до вибраного залу.')
+        return cleaned_data
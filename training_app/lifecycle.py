@@ -0,0 +1,39 @@
+"""
+Перехід тренувальних сесій у статус 'завершено' за часом.
+
+Статус оновлюється одним UPDATE для всіх сесій, що вже закінчилися, з
+команди finish_training_sessions (cron або --interval). Views лише читають
+статус і нічого не записують. Умова "закінчилась" виражена через порівняння
+колонок без функцій над ними, тож UPDATE іде по частковому індексу:
+  CREATE INDEX training_sessions_planned_end_idx
+      ON "training_scheme"."training_sessions" (session_date, end_time)
+      WHERE status = 'заплановано';
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+
+from .models import TrainingSessions
+
+logger = logging.getLogger(__name__)
+
+
+def ended(now=None):
+    """
+    Умова для сесій, що закінчилися до now: session_date - це дата сесії
+    (з часом 00:00), end_time - час закінчення.
+    """
+    now = now or datetime.now()
+    today = datetime.combine(now.date(), time.min)
+    return (Q(session_date__lt=today)
+            | Q(session_date__gte=today, session_date__lt=today + timedelta(days=1), end_time__lt=now.time()))
+
+
+def finish_ended_sessions(now=None):
+    updated = (TrainingSessions.objects
+               .filter(ended(now), status='заплановано')
+               .update(status='завершено'))
+    if updated:
+        logger.info(f"Marked {updated} training sessions as finished")
+    return updated
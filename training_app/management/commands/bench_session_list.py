@@ -0,0 +1,98 @@
+import time as timer
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from gym_app.models import GymLocation
+from training_app.api.serializers import TrainingSessionsSerializer
+from training_app.api.training_session_api import SESSION_LIST_VALUES, session_rows
+from training_app.models import Trainers, TrainingSessions
+
+# Синтетичні сесії кладуться далеко в майбутнє, щоб не перетинатися з реальним розкладом
+SEED_START = datetime(2100, 1, 1)
+SEED_SLOT = timedelta(minutes=30)
+SEED_SLOTS_PER_DAY = 40
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/sec of the training session list read paths (nested serializer vs flat values())'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000, help='Sessions to read on each path')
+        parser.add_argument('--page-size', type=int, default=200, help='Rows per page, as in the API')
+        parser.add_argument('--seed', action='store_true',
+                            help='Insert --rows synthetic sessions inside a transaction that is rolled back at the end')
+        parser.add_argument('--skip-baseline', action='store_true',
+                            help='Skip the original path without select_related (one query per related row)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                self._seed(options['rows'])
+            paths = [
+                ('serializer + select_related', self._serializer_path(select_related=True)),
+                ('values() + flat dicts', self._values_path),
+            ]
+            if not options['skip_baseline']:
+                paths.insert(0, ('serializer, no select_related', self._serializer_path(select_related=False)))
+            for name, read_page in paths:
+                self._measure(name, read_page, options['rows'], options['page_size'])
+            # Жодних змін після бенчмарку не лишається
+            transaction.set_rollback(True)
+
+    def _seed(self, rows):
+        trainer = Trainers.objects.order_by('trainer_id').first()
+        location = GymLocation.objects.order_by('location_id').first()
+        if trainer is None or location is None:
+            raise CommandError('--seed needs at least one trainer and one gym location')
+        sessions = []
+        for index in range(rows):
+            day = SEED_START + timedelta(days=index // SEED_SLOTS_PER_DAY)
+            start = day + SEED_SLOT * (index % SEED_SLOTS_PER_DAY)
+            sessions.append(TrainingSessions(
+                session_date=day,
+                start_time=start.time(),
+                end_time=(start + SEED_SLOT - timedelta(minutes=1)).time(),
+                max_participants=10,
+                trainer=trainer,
+                location=location,
+            ))
+        TrainingSessions.objects.bulk_create(sessions, batch_size=5000)
+        self.stdout.write(f'Seeded {rows} sessions (rolled back at exit)')
+
+    @staticmethod
+    def _serializer_path(select_related):
+        def read_page(after, page_size):
+            sessions = TrainingSessions.objects.filter(session_id__gt=after).order_by('session_id')
+            if select_related:
+                sessions = sessions.select_related('training_type', 'trainer', 'location')
+            page = list(sessions[:page_size])
+            return TrainingSessionsSerializer(page, many=True).data, page[-1].session_id if page else None
+        return read_page
+
+    @staticmethod
+    def _values_path(after, page_size):
+        page = list(TrainingSessions.objects
+                    .filter(session_id__gt=after)
+                    .order_by('session_id')
+                    .values(*SESSION_LIST_VALUES)[:page_size])
+        return session_rows(page), page[-1]['session_id'] if page else None
+
+    def _measure(self, name, read_page, rows, page_size):
+        renderer = JSONRenderer()
+        read, after = 0, 0
+        with CaptureQueriesContext(connection) as queries:
+            started = timer.perf_counter()
+            while read < rows:
+                data, after = read_page(after, min(page_size, rows - read))
+                if after is None:
+                    break
+                renderer.render(data)
+                read += len(data)
+            elapsed = timer.perf_counter() - started
+        rate = read / elapsed if elapsed else 0
+        self.stdout.write(f'{name:32} {read:7d} rows in {elapsed:7.2f}s  '
+                          f'{rate:10.0f} rows/s  {len(queries)} queries')
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from training_app.lifecycle import finish_ended_sessions
+
+
+class Command(BaseCommand):
+    help = "Mark planned training sessions whose end time has passed as finished"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0,
+                            help='Keep running and repeat every this many seconds (0 - run once, e.g. from cron)')
+
+    def handle(self, *args, **options):
+        while True:
+            updated = finish_ended_sessions()
+            self.stdout.write(self.style.SUCCESS(f'Finished {updated} training sessions'))
+            if not options['interval']:
+                break
+            # Між запусками з'єднання не тримається відкритим довше за CONN_MAX_AGE
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -106,11 +106,26 @@ class TrainingSessions(models.Model):
         default='заплановано',
         null=False
     )
+    # Кількість зайнятих місць, підтримується client_app.reservations.
+    # Колонка додається SQL-скриптом схеми:
+    #   ALTER TABLE "training_scheme"."training_sessions"
+    #       ADD COLUMN registered_count integer NOT NULL DEFAULT 0 CHECK (registered_count >= 0);
+    # і заповнюється командою recount_session_seats.
+    registered_count = models.IntegerField(default=0, editable=False)
 
     class Meta:
         db_table = '"training_scheme"."training_sessions"'
         managed = False
         unique_together = (('session_date', 'start_time', 'trainer'),)
 
+    def save(self, *args, update_fields=None, **kwargs):
+        # Лічильник змінюють лише атомарні UPDATE з reservations; звичайне збереження
+        # існуючої сесії не повинно записувати назад значення, прочитане на початку запиту
+        if not self._state.adding:
+            if update_fields is None:
+                update_fields = [field.name for field in self._meta.concrete_fields if not field.primary_key]
+            update_fields = [name for name in update_fields if name != 'registered_count']
+        super().save(*args, update_fields=update_fields, **kwargs)
+
     def __str__(self):
         return f"Session {self.session_id} on {self.session_date}"
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Серії тренувальних сесій за тижневим шаблоном.
+
+Шаблон (дні тижня, час, період, дати-винятки) розгортається в список дат,
+після чого всі наявні сесії тренера та локації за цей період читаються одним
+запитом у IntervalIndex. Кожна дата серії проходить ті самі перевірки, що й
+одна сесія у TrainingSessionForm: початок не в минулому, година після кінця
+попередніх сесій у локації (conflicts.LOCATION_GAP) і відсутність перетинів
+за тренером і локацією. Дата без конфліктів сама додається в індекси, тому
+порушення всередині серії теж виявляються. Вільні сесії вставляються одним
+bulk_create, конфлікти повертаються звітом.
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+
+from .conflicts import CANCELLED, PLANNED, IntervalIndex, session_interval, violates_location_gap
+from .models import TrainingSessions
+
+logger = logging.getLogger(__name__)
+
+MAX_SERIES_DAYS = 366
+
+
+def expand_dates(first_date, until_date, weekdays, exclude_dates=()):
+    """
+    Дати від first_date до until_date включно, що припадають на weekdays
+    (0 - понеділок), без exclude_dates.
+    """
+    weekdays, exclude_dates = set(weekdays), set(exclude_dates)
+    day, dates = first_date, []
+    while day <= until_date:
+        if day.weekday() in weekdays and day not in exclude_dates:
+            dates.append(day)
+        day += timedelta(days=1)
+    return dates
+
+
+def _existing_indexes(trainer_id, location_id, first_date, until_date):
+    rows = (TrainingSessions.objects
+            .filter(Q(trainer_id=trainer_id) | Q(location_id=location_id),
+                    session_date__gte=datetime.combine(first_date, time.min),
+                    session_date__lt=datetime.combine(until_date + timedelta(days=1), time.min))
+            .exclude(status=CANCELLED)
+            .values_list('trainer_id', 'location_id', 'session_id', 'session_date', 'start_time', 'end_time',
+                         'status'))
+    trainer_sessions, location_sessions, location_ends = [], [], {}
+    for trainer, location, session_id, session_date, start_time, end_time, status in rows:
+        if trainer == trainer_id:
+            trainer_sessions.append(('trainer', session_id, session_date, start_time, end_time))
+        if location == location_id:
+            location_sessions.append(('location', session_id, session_date, start_time, end_time))
+            if status == PLANNED:
+                start, end = session_interval(session_date, start_time, end_time)
+                location_ends.setdefault(start.date(), []).append((end, session_id))
+    indexes = IntervalIndex.for_sessions(trainer_sessions + location_sessions)
+    return indexes.get('trainer', IntervalIndex()), indexes.get('location', IntervalIndex()), location_ends
+
+
+def _occurrence_conflicts(day, start, end, now, trainer_index, location_index, location_ends):
+    if start < now:
+        return [{'date': day, 'kind': 'past', 'session_id': None}]
+    found = [{'date': day, 'kind': kind, 'session_id': index.overlapping(start, end)}
+             for kind, index in (('trainer', trainer_index), ('location', location_index))
+             if index.overlaps(start, end)]
+    for other_end, session_id in location_ends.get(day, ()):
+        if violates_location_gap(start, other_end):
+            found.append({'date': day, 'kind': 'location_gap', 'session_id': session_id})
+            break
+    return found
+
+
+def create_series(trainer, location, training_type, max_participants, start_time, end_time, dates):
+    """
+    Створює сесії на дати dates. Повертає (created, conflicts), де conflicts -
+    список {'date', 'kind', 'session_id'}, kind - ключ CONFLICT_MESSAGES
+    ('trainer', 'location', 'location_gap', 'past'); session_id None означає
+    конфлікт з іншою датою цієї ж серії (або початок у минулому).
+    """
+    created, conflicts = [], []
+    if not dates:
+        return created, conflicts
+    trainer_index, location_index, location_ends = _existing_indexes(trainer.pk, location.pk, dates[0], dates[-1])
+
+    now = datetime.now()
+    sessions = []
+    for day in dates:
+        start, end = session_interval(day, start_time, end_time)
+        found = _occurrence_conflicts(day, start, end, now, trainer_index, location_index, location_ends)
+        if found:
+            conflicts.extend(found)
+            continue
+        trainer_index.add(start, end)
+        location_index.add(start, end)
+        location_ends.setdefault(day, []).append((end, None))
+        sessions.append(TrainingSessions(
+            session_date=datetime.combine(day, time.min),
+            start_time=start_time,
+            end_time=end_time,
+            max_participants=max_participants,
+            training_type=training_type,
+            trainer=trainer,
+            location=location,
+        ))
+
+    # Один INSERT на всю серію; при порушенні exclusion-обмеження паралельною вставкою відкочується цілком
+    created = TrainingSessions.objects.bulk_create(sessions)
+    logger.info(f"Created {len(created)} sessions in series for trainer {trainer.pk}, {len(conflicts)} conflicts")
+    return created, conflicts
@@ -1,3 +1,96 @@
-from django.test import TestCase
+import random
+from datetime import date, datetime, time
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from training_app.conflicts import IntervalIndex, session_interval
+from training_app.series import _occurrence_conflicts, expand_dates
+
+
+def at(hour, minute=0):
+    return datetime(2030, 1, 1, hour, minute)
+
+
+class IntervalIndexTests(SimpleTestCase):
+    def test_touching_intervals_do_not_overlap(self):
+        index = IntervalIndex()
+        index.add(at(9), at(10), 1)
+        self.assertFalse(index.overlaps(at(10), at(11)))
+        self.assertFalse(index.overlaps(at(8), at(9)))
+        self.assertTrue(index.overlaps(at(9, 30), at(10, 30)))
+
+    def test_owner_is_the_interval_that_overlaps(self):
+        index = IntervalIndex()
+        index.add(at(9), at(10), 1)
+        index.add(at(10), at(11), 2)
+        index.add(at(8), at(12), 3)
+        index.add(at(13), at(14), 4)
+        self.assertEqual(index.overlapping(at(13, 30), at(15)), 4)
+        self.assertIn(index.overlapping(at(10, 30), at(10, 45)), {2, 3})
+        self.assertIsNone(index.overlapping(at(12), at(13)))
+
+    def test_matches_brute_force(self):
+        rng = random.Random(22)
+        for _ in range(500):
+            index, intervals = IntervalIndex(), []
+            for owner in range(rng.randint(0, 12)):
+                start = rng.randint(0, 50)
+                end = start + rng.randint(1, 10)
+                index.add(start, end, owner)
+                intervals.append((start, end, owner))
+            for _ in range(20):
+                start = rng.randint(0, 60)
+                end = start + rng.randint(1, 10)
+                owners = {owner for s, e, owner in intervals if s < end and e > start}
+                self.assertEqual(index.overlaps(start, end), bool(owners))
+                if owners:
+                    self.assertIn(index.overlapping(start, end), owners)
+                else:
+                    self.assertIsNone(index.overlapping(start, end))
+
+    def test_for_sessions_groups_by_key(self):
+        day = datetime(2030, 1, 1)
+        indexes = IntervalIndex.for_sessions([
+            ('trainer', 1, day, time(9), time(10)),
+            ('location', 2, day, time(11), time(12)),
+        ])
+        start, end = session_interval(day, time(9, 30), time(9, 45))
+        self.assertEqual(indexes['trainer'].overlapping(start, end), 1)
+        self.assertFalse(indexes['location'].overlaps(start, end))
+
+
+class ExpandDatesTests(SimpleTestCase):
+    def test_weekdays_between_bounds_inclusive(self):
+        # 2030-01-07 - понеділок
+        dates = expand_dates(date(2030, 1, 7), date(2030, 1, 21), weekdays=[0, 2])
+        self.assertEqual(dates, [date(2030, 1, 7), date(2030, 1, 9), date(2030, 1, 14),
+                                 date(2030, 1, 16), date(2030, 1, 21)])
+
+    def test_exclude_dates_are_skipped(self):
+        dates = expand_dates(date(2030, 1, 7), date(2030, 1, 14), weekdays=[0], exclude_dates={date(2030, 1, 7)})
+        self.assertEqual(dates, [date(2030, 1, 14)])
+
+    def test_empty_when_no_weekday_matches(self):
+        self.assertEqual(expand_dates(date(2030, 1, 7), date(2030, 1, 8), weekdays=[5]), [])
+
+
+class SeriesOccurrenceTests(SimpleTestCase):
+    DAY = date(2030, 1, 7)
+
+    def check(self, start_time, end_time, now=datetime(2030, 1, 1), location_ends=None):
+        start, end = session_interval(self.DAY, start_time, end_time)
+        return _occurrence_conflicts(self.DAY, start, end, now, IntervalIndex(), IntervalIndex(),
+                                     location_ends or {})
+
+    def test_free_slot_has_no_conflicts(self):
+        self.assertEqual(self.check(time(10), time(11)), [])
+
+    def test_start_in_the_past_is_rejected(self):
+        conflicts = self.check(time(10), time(11), now=datetime(2030, 1, 7, 10, 30))
+        self.assertEqual([conflict['kind'] for conflict in conflicts], ['past'])
+
+    def test_location_gap_after_previous_session(self):
+        ends = {self.DAY: [(datetime(2030, 1, 7, 9, 30), 42)]}
+        conflicts = self.check(time(10), time(11), location_ends=ends)
+        self.assertEqual(conflicts, [{'date': self.DAY, 'kind': 'location_gap', 'session_id': 42}])
+        self.assertEqual(self.check(time(10, 30), time(11), location_ends=ends), [])
@@ -16,6 +16,7 @@ urlpatterns = [
 
     path('training_sessions/', views.training_sessions, name='training_sessions'),
     path('training_sessions/add/', views.add_training_session, name='add_training_session'),
+    path('training_sessions/series/add/', views.add_training_series, name='add_training_series'),
     path('training_sessions/edit/<int:session_id>/', views.edit_training_session, name='edit_training_session'),
     path('training_sessions/delete/<int:session_id>/', views.delete_training_session, name='delete_training_session'),
 
@@ -32,6 +33,7 @@ urlpatterns = [
     path('api/trainers/', trainer_api.TrainersListView.as_view(), name='api_trainer_list'),
     path('api/trainers/<int:pk>/', trainer_api.TrainersDetailView.as_view(), name='api_trainer_detail'),
     path('api/training_sessions/', training_session_api.TrainingSessionsListView.as_view(), name='api_training_session_list'),
+    path('api/training_sessions/cancel/', training_session_api.TrainingSessionsCancelView.as_view(), name='api_training_session_cancel'),
     path('api/training_sessions/<int:pk>/', training_session_api.TrainingSessionsDetailView.as_view(), name='api_training_session_detail'),
 
     path('analytics/', views.analytics_page, name='analytics'),
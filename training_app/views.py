@@ -5,15 +5,16 @@ from django.contrib import messages
 
 from client_app.forms import ClientProgressForm
 from client_app.models import ClientTrainingRegistration, ClientProgress
+from client_app.profiles import get_trainer_profile
 from .models import TrainingType, Trainers, TrainingSessions
-from .forms import TrainingTypeForm, LocationRankingForm, TrainerForm, TrainingSessionForm, ClientAttendanceForm, TrainingTypeRankingForm
+from .forms import TrainingTypeForm, LocationRankingForm, TrainerForm, TrainingSessionForm, ClientAttendanceForm, TrainingTypeRankingForm, \
+    TrainingSeriesForm
+from .series import create_series, expand_dates
 from gym_app.models import Gym, GymLocation
 from django.db import IntegrityError, InternalError, transaction
 from django.db.models import Avg, ProtectedError, RestrictedError
 import logging
 import os
-from django.utils import timezone
-from datetime import datetime, timedelta, time
 from django.db import models
 from django.db import connection
 
@@ -94,7 +95,7 @@ def delete_training_type(request, training_type_id):
 @login_required
 def trainer_profile(request):
     try:
-        trainer = Trainers.objects.get(user_credential=request.user)
+        trainer = get_trainer_profile(request)
     except Trainers.DoesNotExist:
         messages.error(request, 'Профіль тренера не знайдено. Зверніться до адміністратора.')
         return redirect('home')
@@ -164,23 +165,12 @@ def delete_trainer(request, trainer_id):
 def training_sessions(request):
     try:
 
-        trainer = Trainers.objects.get(user_credential=request.user)
-        sessions = TrainingSessions.objects.filter(trainer=trainer).order_by('session_date', 'start_time')
-
-        current_time = timezone.now()
-
-        # Проходим по каждой сессии и проверяем время её завершения
-        for session in sessions:
-
-            #session_start = datetime.combine(session.session_date, session.start_time)
-            session_end = datetime.combine(session.session_date, session.end_time)
-
-
-
-            # Если сессия завершилась, но статус ещё не установлен как 'завершено'
-            if session_end < current_time and session.status != 'завершено':
-                session.status = 'завершено'
-                session.save(update_fields=['status'])
+        trainer = get_trainer_profile(request)
+        # Статус 'завершено' виставляє команда finish_training_sessions - сторінка лише читає
+        sessions = (TrainingSessions.objects
+                    .filter(trainer=trainer)
+                    .select_related('training_type', 'location__gym')
+                    .order_by('session_date', 'start_time'))
         return render(request, 'training_sessions/training_sessions_list.html', {
             'sessions': sessions,
             'trainer': trainer
@@ -194,14 +184,14 @@ def training_sessions(request):
 @permission_required('auth_app.add_training_sessions', raise_exception=True)
 def add_training_session(request):
     try:
-        trainer = Trainers.objects.get(user_credential=request.user)
+        trainer = get_trainer_profile(request)
     except Trainers.DoesNotExist:
         logger.error(f"User {request.user.username} (role: {request.user.user_role}) attempted to add training session but no matching Trainers record found.")
         messages.error(request, 'Профіль тренера не знайдено. Зверніться до адміністратора.')
         return redirect('home')
 
     if request.method == 'POST':
-        form = TrainingSessionForm(request.POST)
+        form = TrainingSessionForm(request.POST, trainer=trainer)
         if form.is_valid():
             try:
                 session = form.save(commit=False)
@@ -231,7 +221,7 @@ def add_training_session(request):
                 for error in errors:
                     messages.error(request, f'Помилка: {error}')
     else:
-        form = TrainingSessionForm()
+        form = TrainingSessionForm(trainer=trainer)
 
 
     gyms = Gym.objects.all()
@@ -250,11 +240,66 @@ def add_training_session(request):
     })
 
 
+@login_required
+@permission_required('auth_app.add_training_sessions', raise_exception=True)
+def add_training_series(request):
+    try:
+        trainer = get_trainer_profile(request)
+    except Trainers.DoesNotExist:
+        logger.error(f"User {request.user.username} (role: {request.user.user_role}) attempted to add training series but no matching Trainers record found.")
+        messages.error(request, 'Профіль тренера не знайдено. Зверніться до адміністратора.')
+        return redirect('home')
+
+    created, conflicts = None, []
+    if request.method == 'POST':
+        form = TrainingSeriesForm(request.POST)
+        if form.is_valid():
+            data = form.cleaned_data
+            dates = expand_dates(data['first_date'], data['until_date'], data['weekdays'], data['exclude_dates'])
+            if not dates:
+                form.add_error(None, 'Шаблон не містить жодної дати.')
+            else:
+                try:
+                    created, conflicts = create_series(
+                        trainer, data['location'], data['training_type'], data['max_participants'],
+                        data['start_time'], data['end_time'], dates,
+                    )
+                    logger.info(f"User {request.user.username} created series of {len(created)} training sessions ({len(conflicts)} conflicts)")
+                    messages.success(request, f'Створено сесій: {len(created)}.')
+                    if conflicts:
+                        messages.warning(request, f'Пропущено дат через конфлікти розкладу: {len({conflict["date"] for conflict in conflicts})}.')
+                    form = TrainingSeriesForm()
+                except IntegrityError as e:
+                    logger.error(f"User {request.user.username} failed to add training series: {str(e)}")
+                    messages.error(request, 'Помилка: розклад змінився під час створення серії. Спробуйте ще раз.')
+        else:
+            logger.warning(f"User {request.user.username} failed to add training series: {form.errors}")
+    else:
+        form = TrainingSeriesForm()
+
+    gyms = Gym.objects.all()
+    gym_locations = {
+        gym.gym_id: [
+            {'location_id': loc.location_id, 'location_name': loc.location_name}
+            for loc in GymLocation.objects.filter(gym=gym)
+        ]
+        for gym in gyms
+    }
+    return render(request, 'training_sessions/add_training_series.html', {
+        'form': form,
+        'trainer': trainer,
+        'gyms': gyms,
+        'gym_locations': gym_locations,
+        'created': created,
+        'conflicts': conflicts,
+    })
+
+
 @login_required
 @permission_required('auth_app.change_training_sessions', raise_exception=True)
 def edit_training_session(request, session_id):
     try:
-        trainer = Trainers.objects.get(user_credential=request.user)
+        trainer = get_trainer_profile(request)
     except Trainers.DoesNotExist:
         logger.error(f"User {request.user.username} (role: {request.user.user_role}) attempted to edit training session but no matching Trainers record found.")
         messages.error(request, 'Профіль тренера не знайдено. Зверніться до адміністратора.')
@@ -298,7 +343,7 @@ def edit_training_session(request, session_id):
 @permission_required('auth_app.delete_training_sessions', raise_exception=True)
 def delete_training_session(request, session_id):
     try:
-        trainer = Trainers.objects.get(user_credential=request.user)
+        trainer = get_trainer_profile(request)
     except Trainers.DoesNotExist:
         logger.error(f"User {request.user.username} (role: {request.user.user_role}) attempted to delete training session but no matching Trainers record found.")
         messages.error(request, 'Профіль тренера не знайдено. Зверніться до адміністратора.')
@@ -326,7 +371,7 @@ def delete_training_session(request, session_id):
 @permission_required('auth_app.view_training_sessions', raise_exception=True)
 def view_session_registrations(request, session_id):
     try:
-        trainer = Trainers.objects.get(user_credential=request.user)
+        trainer = get_trainer_profile(request)
         try:
             session = TrainingSessions.objects.get(session_id=session_id, trainer=trainer)
         except TrainingSessions.DoesNotExist:
@@ -356,7 +401,7 @@ def view_session_registrations(request, session_id):
 @permission_required('auth_app.view_client_progress', raise_exception=True)
 def my_client_progress(request):
     try:
-        trainer = Trainers.objects.get(user_credential=request.user)
+        trainer = get_trainer_profile(request)
         # Получаем прогресс клиентов тренера
         progress_records = ClientProgress.objects.filter(
             user__trainer=trainer
@@ -380,7 +425,7 @@ def my_client_progress(request):
 @permission_required('auth_app.change_client_progress', raise_exception=True)
 def edit_client_progress(request, progress_id):
     try:
-        trainer = Trainers.objects.get(user_credential=request.user)
+        trainer = get_trainer_profile(request)
         try:
             progress = ClientProgress.objects.get(
                 progress_id=progress_id,
@@ -431,7 +476,7 @@ def delete_client_progress(request, progress_id):
         return redirect('my_client_progress')
 
     try:
-        trainer = Trainers.objects.get(user_credential=request.user)
+        trainer = get_trainer_profile(request)
         try:
             progress = ClientProgress.objects.get(
                 progress_id=progress_id,